@@ -6,11 +6,12 @@ from desktop_runner.actions.step_trace import StepTraceBuilder
 from desktop_runner.errors import ActionFailed, DesktopRunnerError
 from desktop_runner.selector.resolve import resolve_ladder
 from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.protocol import DesktopAdapter
 
 
 def click(
     params: Dict[str, Any],
-    adapter: Optional[UIAAdapter] = None,
+    adapter: Optional[DesktopAdapter] = None,
 ) -> Dict[str, Any]:
     adapter = adapter or UIAAdapter()
     trace = StepTraceBuilder(run_id=params["run_id"], step_id=params["step_id"])
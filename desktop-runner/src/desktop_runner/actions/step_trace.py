@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from desktop_runner.artifacts.screenshots import capture_screenshot
+from desktop_runner.runtime.attempts import compress_attempts
 from desktop_runner.runtime.run_state import get_run_state
 
 
@@ -23,6 +24,7 @@ class StepTraceBuilder:
     error_code: Optional[int] = None
     value: Optional[str] = None
     failed: Optional[List[Dict[str, Any]]] = None
+    not_evaluated: Optional[List[Dict[str, Any]]] = None
 
     def capture_before(self, enabled: bool) -> None:
         if not enabled:
@@ -42,14 +44,17 @@ class StepTraceBuilder:
 
     def finish(self) -> Dict[str, Any]:
         self.ended_at = self.ended_at or _now_iso()
+        match_attempts, truncated = compress_attempts(self.match_attempts)
         payload: Dict[str, Any] = {
             "run_id": self.run_id,
             "step_id": self.step_id,
             "started_at": self.started_at,
             "ended_at": self.ended_at,
             "ok": self.ok,
-            "match_attempts": self.match_attempts,
+            "match_attempts": match_attempts,
         }
+        if truncated is not None:
+            payload["match_attempts_truncated"] = truncated
         if self.resolved is not None:
             payload["resolved"] = self.resolved
         if self.before_screenshot_path:
@@ -64,6 +69,8 @@ class StepTraceBuilder:
             payload["value"] = self.value
         if self.failed is not None:
             payload["failed"] = self.failed
+        if self.not_evaluated is not None:
+            payload["not_evaluated"] = self.not_evaluated
         return payload
 
 
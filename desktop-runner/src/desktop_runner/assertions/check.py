@@ -1,33 +1,65 @@
 from __future__ import annotations
 
 import time
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
 from desktop_runner.actions.step_trace import StepTraceBuilder
-from desktop_runner.errors import AssertionFailed, DesktopRunnerError
+from desktop_runner.errors import AssertionFailed, DeadlineExceeded, DesktopRunnerError, RequestCancelled
+from desktop_runner.runtime.request_context import RequestContext, current_context
+from desktop_runner.selector.compile import SearchTrees
 from desktop_runner.selector.resolve import resolve_ladder
 from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.events import MIN_REEVALUATE_INTERVAL_S, change_notifier, poll_interval_s
+from desktop_runner.uia.protocol import DesktopAdapter
 from desktop_runner.windows import get_active_window_descriptor
 
+POLL_INTERVAL_S = 0.2
+
+Outcome = Tuple[bool, str, List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
 
 def check_assertions(
     params: Dict[str, Any],
-    adapter: Optional[UIAAdapter] = None,
+    adapter: Optional[DesktopAdapter] = None,
+    context: Optional[RequestContext] = None,
 ) -> Dict[str, Any]:
     adapter = adapter or UIAAdapter()
+    context = context or current_context()
     trace = StepTraceBuilder(run_id=params["run_id"], step_id=params["step_id"])
     failed: List[Dict[str, Any]] = []
     match_attempts: List[Dict[str, Any]] = []
     resolved: Optional[Dict[str, Any]] = None
     assertions = params.get("assertions") or []
+    waits = [AssertionWait(index, assertion) for index, assertion in enumerate(assertions)]
+    try:
+        passed = wait_for_assertions(waits, adapter, context, params.get("mode") or "all", params.get("timeout_ms"))
+    except (RequestCancelled, DeadlineExceeded) as exc:
+        match_attempts = [attempt for wait in waits for attempt in wait.attempts]
+        trace.match_attempts = match_attempts
+        trace.error = exc.message
+        trace.error_code = exc.code
+        exc.data = {"match_attempts": match_attempts, "trace": trace.finish()}
+        raise
 
-    for index, assertion in enumerate(assertions):
-        ok, message, attempts, resolved_element = _evaluate_with_timeout(assertion, adapter)
-        match_attempts.extend(attempts)
-        if resolved_element is not None:
-            resolved = resolved_element
-        if not ok:
-            failed.append({"index": index, "kind": assertion.get("kind"), "message": message})
+    not_evaluated: List[Dict[str, Any]] = []
+    for wait in waits:
+        match_attempts.extend(wait.attempts)
+        if wait.resolved is not None:
+            resolved = wait.resolved
+        if passed:
+            continue
+        if wait.ok is False:
+            failed.append({"index": wait.index, "kind": wait.assertion.get("kind"), "message": wait.message})
+        elif wait.pending:
+            not_evaluated.append(
+                {
+                    "index": wait.index,
+                    "kind": wait.assertion.get("kind"),
+                    "message": wait.message,
+                    "attempts": len(wait.attempts),
+                }
+            )
 
     trace.match_attempts = match_attempts
     trace.resolved = resolved
@@ -36,49 +68,133 @@ def check_assertions(
         trace.error = "Assertion failed"
         trace.error_code = AssertionFailed().code
         trace.failed = failed
-        raise AssertionFailed(data={"failed": failed, "trace": trace.finish()})
+        data: Dict[str, Any] = {"failed": failed}
+        if not_evaluated:
+            trace.not_evaluated = not_evaluated
+            data["not_evaluated"] = not_evaluated
+        data["trace"] = trace.finish()
+        raise AssertionFailed(data=data)
 
     trace.ok = True
     trace.failed = []
     return trace.finish()
 
 
-def _evaluate_with_timeout(
-    assertion: Dict[str, Any], adapter: UIAAdapter
-) -> Tuple[bool, str, List[Dict[str, Any]], Optional[Dict[str, Any]]]:
-    timeout_ms = assertion.get("timeout_ms")
-    deadline = time.monotonic() + (timeout_ms / 1000) if timeout_ms else None
-    last_message = "Assertion did not pass"
-    attempts: List[Dict[str, Any]] = []
+@dataclass
+class AssertionWait:
+    index: int
+    assertion: Dict[str, Any]
+    deadline: float = 0.0
+    ok: Optional[bool] = None
+    message: str = "Assertion did not pass"
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
     resolved: Optional[Dict[str, Any]] = None
 
+    @property
+    def pending(self) -> bool:
+        return self.ok is None
+
+
+def wait_for_assertions(
+    waits: List[AssertionWait],
+    adapter: DesktopAdapter,
+    context: RequestContext,
+    mode: str = "all",
+    timeout_ms: Optional[int] = None,
+) -> bool:
+    started_at = time.monotonic()
+    for wait in waits:
+        wait_ms = wait.assertion.get("timeout_ms") or timeout_ms or 0
+        wait.deadline = started_at + wait_ms / 1000
+    deadline = max((wait.deadline for wait in waits), default=started_at)
+    notifier = change_notifier(adapter, _shared_scope(waits)) if deadline > started_at else None
+    poll_s = poll_interval_s(notifier, POLL_INTERVAL_S)
+
     while True:
-        ok, message, new_attempts, new_resolved = _evaluate_once(assertion, adapter)
-        attempts.extend(new_attempts)
-        if new_resolved is not None:
-            resolved = new_resolved
-        if ok:
-            return True, "", attempts, resolved
-        last_message = message
-        if deadline is None or time.monotonic() >= deadline:
-            return False, last_message, attempts, resolved
-        time.sleep(0.2)
+        generation = notifier.generation if notifier is not None else 0
+        evaluated_at = time.monotonic()
+        pending = [wait for wait in waits if wait.pending]
+        outcomes = _evaluate_round(pending, adapter, context)
+        now = time.monotonic()
+        for wait, (ok, message, _, _) in zip(pending, outcomes):
+            if ok:
+                wait.ok = True
+                continue
+            wait.message = message
+            context.report_progress(assertion_kind=wait.assertion.get("kind"), message=message)
+            if now >= wait.deadline:
+                wait.ok = False
+
+        verdict = _verdict(waits, mode)
+        if verdict is not None:
+            return verdict
+        next_deadline = min(wait.deadline for wait in waits if wait.pending)
+        wait_s = min(poll_s, max(0.0, next_deadline - time.monotonic()))
+        if notifier is None:
+            context.sleep(wait_s)
+        elif context.wait_for_change(notifier, generation, wait_s):
+            settle = MIN_REEVALUATE_INTERVAL_S - (time.monotonic() - evaluated_at)
+            context.sleep(min(settle, max(0.0, next_deadline - time.monotonic())))
+
+
+def _shared_scope(waits: List[AssertionWait]) -> Optional[Dict[str, Any]]:
+    # Change events are subscribed per scope window; waits spanning several
+    # windows (or the whole desktop) poll instead.
+    scopes = []
+    for wait in waits:
+        assertion = wait.assertion
+        while assertion.get("kind") == "not" and isinstance(assertion.get("assert"), dict):
+            assertion = assertion["assert"]
+        scope = (assertion.get("target") or {}).get("scope")
+        if scope not in scopes:
+            scopes.append(scope)
+    return scopes[0] if len(scopes) == 1 else None
+
+
+def _verdict(waits: List[AssertionWait], mode: str) -> Optional[bool]:
+    if mode == "any":
+        if any(wait.ok is True for wait in waits):
+            return True
+        return False if all(wait.ok is False for wait in waits) else None
+    if any(wait.ok is False for wait in waits):
+        return False
+    return True if all(wait.ok is True for wait in waits) else None
+
+
+def _evaluate_round(waits: List[AssertionWait], adapter: DesktopAdapter, context: RequestContext) -> List[Outcome]:
+    trees = SearchTrees(adapter)
+    outcomes: List[Outcome] = []
+    for wait in waits:
+        try:
+            outcome = _evaluate_once(wait.assertion, adapter, context, trees)
+        except (RequestCancelled, DeadlineExceeded) as exc:
+            wait.attempts.extend(exc.data.get("match_attempts", []) if exc.data else [])
+            raise
+        wait.attempts.extend(outcome[2])
+        if outcome[3] is not None:
+            wait.resolved = outcome[3]
+        outcomes.append(outcome)
+    return outcomes
 
 
 def _evaluate_once(
-    assertion: Dict[str, Any], adapter: UIAAdapter
-) -> Tuple[bool, str, List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    assertion: Dict[str, Any],
+    adapter: DesktopAdapter,
+    context: Optional[RequestContext] = None,
+    trees: Optional[SearchTrees] = None,
+) -> Outcome:
+    context = context or current_context()
     kind = assertion.get("kind")
     if kind == "not":
         nested = assertion.get("assert")
         if not isinstance(nested, dict):
             return False, "Missing nested assertion for not", [], None
-        ok, _, attempts, resolved = _evaluate_once(nested, adapter)
+        ok, _, attempts, resolved = _evaluate_once(nested, adapter, context, trees)
         return (not ok, "Negated assertion failed" if ok else "", attempts, resolved)
 
     if kind == "desktop_window_active":
         scope = (assertion.get("target") or {}).get("scope")
-        active = get_active_window_descriptor()
+        active = _active_window(adapter)
         if not _matches_scope(active, scope):
             return False, "Active window did not match scope", [], None
         return True, "", [], None
@@ -89,8 +205,15 @@ def _evaluate_once(
             return False, "Missing target for element assertion", [], None
         try:
             resolved, match_attempts, element = resolve_ladder(
-                target, adapter=adapter, return_element=True, timeout_ms=assertion.get("timeout_ms")
+                target,
+                adapter=adapter,
+                return_element=True,
+                timeout_ms=assertion.get("timeout_ms"),
+                context=context,
+                trees=trees,
             )
+        except (RequestCancelled, DeadlineExceeded):
+            raise
         except DesktopRunnerError as exc:
             return False, exc.message, exc.data.get("match_attempts", []) if exc.data else [], None
         if element is None:
@@ -113,8 +236,15 @@ def _evaluate_once(
             return False, "Missing target for value assertion", [], None
         try:
             resolved, match_attempts, element = resolve_ladder(
-                target, adapter=adapter, return_element=True, timeout_ms=assertion.get("timeout_ms")
+                target,
+                adapter=adapter,
+                return_element=True,
+                timeout_ms=assertion.get("timeout_ms"),
+                context=context,
+                trees=trees,
             )
+        except (RequestCancelled, DeadlineExceeded):
+            raise
         except DesktopRunnerError as exc:
             return False, exc.message, exc.data.get("match_attempts", []) if exc.data else [], None
         value = adapter.get_value(element)
@@ -127,6 +257,13 @@ def _evaluate_once(
     return False, f"Unsupported assertion kind: {kind}", [], None
 
 
+def _active_window(adapter: DesktopAdapter) -> Optional[Dict[str, Any]]:
+    describe_active = getattr(adapter, "get_active_window_descriptor", None)
+    if describe_active is not None:
+        return describe_active()
+    return get_active_window_descriptor()
+
+
 def _matches_scope(active: Optional[Dict[str, Any]], scope: Optional[Dict[str, Any]]) -> bool:
     if active is None:
         return False
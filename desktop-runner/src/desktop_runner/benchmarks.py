@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from desktop_runner.assertions.check import check_assertions
+from desktop_runner.errors import AmbiguousMatch, AssertionFailed
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.synthetic import SyntheticDesktop
+
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_SIZES = (1000, 10000, 50000)
+QUICK_SIZES = (200, 1000)
+NEAR_LABEL_DENSITIES = ((10, 1), (50, 4), (200, 8))
+QUICK_NEAR_LABEL_DENSITIES = ((10, 1), (20, 4))
+FORM_ROW_HEIGHT = 30
+FORM_COLUMN_WIDTH = 120
+SCOPE = {"window_title_contains": "Synthetic Window 0"}
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[], Any]
+    desktop: Optional[SyntheticDesktop] = None
+    setup: Optional[Callable[[], Any]] = None
+
+
+def measure(benchmark: Benchmark, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    timings: List[float] = []
+    reads: List[int] = []
+    for _ in range(max(repeat, 1)):
+        if benchmark.setup is not None:
+            benchmark.setup()
+        before = sum(benchmark.desktop.reads.values()) if benchmark.desktop is not None else 0
+        started = time.perf_counter()
+        benchmark.run()
+        timings.append((time.perf_counter() - started) * 1000)
+        if benchmark.desktop is not None:
+            reads.append(sum(benchmark.desktop.reads.values()) - before)
+    result: Dict[str, Any] = {
+        "runs": len(timings),
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "max_ms": round(max(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+    }
+    if reads:
+        result["property_reads"] = int(statistics.median(reads))
+    return result
+
+
+def run_benchmarks(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    densities: Sequence[Sequence[int]] = NEAR_LABEL_DENSITIES,
+    repeat: int = DEFAULT_REPEAT,
+    latency_us: float = 0.0,
+    only: Optional[str] = None,
+) -> Dict[str, Any]:
+    latency = {"*": latency_us / 1_000_000} if latency_us else None
+    benchmarks = build_benchmarks(sizes, densities, latency)
+    results: Dict[str, Dict[str, Any]] = {}
+    for benchmark in benchmarks:
+        if only and only not in benchmark.name:
+            continue
+        results[benchmark.name] = measure(benchmark, repeat)
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "sizes": list(sizes),
+            "densities": [list(density) for density in densities],
+            "repeat": repeat,
+            "latency_us": latency_us,
+        },
+        "results": results,
+    }
+
+
+def build_benchmarks(
+    sizes: Sequence[int],
+    densities: Sequence[Sequence[int]],
+    latency: Optional[Dict[str, float]] = None,
+) -> List[Benchmark]:
+    benchmarks: List[Benchmark] = []
+    largest = SyntheticDesktop.generate(nodes=max(sizes), latency=latency)
+    benchmarks.extend(_resolve_benchmarks(largest, max(sizes)))
+    for size in sizes:
+        desktop = largest if size == max(sizes) else SyntheticDesktop.generate(nodes=size, latency=latency)
+        benchmarks.extend(_find_uia_benchmarks(desktop, size))
+    for labels, targets in densities:
+        benchmarks.append(_near_label_benchmark(labels, targets, latency))
+    benchmarks.extend(_assertion_benchmarks(min(sizes), latency))
+    benchmarks.extend(_request_benchmarks(min(sizes), latency))
+    return benchmarks
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> Dict[str, Any]:
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    baseline_results = baseline.get("results") or {}
+    current_results = current.get("results") or {}
+    for name, result in current_results.items():
+        previous = baseline_results.get(name)
+        if previous is None:
+            rows.append({"name": name, "status": "new", "current_ms": result["median_ms"]})
+            continue
+        ratio = result["median_ms"] / previous["median_ms"] if previous["median_ms"] else 1.0
+        status = "ok"
+        if ratio > 1 + threshold:
+            status = "regression"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        rows.append(
+            {
+                "name": name,
+                "status": status,
+                "baseline_ms": previous["median_ms"],
+                "current_ms": result["median_ms"],
+                "ratio": round(ratio, 3),
+            }
+        )
+    missing = [name for name in baseline_results if name not in current_results]
+    return {"threshold": threshold, "rows": rows, "regressions": regressions, "missing": missing}
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    lines = [f"{'benchmark':<44} {'baseline':>10} {'current':>10} {'ratio':>7}  status"]
+    for row in comparison["rows"]:
+        baseline = f"{row['baseline_ms']:.3f}" if "baseline_ms" in row else "-"
+        ratio = f"{row['ratio']:.2f}" if "ratio" in row else "-"
+        lines.append(f"{row['name']:<44} {baseline:>10} {row['current_ms']:>10.3f} {ratio:>7}  {row['status']}")
+    for name in comparison["missing"]:
+        lines.append(f"{name:<44} {'':>10} {'-':>10} {'-':>7}  missing")
+    return "\n".join(lines)
+
+
+def _target(*rungs: Dict[str, Any]) -> Dict[str, Any]:
+    return {"scope": SCOPE, "ladder": list(rungs)}
+
+
+def _uia(**selector: Any) -> Dict[str, Any]:
+    return {"kind": "uia", "selector": selector}
+
+
+def _last_edit(nodes: int) -> str:
+    number = nodes if nodes % 2 else nodes - 1
+    return f"edit{number}"
+
+
+def _last_label(nodes: int) -> int:
+    return (nodes - 1) - (nodes - 1) % 8
+
+
+def _resolve_benchmarks(desktop: SyntheticDesktop, size: int) -> List[Benchmark]:
+    edit = _last_edit(size)
+    label = _last_label(size)
+    first_rung = _target(_uia(automationId=edit))
+    deep_fallback = _target(
+        _uia(automationId="missing-1"),
+        _uia(automationId="missing-2", controlType="Edit"),
+        {"kind": "uia_path", "selector": {"path": [{"automationId": "missing-pane"}, {"controlType": "Edit"}]}},
+        {
+            "kind": "uia_near_label",
+            "selector": {"label": f"Label {label}", "controlType": "Edit", "maxDistancePx": 240},
+        },
+    )
+    ambiguous = _target(_uia(controlType="Edit"))
+
+    def resolve_ambiguous() -> None:
+        try:
+            resolve_ladder(ambiguous, adapter=desktop)
+        except AmbiguousMatch:
+            return
+        raise RuntimeError("ambiguous benchmark target resolved")
+
+    return [
+        Benchmark(f"resolve_ladder.first_rung[{size}]", lambda: resolve_ladder(first_rung, adapter=desktop), desktop),
+        Benchmark(
+            f"resolve_ladder.deep_fallback[{size}]", lambda: resolve_ladder(deep_fallback, adapter=desktop), desktop
+        ),
+        Benchmark(f"resolve_ladder.ambiguous[{size}]", resolve_ambiguous, desktop),
+    ]
+
+
+def _find_uia_benchmarks(desktop: SyntheticDesktop, size: int) -> List[Benchmark]:
+    window = desktop.windows()[0]
+    by_id = {"automationId": _last_edit(size)}
+    by_type = {"controlType": "Text"}
+
+    def indexed() -> None:
+        snapshot = desktop.snapshot(window)
+        desktop.find_uia(snapshot, by_id)
+        desktop.find_uia(snapshot, by_type)
+
+    return [
+        Benchmark(f"find_uia.automation_id[{size}]", lambda: desktop.find_uia(window, by_id), desktop),
+        Benchmark(f"find_uia.control_type[{size}]", lambda: desktop.find_uia(window, by_type), desktop),
+        Benchmark(f"find_uia.snapshot_two_queries[{size}]", indexed, desktop),
+    ]
+
+
+def _near_label_benchmark(labels: int, targets: int, latency: Optional[Dict[str, float]]) -> Benchmark:
+    desktop = SyntheticDesktop(form_dump(labels, targets), latency=latency)
+    window = desktop.windows()[0]
+    selector = {"label": f"Field {labels // 2}", "controlType": "Edit", "maxDistancePx": 120}
+
+    def run() -> None:
+        matches = desktop.find_uia_near_label(window, selector)
+        if not matches:
+            raise RuntimeError("near-label benchmark target not found")
+
+    return Benchmark(f"find_uia_near_label[labels={labels},targets={targets}]", run, desktop)
+
+
+def form_dump(labels: int, targets_per_label: int) -> Dict[str, Any]:
+    children: List[Dict[str, Any]] = []
+    for row in range(labels):
+        top = row * FORM_ROW_HEIGHT
+        children.append(
+            {"control_type": "Text", "name": f"Field {row}", "rect": [0, top, FORM_COLUMN_WIDTH - 10, top + 20]}
+        )
+        for column in range(1, targets_per_label + 1):
+            left = column * FORM_COLUMN_WIDTH
+            children.append(
+                {
+                    "control_type": "Edit",
+                    "automation_id": f"field{row}_{column}",
+                    "rect": [left, top, left + FORM_COLUMN_WIDTH - 10, top + 20],
+                }
+            )
+    width = (targets_per_label + 1) * FORM_COLUMN_WIDTH
+    window = {
+        "name": "Synthetic Window 0",
+        "process_name": "synthetic.exe",
+        "rect": [0, 0, width, labels * FORM_ROW_HEIGHT],
+        "children": children,
+    }
+    return {"windows": [window]}
+
+
+def _assertion_benchmarks(size: int, latency: Optional[Dict[str, float]]) -> List[Benchmark]:
+    desktop = SyntheticDesktop.generate(nodes=size, latency=latency)
+    window = desktop.windows()[0]
+    edit = _last_edit(size)
+    passing = {
+        "run_id": "bench",
+        "step_id": "passing",
+        "assertions": [
+            {"kind": "desktop_window_active", "target": {"scope": SCOPE}, "timeout_ms": 1000},
+            {"kind": "desktop_element_exists", "target": _target(_uia(automationId=edit)), "timeout_ms": 1000},
+            {
+                "kind": "desktop_value_contains",
+                "target": _target(_uia(automationId=edit)),
+                "value": "value",
+                "timeout_ms": 1000,
+            },
+        ],
+    }
+    appearing = {
+        "run_id": "bench",
+        "step_id": "appearing",
+        "assertions": [
+            {
+                "kind": "desktop_element_exists",
+                "target": _target(_uia(automationId="bench-dialog")),
+                "timeout_ms": 2000,
+            }
+        ],
+    }
+    failing = {
+        "run_id": "bench",
+        "step_id": "failing",
+        "assertions": [
+            {"kind": "desktop_element_exists", "target": _target(_uia(automationId="never")), "timeout_ms": 100}
+        ],
+    }
+
+    def reset_dialog() -> None:
+        for child in window.children():
+            if child.fields.get("automation_id") == "bench-dialog":
+                desktop.remove(child)
+        dialog = {"control_type": "Window", "automation_id": "bench-dialog"}
+        threading.Timer(0.02, desktop.add_child, args=(window, dialog)).start()
+
+    def run_failing() -> None:
+        try:
+            check_assertions(failing, adapter=desktop)
+        except AssertionFailed:
+            return
+        raise RuntimeError("failing assertion benchmark passed")
+
+    return [
+        Benchmark(f"check_assertions.passing[{size}]", lambda: check_assertions(passing, adapter=desktop), desktop),
+        Benchmark(
+            f"check_assertions.appears_after_20ms[{size}]",
+            lambda: check_assertions(appearing, adapter=desktop),
+            desktop,
+            setup=reset_dialog,
+        ),
+        Benchmark(f"check_assertions.timeout_100ms[{size}]", run_failing, desktop),
+    ]
+
+
+def _request_benchmarks(size: int, latency: Optional[Dict[str, float]]) -> List[Benchmark]:
+    from desktop_runner import server
+    from desktop_runner.uia.manager import AdapterManager
+
+    desktop = SyntheticDesktop.generate(nodes=size, latency=latency)
+    adapters = AdapterManager(factory=lambda: desktop)
+    ping = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "system.ping", "params": {}})
+    resolve = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": 2,
+            "method": "target.resolve",
+            "params": {"target": _target(_uia(automationId=_last_edit(size)))},
+        }
+    )
+
+    def round_trip(message: str) -> Callable[[], Any]:
+        def run() -> None:
+            previous, server.ADAPTERS = server.ADAPTERS, adapters
+            try:
+                response = server.handle_request(json.loads(message))
+            finally:
+                server.ADAPTERS = previous
+            if "error" in response:
+                raise RuntimeError(response["error"]["message"])
+            json.dumps(response)
+
+        return run
+
+    return [
+        Benchmark("handle_request.ping", round_trip(ping)),
+        Benchmark(f"handle_request.target_resolve[{size}]", round_trip(resolve), desktop),
+    ]
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _write(path: str, payload: Dict[str, Any]) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+        handle.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="desktop_runner.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmarks against synthetic desktops")
+    run.add_argument("--output", default="benchmarks/results.json")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run.add_argument("--sizes", type=int, nargs="+", help="generated tree sizes for find_uia")
+    run.add_argument("--latency-us", type=float, default=0.0, help="injected cost per property read")
+    run.add_argument("--quick", action="store_true", help="small trees, for smoke runs")
+    run.add_argument("--only", help="run benchmarks whose name contains this text")
+    run.add_argument("--baseline", help="compare against this results file after running")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    compare = commands.add_parser("compare", help="flag regressions between two results files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+        densities = QUICK_NEAR_LABEL_DENSITIES if args.quick else NEAR_LABEL_DENSITIES
+        current = run_benchmarks(sizes, densities, args.repeat, args.latency_us, args.only)
+        _write(args.output, current)
+        print(f"Wrote {len(current['results'])} results to {args.output}")
+        if not args.baseline:
+            return 0
+        baseline = _load(args.baseline)
+    else:
+        baseline = _load(args.baseline)
+        current = _load(args.current)
+
+    comparison = compare_results(baseline, current, args.threshold)
+    print(format_comparison(comparison))
+    if comparison["regressions"]:
+        print(f"{len(comparison['regressions'])} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
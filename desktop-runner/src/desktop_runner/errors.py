@@ -44,3 +44,13 @@ class TimeoutError(DesktopRunnerError):
 class OcrUnavailable(DesktopRunnerError):
     def __init__(self, message: str = "OCR requested but unavailable", data: Optional[Dict[str, Any]] = None) -> None:
         super().__init__(1006, message, data)
+
+
+class DeadlineExceeded(TimeoutError):
+    def __init__(self, message: str = "Request deadline exceeded", data: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(message, data)
+
+
+class RequestCancelled(DesktopRunnerError):
+    def __init__(self, message: str = "Request cancelled", data: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(1007, message, data)
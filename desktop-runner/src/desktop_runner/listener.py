@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, BinaryIO, Callable, Optional, Tuple, Union
+
+from desktop_runner.runtime.dispatcher import RequestDispatcher
+from desktop_runner.runtime.request_context import ClientConnection
+from desktop_runner.transport import Transport, TransportError
+
+DEFAULT_MAX_PENDING = 32
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_listen_address(value: str) -> Tuple[str, Address]:
+    scheme, _, rest = value.partition(":")
+    if scheme == "unix" and rest:
+        return "unix", rest
+    if scheme == "tcp" and rest:
+        host, _, port = rest.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Invalid tcp listen address: {value}")
+        return "tcp", (host, int(port))
+    raise ValueError(f"Listen address must be unix:<path> or tcp:<host>:<port>, got {value}")
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    server: "_ListenerMixin"
+
+    def handle(self) -> None:
+        self.server.listener.serve_connection(self.rfile, self.wfile)
+
+
+class _ListenerMixin:
+    listener: "RequestListener"
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _TcpServer(_ListenerMixin, socketserver.ThreadingTCPServer):
+    pass
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class _UnixServer(_ListenerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+
+
+class RequestListener:
+    def __init__(
+        self,
+        listen: str,
+        dispatcher: RequestDispatcher,
+        transport: Transport,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        on_parse_error: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.transport = transport
+        self.max_pending = max_pending
+        self._on_parse_error = on_parse_error
+        self._connections = 0
+        self._connections_lock = threading.Lock()
+
+        family, address = parse_listen_address(listen)
+        self.family = family
+        if family == "unix":
+            if not hasattr(socket, "AF_UNIX"):
+                raise ValueError("Unix-domain sockets are not supported on this platform")
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server: socketserver.BaseServer = _UnixServer(address, _ConnectionHandler)
+        else:
+            self._server = _TcpServer(address, _ConnectionHandler)
+        self._server.listener = self
+
+    @property
+    def address(self) -> Address:
+        return self._server.server_address
+
+    @property
+    def active_connections(self) -> int:
+        return self._connections
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self.family == "unix" and isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def serve_connection(self, rfile: BinaryIO, wfile: BinaryIO) -> None:
+        pending = threading.BoundedSemaphore(self.max_pending)
+        connection = ClientConnection()
+        write_lock = threading.Lock()
+
+        def write(response: Any) -> None:
+            with write_lock:
+                try:
+                    self.transport.write_message(wfile, response)
+                except OSError:
+                    return
+
+        with self._connections_lock:
+            self._connections += 1
+        try:
+            for frame in self.transport.read_frames(rfile):
+                try:
+                    payload = self.transport.decode(frame)
+                except TransportError:
+                    if self._on_parse_error is not None:
+                        write(self._on_parse_error())
+                    continue
+                pending.acquire()
+                self.dispatcher.submit(payload, write=write, on_done=pending.release, connection=connection)
+        except (OSError, TransportError):
+            pass
+        finally:
+            for _ in range(self.max_pending):
+                pending.acquire()
+            with self._connections_lock:
+                self._connections -= 1
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_MATCH_ATTEMPTS = 200
+DURATION_FIELDS = ("count", "duration_ms", "min_duration_ms", "max_duration_ms")
+
+_max_match_attempts: Optional[int] = DEFAULT_MAX_MATCH_ATTEMPTS
+
+
+def set_max_match_attempts(limit: Optional[int]) -> None:
+    global _max_match_attempts
+    _max_match_attempts = limit if limit else None
+
+
+def max_match_attempts() -> Optional[int]:
+    return _max_match_attempts
+
+
+def compress_attempts(
+    attempts: Iterable[Dict[str, Any]],
+    limit: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    entries: List[Dict[str, Any]] = []
+    for attempt in attempts:
+        previous = entries[-1] if entries else None
+        if previous is not None and _same_attempt(previous, attempt):
+            _merge(previous, attempt)
+        else:
+            entries.append(dict(attempt))
+    return _truncate(entries, limit if limit is not None else _max_match_attempts)
+
+
+def attempt_totals(
+    entries: Iterable[Dict[str, Any]],
+    truncated: Optional[Dict[str, Any]] = None,
+) -> Dict[str, int]:
+    attempts = 0
+    duration_ms = 0
+    for entry in entries:
+        attempts += entry.get("count", 1)
+        duration_ms += entry.get("duration_ms", 0)
+    if truncated is not None:
+        attempts += truncated["attempts"]
+        duration_ms += truncated["duration_ms"]
+    return {"attempts": attempts, "duration_ms": duration_ms}
+
+
+def _same_attempt(left: Dict[str, Any], right: Dict[str, Any]) -> bool:
+    keys = (set(left) | set(right)).difference(DURATION_FIELDS)
+    return all(left.get(key) == right.get(key) for key in keys)
+
+
+def _merge(entry: Dict[str, Any], attempt: Dict[str, Any]) -> None:
+    duration = attempt.get("duration_ms", 0)
+    entry_duration = entry.get("duration_ms", 0)
+    entry["min_duration_ms"] = min(
+        entry.get("min_duration_ms", entry_duration), attempt.get("min_duration_ms", duration)
+    )
+    entry["max_duration_ms"] = max(
+        entry.get("max_duration_ms", entry_duration), attempt.get("max_duration_ms", duration)
+    )
+    entry["count"] = entry.get("count", 1) + attempt.get("count", 1)
+    entry["duration_ms"] = entry_duration + duration
+
+
+def _truncate(
+    entries: List[Dict[str, Any]],
+    limit: Optional[int],
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    if not limit or len(entries) <= limit:
+        return entries, None
+    head = limit // 2
+    tail = limit - head
+    omitted = entries[head : len(entries) - tail]
+    totals = attempt_totals(omitted)
+    marker = {
+        "after_index": head,
+        "entries": len(omitted),
+        "attempts": totals["attempts"],
+        "duration_ms": totals["duration_ms"],
+    }
+    return entries[:head] + entries[len(entries) - tail :], marker
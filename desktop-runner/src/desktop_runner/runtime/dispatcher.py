@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from desktop_runner.runtime.request_context import ClientConnection, use_connection, use_notifier
+
+DEFAULT_MAX_WORKERS = 8
+COINIT_MULTITHREADED = 0
+
+LOGGER = logging.getLogger(__name__)
+
+DESKTOP_KEY = "desktop"
+
+_INLINE_METHODS = {"$/cancelRequest"}
+
+_UNSCOPED_METHODS = {
+    "system.ping",
+    "system.getCapabilities",
+    "system.getAdapterStats",
+    "system.getMetrics",
+    "run.begin",
+    "run.end",
+    "profile.start",
+    "profile.stop",
+    "artifact.screenshot",
+}
+
+# These drive the shared mouse, keyboard, clipboard or foreground window, so they
+# also take the desktop-wide key and never overlap even on different scopes.
+_INPUT_METHODS = {
+    "action.click",
+    "action.pasteText",
+    "action.setValue",
+    "window.focus",
+}
+
+
+@dataclass
+class _Task:
+    payload: Any
+    keys: Tuple[str, ...]
+    connection: ClientConnection
+    request_ids: Tuple[Any, ...] = ()
+    write: Optional[Callable[[Any], None]] = None
+    on_done: Optional[Callable[[], None]] = None
+    started: bool = False
+
+
+@dataclass
+class _KeyedQueues:
+    pending: Dict[str, Deque[_Task]] = field(default_factory=dict)
+
+    def enqueue(self, task: _Task) -> bool:
+        for key in task.keys:
+            self.pending.setdefault(key, deque()).append(task)
+        return self.is_runnable(task)
+
+    def is_runnable(self, task: _Task) -> bool:
+        return not task.started and all(self.pending[key][0] is task for key in task.keys)
+
+    def release(self, task: _Task) -> List[_Task]:
+        heads: List[_Task] = []
+        for key in task.keys:
+            queue = self.pending[key]
+            queue.popleft()
+            if not queue:
+                del self.pending[key]
+                continue
+            head = queue[0]
+            if head not in heads and self.is_runnable(head):
+                heads.append(head)
+        return heads
+
+
+class RequestDispatcher:
+    def __init__(
+        self,
+        handle: Callable[[Any], Optional[Any]],
+        write: Callable[[Any], None],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        self._handle = handle
+        self._write = write
+        self._write_lock = threading.Lock()
+        self._queues = _KeyedQueues()
+        self._queues_lock = threading.Lock()
+        self._connection = ClientConnection()
+        self._outstanding = 0
+        self._idle = threading.Condition()
+        use_multithreaded_com()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="desktop-runner",
+            initializer=_init_worker_thread,
+        )
+
+    def submit(
+        self,
+        payload: Any,
+        write: Optional[Callable[[Any], None]] = None,
+        on_done: Optional[Callable[[], None]] = None,
+        connection: Optional[ClientConnection] = None,
+    ) -> None:
+        connection = connection or self._connection
+        if isinstance(payload, dict) and payload.get("method") in _INLINE_METHODS:
+            with use_connection(connection):
+                self._handle(payload)
+            if on_done is not None:
+                on_done()
+            return
+        task = _Task(
+            payload=payload,
+            keys=request_scope_keys(payload),
+            connection=connection,
+            request_ids=request_ids(payload),
+            write=write,
+            on_done=on_done,
+        )
+        connection.enqueue(task.request_ids)
+        with self._idle:
+            self._outstanding += 1
+        if not task.keys:
+            self._start(task)
+            return
+        with self._queues_lock:
+            runnable = self._queues.enqueue(task)
+            if runnable:
+                task.started = True
+        if runnable:
+            self._start(task)
+
+    def write(self, response: Any) -> None:
+        with self._write_lock:
+            self._write(response)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if wait:
+            with self._idle:
+                self._idle.wait_for(lambda: self._outstanding == 0)
+        self._executor.shutdown(wait=wait)
+
+    def _start(self, task: _Task) -> None:
+        self._executor.submit(self._run, task)
+
+    def _run(self, task: _Task) -> None:
+        try:
+            write = task.write or self.write
+            try:
+                with use_notifier(write), use_connection(task.connection):
+                    response = self._handle(task.payload)
+            finally:
+                # Settle before writing so a late cancel for this id is dropped
+                # rather than held for the next request that reuses it.
+                task.connection.settle(task.request_ids)
+            if response is not None:
+                write(response)
+        finally:
+            if task.keys:
+                self._release(task)
+            if task.on_done is not None:
+                task.on_done()
+            with self._idle:
+                self._outstanding -= 1
+                self._idle.notify_all()
+
+    def _release(self, task: _Task) -> None:
+        with self._queues_lock:
+            ready = self._queues.release(task)
+            for next_task in ready:
+                next_task.started = True
+        for next_task in ready:
+            self._start(next_task)
+
+
+def request_ids(payload: Any) -> Tuple[Any, ...]:
+    entries = payload if isinstance(payload, list) else [payload]
+    return tuple(
+        entry["id"]
+        for entry in entries
+        if isinstance(entry, dict) and isinstance(entry.get("id"), (str, int)) and "method" in entry
+    )
+
+
+def request_scope_keys(payload: Any) -> Tuple[str, ...]:
+    if isinstance(payload, list):
+        keys = {key for entry in payload for key in request_scope_keys(entry)}
+        return tuple(sorted(keys))
+    if not isinstance(payload, dict):
+        return ()
+    method = payload.get("method")
+    if not isinstance(method, str) or method in _UNSCOPED_METHODS:
+        return ()
+    params = payload.get("params")
+    if not isinstance(params, dict):
+        return ()
+
+    scopes: List[Any] = []
+    if "scope" in params:
+        scopes.append(params.get("scope"))
+    target = params.get("target")
+    if isinstance(target, dict):
+        scopes.append(target.get("scope"))
+    for assertion in params.get("assertions") or []:
+        if isinstance(assertion, dict):
+            scopes.append((assertion.get("target") or {}).get("scope"))
+
+    keys = {scope_key(scope) for scope in scopes}
+    if not keys or method in _INPUT_METHODS:
+        keys.add(DESKTOP_KEY)
+    return tuple(sorted(keys))
+
+
+def scope_key(scope: Any) -> str:
+    if not isinstance(scope, dict) or not scope:
+        return DESKTOP_KEY
+    normalized = {key: str(value).lower() for key, value in scope.items() if value}
+    return "scope:" + json.dumps(normalized, sort_keys=True)
+
+
+def use_multithreaded_com() -> None:
+    # comtypes initializes COM in whichever thread imports it first, using
+    # sys.coinit_flags (STA when unset). Workers must all join the MTA, so the
+    # flag has to be in place before any of them imports comtypes or pywinauto.
+    if os.name == "nt":
+        sys.coinit_flags = COINIT_MULTITHREADED  # type: ignore[attr-defined]
+
+
+class _ComApartment:
+    # Held in thread-local storage so it is released, and COM uninitialized, on
+    # the worker thread itself when that thread exits.
+    def __init__(self, comtypes: Any) -> None:
+        self._comtypes = comtypes
+
+    def __del__(self) -> None:
+        try:
+            self._comtypes.CoUninitialize()
+        except Exception:
+            pass
+
+
+_WORKER_STATE = threading.local()
+
+
+def _init_worker_thread() -> None:
+    if os.name != "nt":
+        return
+    try:
+        import comtypes
+
+        comtypes.CoInitializeEx(COINIT_MULTITHREADED)
+    except Exception:
+        LOGGER.exception("Could not join the COM multithreaded apartment on %s", threading.current_thread().name)
+        return
+    _WORKER_STATE.apartment = _ComApartment(comtypes)
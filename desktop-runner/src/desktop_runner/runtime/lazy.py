@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Any, Callable, Optional
+
+
+class LazyCallable:
+    def __init__(self, module: str, name: str) -> None:
+        self.module = module
+        self.name = name
+        self._target: Optional[Callable[..., Any]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def resolve(self) -> Callable[..., Any]:
+        target = self._target
+        if target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = getattr(importlib.import_module(self.module), self.name)
+                target = self._target
+        return target
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyCallable({self.module}:{self.name})"
+
+
+def lazy_callable(module: str, name: str) -> LazyCallable:
+    return LazyCallable(module, name)
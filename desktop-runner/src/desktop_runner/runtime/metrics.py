@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKET_COUNT = 1 << _SUB_BUCKET_BITS
+
+PERCENTILES = (50.0, 90.0, 99.0)
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+    mantissa = value >> shift
+    return _SUB_BUCKET_COUNT + shift * _SUB_BUCKET_COUNT + (mantissa - _SUB_BUCKET_COUNT)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    shift, offset = divmod(index - _SUB_BUCKET_COUNT, _SUB_BUCKET_COUNT)
+    mantissa = _SUB_BUCKET_COUNT + offset
+    return ((mantissa + 1) << shift) - 1
+
+
+@dataclass
+class LatencyHistogram:
+    counts: Dict[int, int] = field(default_factory=dict)
+    count: int = 0
+    total_us: int = 0
+    min_us: Optional[int] = None
+    max_us: int = 0
+
+    def record(self, duration_s: float) -> None:
+        value = max(0, int(duration_s * 1_000_000))
+        index = _bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        self.max_us = max(self.max_us, value)
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+
+    def percentile_us(self, percentile: float) -> int:
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_upper_bound(index), self.max_us)
+        return self.max_us
+
+    def summary(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "count": self.count,
+            "mean_ms": _ms(self.total_us / self.count) if self.count else 0.0,
+            "min_ms": _ms(self.min_us or 0),
+            "max_ms": _ms(self.max_us),
+        }
+        for percentile in PERCENTILES:
+            payload[f"p{int(percentile)}_ms"] = _ms(self.percentile_us(percentile))
+        return payload
+
+
+@dataclass
+class _MethodMetrics:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        payload = self.latency.summary()
+        payload["error_count"] = sum(self.errors.values())
+        payload["errors"] = dict(self.errors)
+        return payload
+
+
+@dataclass
+class _RungMetrics:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    matched: int = 0
+    ambiguous: int = 0
+    missed: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        payload = self.latency.summary()
+        payload.update({"matched": self.matched, "ambiguous": self.ambiguous, "missed": self.missed})
+        return payload
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodMetrics] = {}
+        self._rungs: Dict[str, _RungMetrics] = {}
+        self._property_reads = _property_counters()
+        self._since = time.time()
+
+    def record_request(self, method: str, duration_s: float, error_code: Optional[int] = None) -> None:
+        with self._lock:
+            metrics = self._methods.setdefault(method, _MethodMetrics())
+            metrics.latency.record(duration_s)
+            if error_code is not None:
+                key = str(error_code)
+                metrics.errors[key] = metrics.errors.get(key, 0) + 1
+
+    def record_rung(self, kind: str, duration_s: float, matched_count: int) -> None:
+        with self._lock:
+            metrics = self._rungs.setdefault(str(kind), _RungMetrics())
+            metrics.latency.record(duration_s)
+            if matched_count == 1:
+                metrics.matched += 1
+            elif matched_count > 1:
+                metrics.ambiguous += 1
+            else:
+                metrics.missed += 1
+
+    def record_property_reads(self, count: int = 1) -> None:
+        with self._lock:
+            self._property_reads["remote"] += count
+
+    def record_prefetch(self, elements: int) -> None:
+        with self._lock:
+            self._property_reads["prefetch_calls"] += 1
+            self._property_reads["prefetched_elements"] += elements
+
+    def property_reads(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._property_reads)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "since": self._since,
+                "methods": {name: metrics.summary() for name, metrics in sorted(self._methods.items())},
+                "rungs": {kind: metrics.summary() for kind, metrics in sorted(self._rungs.items())},
+                "property_reads": dict(self._property_reads),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self._rungs.clear()
+            self._property_reads = _property_counters()
+            self._since = time.time()
+
+
+def _property_counters() -> Dict[str, int]:
+    return {"remote": 0, "prefetch_calls": 0, "prefetched_elements": 0}
+
+
+def _ms(value_us: float) -> float:
+    return round(value_us / 1000, 3)
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+PROFILE_MODES = ("cprofile", "sampling", "both")
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+MAX_STACK_DEPTH = 128
+
+
+@dataclass
+class _Session:
+    run_id: str
+    mode: str
+    output_dir: Path
+    interval_s: float
+    started_at: float = field(default_factory=time.monotonic)
+    profiles: List[Any] = field(default_factory=list)
+    stacks: Counter = field(default_factory=Counter)
+    samples: int = 0
+    profiled_requests: int = 0
+    skipped_requests: int = 0
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    sampler: Optional[threading.Thread] = None
+    timer: Optional[threading.Timer] = None
+
+    @property
+    def cprofile(self) -> bool:
+        return self.mode in ("cprofile", "both")
+
+    @property
+    def sampling(self) -> bool:
+        return self.mode in ("sampling", "both")
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self._session: Optional[_Session] = None
+        self._lock = threading.Lock()
+        self._last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def start(
+        self,
+        run_id: str,
+        output_dir: Path,
+        mode: str = "both",
+        interval_ms: int = DEFAULT_SAMPLE_INTERVAL_MS,
+        duration_ms: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+        with self._lock:
+            if self._session is not None:
+                raise ProfilerBusy(f"Profiler already running for run {self._session.run_id}")
+            session = _Session(
+                run_id=run_id,
+                mode=mode,
+                output_dir=output_dir,
+                interval_s=max(interval_ms, 1) / 1000,
+            )
+            if session.sampling:
+                session.sampler = threading.Thread(
+                    target=self._sample_loop, args=(session,), name="desktop-runner-profiler", daemon=True
+                )
+                session.sampler.start()
+            if duration_ms:
+                session.timer = threading.Timer(duration_ms / 1000, self._stop_session, args=(session,))
+                session.timer.daemon = True
+                session.timer.start()
+            self._session = session
+        return {"ok": True, "run_id": run_id, "mode": mode}
+
+    def stop(self) -> Dict[str, Any]:
+        session = self._session
+        if session is not None:
+            self._stop_session(session)
+        result, self._last_result = self._last_result, None
+        if result is None:
+            raise ProfilerBusy("Profiler is not running")
+        return result
+
+    @contextmanager
+    def profile_request(self) -> Iterator[None]:
+        session = self._session
+        if session is None or not session.cprofile:
+            yield
+            return
+
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            with self._lock:
+                session.skipped_requests += 1
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                if self._session is session:
+                    session.profiles.append(profile)
+                    session.profiled_requests += 1
+
+    def _stop_session(self, session: _Session) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._session is not session:
+                return None
+            self._session = None
+        session.stop_event.set()
+        if session.timer is not None:
+            session.timer.cancel()
+        if session.sampler is not None and session.sampler is not threading.current_thread():
+            session.sampler.join(timeout=5)
+        result = _write_outputs(session)
+        self._last_result = result
+        return result
+
+    def _sample_loop(self, session: _Session) -> None:
+        own_id = threading.get_ident()
+        names: Dict[Any, str] = {}
+        while not session.stop_event.wait(session.interval_s):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                session.stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            session.samples += 1
+
+
+def _collapse(thread_name: str, frame: Any) -> str:
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels)).replace("\n", " ")
+
+
+def _write_outputs(session: _Session) -> Dict[str, Any]:
+    session.output_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    base = session.output_dir / f"profile_{stamp}"
+    result: Dict[str, Any] = {
+        "ok": True,
+        "run_id": session.run_id,
+        "mode": session.mode,
+        "duration_ms": int((time.monotonic() - session.started_at) * 1000),
+        "profiled_requests": session.profiled_requests,
+        "skipped_requests": session.skipped_requests,
+        "samples": session.samples,
+    }
+
+    if session.cprofile:
+        pstats_path = base.with_suffix(".pstats")
+        if session.profiles:
+            import pstats
+
+            stats = pstats.Stats(session.profiles[0])
+            for profile in session.profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(str(pstats_path))
+            result["pstats_path"] = str(pstats_path)
+
+    if session.sampling:
+        collapsed_path = base.with_suffix(".collapsed")
+        with open(collapsed_path, "w", encoding="utf-8") as handle:
+            for stack, count in session.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        result["collapsed_path"] = str(collapsed_path)
+
+    return result
+
+
+PROFILER = Profiler()
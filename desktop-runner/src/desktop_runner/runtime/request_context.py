@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from desktop_runner.errors import DeadlineExceeded, RequestCancelled
+
+DEFAULT_PROGRESS_INTERVAL_MS = 250
+
+Notifier = Callable[[Dict[str, Any]], None]
+
+
+@dataclass
+class RequestContext:
+    request_id: Any = None
+    connection: Optional["ClientConnection"] = None
+    run_id: Optional[str] = None
+    deadline: Optional[float] = None
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    progress: Optional[Notifier] = None
+    progress_interval_s: float = DEFAULT_PROGRESS_INTERVAL_MS / 1000
+    started_at: float = field(default_factory=time.monotonic)
+    _pending_attempts: List[Dict[str, Any]] = field(default_factory=list)
+    _last_progress_at: Optional[float] = None
+    _wakers: Set[threading.Event] = field(default_factory=set)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def report_progress(self, match_attempts: Iterable[Dict[str, Any]] = (), **details: Any) -> None:
+        if self.progress is None:
+            return
+        self._pending_attempts.extend(match_attempts)
+        now = time.monotonic()
+        last = self._last_progress_at if self._last_progress_at is not None else self.started_at
+        if now - last < self.progress_interval_s:
+            return
+        self._last_progress_at = now
+        attempts, self._pending_attempts = self._pending_attempts, []
+        payload: Dict[str, Any] = {
+            "id": self.request_id,
+            "elapsed_ms": int((now - self.started_at) * 1000),
+            "match_attempts": attempts,
+        }
+        payload.update(details)
+        self.progress(payload)
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        with self._lock:
+            wakers = list(self._wakers)
+        for waker in wakers:
+            waker.set()
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    def remaining_s(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise RequestCancelled()
+        if self.expired():
+            raise DeadlineExceeded()
+
+    def sleep(self, seconds: float) -> None:
+        remaining = self.remaining_s()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if seconds > 0:
+            self.cancelled.wait(seconds)
+        self.check()
+
+    def wait_for_change(self, notifier: Any, generation: int, seconds: float) -> bool:
+        remaining = self.remaining_s()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        wake = threading.Event()
+        with self._lock:
+            self._wakers.add(wake)
+        notifier.subscribe(wake)
+        try:
+            if seconds > 0 and notifier.generation == generation and not self.cancelled.is_set():
+                wake.wait(seconds)
+        finally:
+            notifier.unsubscribe(wake)
+            with self._lock:
+                self._wakers.discard(wake)
+        self.check()
+        return notifier.generation != generation
+
+
+class ClientConnection:
+    """Requests one client has submitted to the dispatcher but not yet finished.
+
+    Request ids are only unique per client, so cancellation is scoped to the
+    connection that sent the request. A cancel for a request that is still queued
+    is remembered until the request starts; a cancel for an id that is not queued
+    is dropped so it cannot leak onto a later request reusing that id.
+    """
+
+    def __init__(self) -> None:
+        self._queued: Counter = Counter()
+        self._cancelled: Set[Any] = set()
+        self._lock = threading.Lock()
+
+    def enqueue(self, request_ids: Iterable[Any]) -> None:
+        with self._lock:
+            self._queued.update(request_ids)
+
+    def settle(self, request_ids: Iterable[Any]) -> None:
+        with self._lock:
+            for request_id in request_ids:
+                self._queued[request_id] -= 1
+                if self._queued[request_id] <= 0:
+                    del self._queued[request_id]
+                    self._cancelled.discard(request_id)
+
+    def cancel_queued(self, request_id: Any) -> bool:
+        with self._lock:
+            if request_id not in self._queued:
+                return False
+            self._cancelled.add(request_id)
+            return True
+
+    def take_cancelled(self, request_id: Any) -> bool:
+        with self._lock:
+            if request_id not in self._cancelled:
+                return False
+            self._cancelled.discard(request_id)
+            return True
+
+
+_CURRENT: contextvars.ContextVar[Optional[RequestContext]] = contextvars.ContextVar(
+    "desktop_runner_request_context", default=None
+)
+
+
+_NOTIFIER: contextvars.ContextVar[Optional[Notifier]] = contextvars.ContextVar(
+    "desktop_runner_notifier", default=None
+)
+
+
+_CONNECTION: contextvars.ContextVar[Optional[ClientConnection]] = contextvars.ContextVar(
+    "desktop_runner_connection", default=None
+)
+
+
+def current_connection() -> Optional[ClientConnection]:
+    return _CONNECTION.get()
+
+
+@contextmanager
+def use_connection(connection: Optional[ClientConnection]) -> Iterator[None]:
+    token = _CONNECTION.set(connection)
+    try:
+        yield
+    finally:
+        _CONNECTION.reset(token)
+
+
+def current_notifier() -> Optional[Notifier]:
+    return _NOTIFIER.get()
+
+
+@contextmanager
+def use_notifier(notifier: Optional[Notifier]) -> Iterator[None]:
+    token = _NOTIFIER.set(notifier)
+    try:
+        yield
+    finally:
+        _NOTIFIER.reset(token)
+
+
+def current_context() -> RequestContext:
+    return _CURRENT.get() or RequestContext()
+
+
+@contextmanager
+def use_context(context: RequestContext) -> Iterator[RequestContext]:
+    token = _CURRENT.set(context)
+    try:
+        yield context
+    finally:
+        _CURRENT.reset(token)
+
+
+def deadline_from_epoch_ms(deadline_epoch_ms: Optional[float]) -> Optional[float]:
+    if deadline_epoch_ms is None:
+        return None
+    return time.monotonic() + (deadline_epoch_ms / 1000 - time.time())
+
+
+class RequestRegistry:
+    def __init__(self) -> None:
+        self._active: Dict[Tuple[Optional[ClientConnection], Any], RequestContext] = {}
+        self._lock = threading.Lock()
+
+    def begin(
+        self,
+        request_id: Any,
+        deadline: Optional[float] = None,
+        progress: Optional[Notifier] = None,
+        progress_interval_ms: int = DEFAULT_PROGRESS_INTERVAL_MS,
+        run_id: Optional[str] = None,
+        connection: Optional[ClientConnection] = None,
+    ) -> RequestContext:
+        context = RequestContext(
+            request_id=request_id,
+            connection=connection,
+            run_id=run_id,
+            deadline=deadline,
+            progress=progress,
+            progress_interval_s=progress_interval_ms / 1000,
+        )
+        with self._lock:
+            if connection is not None and connection.take_cancelled(request_id):
+                context.cancel()
+            self._active[(connection, request_id)] = context
+        return context
+
+    def end(self, context: RequestContext) -> None:
+        key = (context.connection, context.request_id)
+        with self._lock:
+            if self._active.get(key) is context:
+                del self._active[key]
+
+    def cancel(self, request_id: Any, connection: Optional[ClientConnection] = None) -> bool:
+        with self._lock:
+            context = self._active.get((connection, request_id))
+            if context is None:
+                return connection is not None and connection.cancel_queued(request_id)
+        context.cancel()
+        return True
+
+    def active_ids(self) -> List[Any]:
+        with self._lock:
+            return [request_id for _, request_id in self._active]
@@ -2,20 +2,27 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 
 @dataclass
 class RunState:
     run_id: str
     artifact_dir: Path
+    workflow_id: Optional[str] = None
+    rung_cache: Optional[Any] = None
 
 
 _RUN_STATE: Dict[str, RunState] = {}
 
 
-def set_run_state(run_id: str, artifact_dir: str) -> RunState:
-    state = RunState(run_id=run_id, artifact_dir=Path(artifact_dir))
+def set_run_state(
+    run_id: str,
+    artifact_dir: str,
+    workflow_id: Optional[str] = None,
+    rung_cache: Optional[Any] = None,
+) -> RunState:
+    state = RunState(run_id=run_id, artifact_dir=Path(artifact_dir), workflow_id=workflow_id, rung_cache=rung_cache)
     _RUN_STATE[run_id] = state
     return state
 
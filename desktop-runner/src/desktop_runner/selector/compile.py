@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from desktop_runner.errors import OcrUnavailable
+from desktop_runner.uia.search import LEAF_FIRST, MATCH_LIMIT, has_search_options
+from desktop_runner.uia.snapshot import TreeSnapshot
+
+DEFAULT_COMPILE_CACHE_SIZE = 1024
+
+PREDICATE_ORDER = ("automationId", "name", "className", "controlType")
+SCOPE_FIELDS = ("window_title_contains", "window_class", "process_name")
+
+Finder = Callable[["CompiledRung", Any, "SearchTree"], List[Any]]
+
+
+class SearchTree:
+    def __init__(self, adapter: Any, root: Any) -> None:
+        self.adapter = adapter
+        self.root = root
+        self._snapshot: Optional[Any] = None
+
+    def snapshot(self) -> Any:
+        if self._snapshot is None:
+            take = getattr(self.adapter, "snapshot", None)
+            self._snapshot = take(self.root) if take is not None else self.root
+        return self._snapshot
+
+
+class SearchTrees:
+    def __init__(self, adapter: Any) -> None:
+        self.adapter = adapter
+        self._trees: Dict[str, SearchTree] = {}
+        self.shared = 0
+
+    def get(self, scope: Optional[Dict[str, Any]]) -> SearchTree:
+        key = json.dumps(scope, sort_keys=True, default=str)
+        tree = self._trees.get(key)
+        if tree is None:
+            tree = SearchTree(self.adapter, self.adapter.get_scope_root(scope))
+            self._trees[key] = tree
+        else:
+            self.shared += 1
+        return tree
+
+
+@dataclass(frozen=True)
+class CompiledRung:
+    index: int
+    kind: Optional[str]
+    selector: Dict[str, Any]
+    predicates: Tuple[Tuple[str, str], ...]
+    finder: Finder
+    error: Optional[str] = None
+
+    @property
+    def index_field(self) -> Optional[str]:
+        return self.predicates[0][0] if self.predicates else None
+
+    def find(self, adapter: Any, tree: SearchTree) -> List[Any]:
+        return self.finder(self, adapter, tree)
+
+
+@dataclass(frozen=True)
+class CompiledTarget:
+    key: str
+    scope: Optional[Dict[str, Any]]
+    rungs: Tuple[CompiledRung, ...]
+
+
+def target_key(target: Dict[str, Any]) -> str:
+    encoded = json.dumps(target, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def compile_target(target: Dict[str, Any], key: Optional[str] = None) -> CompiledTarget:
+    key = key or target_key(target)
+    ladder = target.get("ladder") or []
+    return CompiledTarget(
+        key=key,
+        scope=_normalize_scope(target.get("scope")),
+        rungs=tuple(compile_rung(index, rung) for index, rung in enumerate(ladder)),
+    )
+
+
+def compile_rung(index: int, rung: Dict[str, Any]) -> CompiledRung:
+    kind = rung.get("kind")
+    selector = copy.deepcopy(rung.get("selector") or {})
+    predicates = tuple(
+        (field, selector[field]) for field in PREDICATE_ORDER if isinstance(selector.get(field), str) and selector[field]
+    )
+    if kind == "uia":
+        finder = _find_uia_streaming if has_search_options(selector) else _find_uia_indexed
+        return CompiledRung(index, kind, selector, predicates, finder)
+    if kind == "uia_path":
+        return CompiledRung(index, kind, selector, predicates, _find_uia_path)
+    if kind == "uia_near_label":
+        return CompiledRung(index, kind, selector, predicates, _find_near_label)
+    if kind == "ocr_anchor":
+        return CompiledRung(index, kind, selector, predicates, _find_ocr_anchor)
+    if kind == "coords":
+        return CompiledRung(index, kind, selector, predicates, _find_by_point)
+    return CompiledRung(index, kind, selector, predicates, _find_nothing, f"Unsupported rung kind: {kind}")
+
+
+def _normalize_scope(scope: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if scope is None:
+        return None
+    normalized = dict(scope)
+    for field in SCOPE_FIELDS:
+        value = normalized.get(field)
+        if isinstance(value, str):
+            normalized[field] = value.lower()
+    return normalized
+
+
+def _find_uia_streaming(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    return adapter.find_uia(tree.root, rung.selector, limit=MATCH_LIMIT)
+
+
+def _find_uia_indexed(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    snapshot = tree.snapshot()
+    if isinstance(snapshot, TreeSnapshot):
+        return [record.element for record in snapshot.match(rung.predicates, limit=MATCH_LIMIT)]
+    return adapter.find_uia(snapshot, rung.selector, limit=MATCH_LIMIT)
+
+
+def _find_uia_path(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    # Leaf-first paths look the target up anywhere in the scope, so they share the
+    # indexed snapshot; root-first paths only expand the children they name.
+    root = tree.snapshot() if rung.selector.get("order") == LEAF_FIRST else tree.root
+    return adapter.find_uia_path(root, rung.selector, limit=MATCH_LIMIT)
+
+
+def _find_by_point(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    return adapter.find_by_point(tree.root, rung.selector)
+
+
+def _find_near_label(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    return adapter.find_uia_near_label(tree.snapshot(), rung.selector)
+
+
+def _find_ocr_anchor(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    raise OcrUnavailable()
+
+
+def _find_nothing(rung: CompiledRung, adapter: Any, tree: SearchTree) -> List[Any]:
+    return []
+
+
+class CompileCache:
+    def __init__(self, max_entries: int = DEFAULT_COMPILE_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CompiledTarget]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, target: Dict[str, Any]) -> CompiledTarget:
+        key = target_key(target)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return compiled
+            self._misses += 1
+        compiled = compile_target(target, key)
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+COMPILE_CACHE = CompileCache()
+
+
+def compiled_target(target: Dict[str, Any]) -> CompiledTarget:
+    return COMPILE_CACHE.get(target)
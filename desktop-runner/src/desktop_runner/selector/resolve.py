@@ -3,22 +3,41 @@ from __future__ import annotations
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
-from desktop_runner.errors import AmbiguousMatch, ElementNotFound, OcrUnavailable, TimeoutError
+from desktop_runner.errors import (
+    AmbiguousMatch,
+    DeadlineExceeded,
+    DesktopRunnerError,
+    ElementNotFound,
+    OcrUnavailable,
+    RequestCancelled,
+    TimeoutError,
+)
+from desktop_runner.runtime.metrics import METRICS
+from desktop_runner.runtime.request_context import RequestContext, current_context
+from desktop_runner.runtime.run_state import get_run_state
+from desktop_runner.selector.compile import CompiledRung, CompiledTarget, SearchTree, SearchTrees, compiled_target
+from desktop_runner.selector.rung_cache import RungCache
 from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.events import MIN_REEVALUATE_INTERVAL_S, ChangeNotifier, change_notifier
+from desktop_runner.uia.protocol import DesktopAdapter
 
 
 def resolve_ladder(
     target: Dict[str, Any],
     retry: Optional[Dict[str, Any]] = None,
     timeout_ms: Optional[int] = None,
-    adapter: Optional[UIAAdapter] = None,
+    adapter: Optional[DesktopAdapter] = None,
     return_element: bool = False,
+    context: Optional[RequestContext] = None,
+    rung_cache: Optional[RungCache] = None,
+    trees: Optional[SearchTrees] = None,
 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[Any]]:
     adapter = adapter or UIAAdapter()
-    ladder = target.get("ladder") or []
-    scope = target.get("scope")
-    if not ladder:
+    context = context or current_context()
+    if not target.get("ladder"):
         raise ElementNotFound("Target ladder is empty")
+    compiled = compiled_target(target)
+    rung_cache = rung_cache or _run_rung_cache(context)
 
     attempts: List[Dict[str, Any]] = []
     start_time = time.monotonic()
@@ -26,53 +45,108 @@ def resolve_ladder(
     total_attempts = 1 + int((retry or {}).get("attempts", 0))
     wait_ms = int((retry or {}).get("wait_ms", 0))
     backoff = (retry or {}).get("backoff", "none")
+    notifier = change_notifier(adapter, compiled.scope) if wait_ms > 0 and total_attempts > 1 else None
 
     for attempt_index in range(total_attempts):
         if timeout_ms is not None and _elapsed_ms(start_time) > timeout_ms:
             raise TimeoutError(data={"match_attempts": attempts})
+        _check_context(context, attempts)
+        generation = notifier.generation if notifier is not None else 0
 
         try:
-            resolved, new_attempts, element = _resolve_once(adapter, ladder, scope)
+            resolved, new_attempts, element = _resolve_once(
+                adapter, compiled, context, rung_cache, trees if attempt_index == 0 else None
+            )
             attempts.extend(new_attempts)
             return resolved, attempts, element if return_element else None
         except ElementNotFound as exc:
             attempts.extend(exc.data.get("match_attempts", []) if exc.data else [])
             if attempt_index >= total_attempts - 1:
                 raise ElementNotFound(data={"match_attempts": attempts}) from exc
+        except (RequestCancelled, DeadlineExceeded) as exc:
+            attempts.extend(exc.data.get("match_attempts", []) if exc.data else [])
+            exc.data = {"match_attempts": attempts}
+            raise
         if wait_ms > 0 and attempt_index < total_attempts - 1:
-            time.sleep(_backoff_delay(wait_ms, backoff, attempt_index))
+            delay = _backoff_delay(wait_ms, backoff, attempt_index)
+            try:
+                woken = _wait_for_retry(adapter, compiled, context, rung_cache, notifier, generation, delay, attempts)
+            except DesktopRunnerError as exc:
+                exc.data = {"match_attempts": attempts}
+                raise
+            if woken is not None:
+                resolved, element = woken
+                return resolved, attempts, element if return_element else None
 
     raise ElementNotFound(data={"match_attempts": attempts})
 
 
+def _wait_for_retry(
+    adapter: DesktopAdapter,
+    compiled: CompiledTarget,
+    context: RequestContext,
+    rung_cache: Optional[RungCache],
+    notifier: Optional[ChangeNotifier],
+    generation: int,
+    delay: float,
+    attempts: List[Dict[str, Any]],
+) -> Optional[Tuple[Dict[str, Any], Optional[Any]]]:
+    if notifier is None:
+        context.sleep(delay)
+        return None
+
+    wake_at = time.monotonic() + delay
+    evaluated_at = time.monotonic()
+    while True:
+        remaining = wake_at - time.monotonic()
+        if remaining <= 0 or not context.wait_for_change(notifier, generation, remaining):
+            return None
+        settle = MIN_REEVALUATE_INTERVAL_S - (time.monotonic() - evaluated_at)
+        if settle > 0:
+            context.sleep(settle)
+        generation = notifier.generation
+        evaluated_at = time.monotonic()
+        try:
+            resolved, new_attempts, element = _resolve_once(adapter, compiled, context, rung_cache)
+        except ElementNotFound as exc:
+            attempts.extend(exc.data.get("match_attempts", []) if exc.data else [])
+            continue
+        except DesktopRunnerError as exc:
+            attempts.extend(exc.data.get("match_attempts", []) if exc.data else [])
+            raise
+        attempts.extend(new_attempts)
+        return resolved, element
+
+
 def _resolve_once(
-    adapter: UIAAdapter, ladder: List[Dict[str, Any]], scope: Optional[Dict[str, Any]]
+    adapter: DesktopAdapter,
+    compiled: CompiledTarget,
+    context: Optional[RequestContext] = None,
+    rung_cache: Optional[RungCache] = None,
+    trees: Optional[SearchTrees] = None,
 ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[Any]]:
+    context = context or current_context()
     attempts: List[Dict[str, Any]] = []
-    root = adapter.get_scope_root(scope)
-
-    for index, rung in enumerate(ladder):
-        kind = rung.get("kind")
-        selector = rung.get("selector", {})
+    if trees is not None:
+        tree = trees.get(compiled.scope)
+    else:
+        tree = SearchTree(adapter, adapter.get_scope_root(compiled.scope))
+    preferred = _preferred_rung(compiled, rung_cache)
+    preferred_ambiguous = False
+
+    for rung in _ordered_rungs(compiled, preferred):
+        if preferred_ambiguous and rung.index > preferred:
+            break
+        _check_context(context, attempts)
+        index = rung.index
+        kind = rung.kind
         start = time.monotonic()
-        error: Optional[str] = None
-        matched: List[Any] = []
         ok = False
 
         try:
-            if kind == "uia":
-                matched = adapter.find_uia(root, selector)
-            elif kind == "uia_near_label":
-                matched = adapter.find_uia_near_label(root, selector)
-            elif kind == "ocr_anchor":
-                raise OcrUnavailable()
-            elif kind == "coords":
-                matched = []
-                error = "Coordinate selector not supported yet"
-            else:
-                matched = []
-                error = f"Unsupported rung kind: {kind}"
+            matched = rung.find(adapter, tree)
         except OcrUnavailable as exc:
+            METRICS.record_rung(kind, time.monotonic() - start, 0)
             duration_ms = _duration_ms(start)
             attempts.append(
                 {
@@ -87,6 +161,7 @@ def _resolve_once(
             raise
 
         matched_count = len(matched)
+        METRICS.record_rung(kind, time.monotonic() - start, matched_count)
         duration_ms = _duration_ms(start)
         if matched_count == 1:
             ok = True
@@ -97,19 +172,59 @@ def _resolve_once(
             "duration_ms": duration_ms,
             "ok": ok,
         }
-        if error:
-            attempt["error"] = error
+        if rung.error:
+            attempt["error"] = rung.error
+        if rung.index == preferred:
+            attempt["cached"] = True
         attempts.append(attempt)
+        context.report_progress([attempt])
 
         if matched_count == 1:
+            if rung_cache is not None:
+                rung_cache.record(compiled.key, index, kind, preferred=index == preferred)
             resolved = {"rung_index": index, "kind": kind, "element": adapter.describe(matched[0])}
             return resolved, attempts, matched[0]
+        if matched_count > 1 and rung.index == preferred:
+            rung_cache.forget(compiled.key)
+            preferred_ambiguous = True
+            continue
         if matched_count > 1:
             raise AmbiguousMatch(data={"match_attempts": attempts})
 
+    if preferred_ambiguous:
+        raise AmbiguousMatch(data={"match_attempts": attempts})
     raise ElementNotFound(data={"match_attempts": attempts})
 
 
+def _run_rung_cache(context: RequestContext) -> Optional[RungCache]:
+    state = get_run_state(context.run_id) if context.run_id else None
+    return state.rung_cache if state is not None else None
+
+
+def _preferred_rung(compiled: CompiledTarget, rung_cache: Optional[RungCache]) -> Optional[int]:
+    entry = rung_cache.get(compiled.key) if rung_cache is not None else None
+    if entry is None:
+        return None
+    index = entry["rung_index"]
+    if not 0 <= index < len(compiled.rungs) or compiled.rungs[index].kind != entry.get("kind"):
+        return None
+    return index
+
+
+def _ordered_rungs(compiled: CompiledTarget, preferred: Optional[int]) -> List[CompiledRung]:
+    if not preferred:
+        return list(compiled.rungs)
+    return [compiled.rungs[preferred]] + [rung for rung in compiled.rungs if rung.index != preferred]
+
+
+def _check_context(context: RequestContext, attempts: List[Dict[str, Any]]) -> None:
+    try:
+        context.check()
+    except DesktopRunnerError as exc:
+        exc.data = {"match_attempts": attempts}
+        raise
+
+
 def _elapsed_ms(start_time: float) -> int:
     return int((time.monotonic() - start_time) * 1000)
 
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+RUNG_CACHE_VERSION = 1
+DEFAULT_FLUSH_INTERVAL_S = 5.0
+MAX_ENTRIES = 4096
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def default_cache_dir() -> Path:
+    return Path.home() / ".desktop-runner" / "rung-cache"
+
+
+def cache_path(cache_dir: Path, workflow_id: str) -> Path:
+    return cache_dir / f"{_SAFE_NAME.sub('_', workflow_id)}.json"
+
+
+class RungCache:
+    def __init__(self, path: Optional[Path] = None, flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S) -> None:
+        self.path = path
+        self.flush_interval_s = flush_interval_s
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+        self._hits = 0
+        self._misses = 0
+        if path is not None:
+            self._load(path)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def record(self, key: str, rung_index: int, kind: Optional[str], preferred: bool) -> None:
+        with self._lock:
+            if preferred:
+                self._hits += 1
+            elif key in self._entries:
+                self._misses += 1
+            entry = self._entries.pop(key, None)
+            if entry is None or entry["rung_index"] != rung_index or entry.get("kind") != kind:
+                entry = {"rung_index": rung_index, "kind": kind, "hits": 0}
+            entry["hits"] += 1
+            entry["updated_at"] = int(time.time())
+            self._entries[key] = entry
+            while len(self._entries) > MAX_ENTRIES:
+                self._entries.pop(next(iter(self._entries)))
+            self._dirty = True
+            due = time.monotonic() - self._flushed_at >= self.flush_interval_s
+        if due:
+            self.flush()
+
+    def forget(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._misses += 1
+                self._dirty = True
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                payload = {"version": RUNG_CACHE_VERSION, "entries": dict(self._entries)}
+                self._dirty = False
+                self._flushed_at = time.monotonic()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, sort_keys=True)
+            os.replace(temp_path, self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+    def _load(self, path: Path) -> None:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if not isinstance(payload, dict) or payload.get("version") != RUNG_CACHE_VERSION:
+            return
+        entries = payload.get("entries")
+        if not isinstance(entries, dict):
+            return
+        for key, entry in entries.items():
+            if isinstance(entry, dict) and _is_rung_index(entry.get("rung_index")):
+                self._entries[key] = entry
+
+
+def _is_rung_index(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+_OPEN: Dict[Path, RungCache] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_rung_cache(workflow_id: str, cache_dir: Optional[Path] = None) -> RungCache:
+    path = cache_path(cache_dir or default_cache_dir(), workflow_id)
+    with _OPEN_LOCK:
+        cache = _OPEN.get(path)
+        if cache is None:
+            cache = RungCache(path)
+            _OPEN[path] = cache
+        return cache
@@ -1,22 +1,43 @@
 from __future__ import annotations
 
+import argparse
+import functools
 import importlib.util
-import json
 import os
 import sys
+import time
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
-
-from desktop_runner.actions.click import click
-from desktop_runner.actions.extract import get_value
-from desktop_runner.actions.paste_text import paste_text
-from desktop_runner.actions.set_value import set_value
-from desktop_runner.actions.step_trace import StepTraceBuilder
-from desktop_runner.assertions.check import check_assertions
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
 from desktop_runner.errors import ActionFailed, DesktopRunnerError, ScopeNotFound
+from desktop_runner.runtime.attempts import compress_attempts, set_max_match_attempts
+from desktop_runner.runtime.dispatcher import DEFAULT_MAX_WORKERS, RequestDispatcher, use_multithreaded_com
+from desktop_runner.runtime.lazy import lazy_callable
+from desktop_runner.runtime.metrics import METRICS
+from desktop_runner.runtime.profiler import DEFAULT_SAMPLE_INTERVAL_MS, PROFILER, ProfilerBusy
+from desktop_runner.runtime.request_context import (
+    DEFAULT_PROGRESS_INTERVAL_MS,
+    Notifier,
+    RequestRegistry,
+    current_connection,
+    current_notifier,
+    deadline_from_epoch_ms,
+    use_context,
+)
 from desktop_runner.runtime.run_state import clear_run_state, get_run_state, set_run_state
-from desktop_runner.selector.resolve import resolve_ladder
-from desktop_runner.artifacts.screenshots import capture_screenshot
+from desktop_runner.transport import FRAMING_JSONL, FRAMING_LENGTH_PREFIXED, Transport, TransportError, make_transport
+from desktop_runner.uia.manager import AdapterManager
+
+click = lazy_callable("desktop_runner.actions.click", "click")
+get_value = lazy_callable("desktop_runner.actions.extract", "get_value")
+paste_text = lazy_callable("desktop_runner.actions.paste_text", "paste_text")
+set_value = lazy_callable("desktop_runner.actions.set_value", "set_value")
+StepTraceBuilder = lazy_callable("desktop_runner.actions.step_trace", "StepTraceBuilder")
+check_assertions = lazy_callable("desktop_runner.assertions.check", "check_assertions")
+resolve_ladder = lazy_callable("desktop_runner.selector.resolve", "resolve_ladder")
+open_rung_cache = lazy_callable("desktop_runner.selector.rung_cache", "open_rung_cache")
+capture_screenshot = lazy_callable("desktop_runner.artifacts.screenshots", "capture_screenshot")
 
 JSONRPC_VERSION = "2.0"
 SERVICE_NAME = "desktop-runner"
@@ -27,9 +48,18 @@ ERROR_INVALID_REQUEST = -32600
 ERROR_METHOD_NOT_FOUND = -32601
 ERROR_INVALID_PARAMS = -32602
 ERROR_INTERNAL = -32603
+ERROR_BATCH_ABORTED = -32001
 
 ERROR_SCOPE_NOT_FOUND = 1000
 
+CANCEL_METHOD = "$/cancelRequest"
+PROGRESS_METHOD = "$/progress"
+
+ADAPTERS = AdapterManager()
+REQUESTS = RequestRegistry()
+
+_TRANSPORT = Transport()
+
 
 @dataclass
 class JsonRpcError(Exception):
@@ -76,16 +106,86 @@ def handle_ping(_: Dict[str, Any]) -> Dict[str, Any]:
     return {"ok": True, "service": SERVICE_NAME, "version": SERVICE_VERSION}
 
 
+@functools.lru_cache(maxsize=None)
+def probe_ocr() -> Dict[str, bool]:
+    return {
+        "windows_ocr": importlib.util.find_spec("winrt") is not None,
+        "tesseract": importlib.util.find_spec("pytesseract") is not None,
+    }
+
+
 def handle_capabilities(_: Dict[str, Any]) -> Dict[str, Any]:
-    windows_ocr = importlib.util.find_spec("winrt") is not None
-    tesseract = importlib.util.find_spec("pytesseract") is not None
     return {
         "uia": True,
-        "ocr": {"windows_ocr": windows_ocr, "tesseract": tesseract},
+        "ocr": dict(probe_ocr()),
         "screenshots": True,
+        "transport": _TRANSPORT.describe(),
     }
 
 
+def handle_adapter_stats(_: Dict[str, Any]) -> Dict[str, Any]:
+    return ADAPTERS.stats()
+
+
+def handle_metrics(params: Dict[str, Any]) -> Dict[str, Any]:
+    snapshot = METRICS.snapshot()
+    snapshot["adapter"] = ADAPTERS.stats()
+    scope_cache_stats = getattr(ADAPTERS.peek(), "scope_cache_stats", None)
+    if scope_cache_stats is not None:
+        snapshot["scope_cache"] = scope_cache_stats()
+    compile_module = sys.modules.get("desktop_runner.selector.compile")
+    if compile_module is not None:
+        snapshot["compile_cache"] = compile_module.COMPILE_CACHE.stats()
+    snapshot["in_flight"] = len(REQUESTS.active_ids())
+    if params.get("reset"):
+        METRICS.reset()
+    return snapshot
+
+
+def handle_profile_start(params: Dict[str, Any]) -> Dict[str, Any]:
+    run_id = params.get("run_id")
+    if not isinstance(run_id, str):
+        raise JsonRpcError(ERROR_INVALID_PARAMS, "run_id is required")
+    interval_ms = _positive_int(params, "interval_ms", DEFAULT_SAMPLE_INTERVAL_MS)
+    duration_ms = _positive_int(params, "duration_ms")
+    state = get_run_state(run_id)
+    if state is None:
+        raise JsonRpcError(ERROR_INVALID_PARAMS, f"Unknown run_id {run_id}; call run.begin first")
+    try:
+        return PROFILER.start(
+            run_id,
+            state.artifact_dir / "profiles",
+            mode=params.get("mode", "both"),
+            interval_ms=interval_ms,
+            duration_ms=duration_ms,
+        )
+    except (ProfilerBusy, ValueError) as exc:
+        raise JsonRpcError(ERROR_INVALID_PARAMS, str(exc)) from exc
+
+
+def _positive_int(params: Dict[str, Any], name: str, default: Optional[int] = None) -> Optional[int]:
+    value = params.get(name, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise JsonRpcError(ERROR_INVALID_PARAMS, f"{name} must be a positive integer")
+    return value
+
+
+def handle_profile_stop(_: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return PROFILER.stop()
+    except ProfilerBusy as exc:
+        raise JsonRpcError(ERROR_INVALID_PARAMS, str(exc)) from exc
+
+
+def invalidate_scope_cache(scope: Optional[Dict[str, Any]] = None) -> None:
+    adapter = ADAPTERS.peek()
+    invalidate = getattr(adapter, "invalidate_scope_cache", None)
+    if invalidate is not None:
+        invalidate(scope)
+
+
 def handle_window_focus(params: Dict[str, Any]) -> Dict[str, Any]:
     run_id = params.get("run_id")
     step_id = params.get("step_id")
@@ -98,10 +198,12 @@ def handle_window_focus(params: Dict[str, Any]) -> Dict[str, Any]:
 
     trace = StepTraceBuilder(run_id=run_id, step_id=step_id)
     try:
-        if os.name != "nt":
+        adapter_focus = getattr(ADAPTERS.peek(), "focus_window", None)
+        if adapter_focus is None and os.name != "nt":
             raise ScopeNotFound()
 
-        descriptor = focus_window(scope)
+        invalidate_scope_cache(scope)
+        descriptor = adapter_focus(scope) if adapter_focus is not None else focus_window(scope)
         if descriptor is None:
             raise ScopeNotFound()
         trace.ok = True
@@ -123,7 +225,14 @@ def handle_run_begin(params: Dict[str, Any]) -> Dict[str, Any]:
     artifact_dir = params.get("artifact_dir")
     if not isinstance(run_id, str) or not isinstance(artifact_dir, str):
         raise JsonRpcError(ERROR_INVALID_PARAMS, "run_id and artifact_dir are required")
-    set_run_state(run_id, artifact_dir)
+    workflow_id = params.get("workflow_id")
+    rung_cache_dir = params.get("rung_cache_dir")
+    if workflow_id is not None and not isinstance(workflow_id, str):
+        raise JsonRpcError(ERROR_INVALID_PARAMS, "workflow_id must be a string")
+    if rung_cache_dir is not None and not isinstance(rung_cache_dir, str):
+        raise JsonRpcError(ERROR_INVALID_PARAMS, "rung_cache_dir must be a string")
+    rung_cache = open_rung_cache(workflow_id, Path(rung_cache_dir) if rung_cache_dir else None) if workflow_id else None
+    set_run_state(run_id, artifact_dir, workflow_id=workflow_id, rung_cache=rung_cache)
     return {"ok": True}
 
 
@@ -131,7 +240,11 @@ def handle_run_end(params: Dict[str, Any]) -> Dict[str, Any]:
     run_id = params.get("run_id")
     if not isinstance(run_id, str):
         raise JsonRpcError(ERROR_INVALID_PARAMS, "run_id is required")
+    state = get_run_state(run_id)
+    if state is not None and state.rung_cache is not None:
+        state.rung_cache.flush()
     clear_run_state(run_id)
+    invalidate_scope_cache()
     return {"ok": True}
 
 
@@ -143,28 +256,31 @@ def handle_target_resolve(params: Dict[str, Any]) -> Dict[str, Any]:
         target,
         retry=params.get("retry"),
         timeout_ms=params.get("timeout_ms"),
+        adapter=ADAPTERS.get(),
     )
-    return {"resolved": resolved, "match_attempts": match_attempts}
+    return {"resolved": resolved, **_compressed_attempts(match_attempts)}
 
 
 def handle_action_click(params: Dict[str, Any]) -> Dict[str, Any]:
-    return click(params)
+    return click(params, adapter=ADAPTERS.get())
 
 
 def handle_action_paste(params: Dict[str, Any]) -> Dict[str, Any]:
-    return paste_text(params)
+    return paste_text(params, adapter=ADAPTERS.get())
 
 
 def handle_action_set_value(params: Dict[str, Any]) -> Dict[str, Any]:
-    return set_value(params)
+    return set_value(params, adapter=ADAPTERS.get())
 
 
 def handle_assert_check(params: Dict[str, Any]) -> Dict[str, Any]:
-    return check_assertions(params)
+    if params.get("mode", "all") not in ("all", "any"):
+        raise JsonRpcError(ERROR_INVALID_PARAMS, "mode must be all or any")
+    return check_assertions(params, adapter=ADAPTERS.get())
 
 
 def handle_extract_value(params: Dict[str, Any]) -> Dict[str, Any]:
-    return get_value(params)
+    return get_value(params, adapter=ADAPTERS.get())
 
 
 def handle_artifact_screenshot(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -194,7 +310,126 @@ def handle_artifact_screenshot(params: Dict[str, Any]) -> Dict[str, Any]:
         raise ActionFailed(data={"trace": trace.finish()}) from exc
 
 
-def handle_request(payload: Any) -> Optional[Dict[str, Any]]:
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "system.ping": handle_ping,
+    "system.getCapabilities": handle_capabilities,
+    "system.getAdapterStats": handle_adapter_stats,
+    "system.getMetrics": handle_metrics,
+    "profile.start": handle_profile_start,
+    "profile.stop": handle_profile_stop,
+    "run.begin": handle_run_begin,
+    "run.end": handle_run_end,
+    "window.focus": handle_window_focus,
+    "target.resolve": handle_target_resolve,
+    "action.click": handle_action_click,
+    "action.pasteText": handle_action_paste,
+    "action.setValue": handle_action_set_value,
+    "assert.check": handle_assert_check,
+    "extract.getValue": handle_extract_value,
+    "artifact.screenshot": handle_artifact_screenshot,
+}
+
+
+def handle_request(payload: Any, stop_on_error: bool = False) -> Optional[Any]:
+    if isinstance(payload, list):
+        return handle_batch(payload, stop_on_error=stop_on_error)
+    return handle_single_request(payload)
+
+
+def handle_batch(payloads: List[Any], stop_on_error: bool = False) -> Optional[Any]:
+    if not payloads:
+        return make_error_response(None, JsonRpcError(ERROR_INVALID_REQUEST, "Empty batch"))
+
+    responses: List[Dict[str, Any]] = []
+    failed_id: Any = None
+    aborted = False
+    for payload in payloads:
+        if aborted:
+            if isinstance(payload, dict) and "id" not in payload:
+                continue
+            request_id = payload.get("id") if isinstance(payload, dict) else None
+            error = JsonRpcError(ERROR_BATCH_ABORTED, "Skipped after earlier batch failure", {"failed_id": failed_id})
+            responses.append(make_error_response(request_id, error))
+            continue
+
+        response = handle_single_request(payload)
+        if response is None:
+            continue
+        responses.append(response)
+        if "error" in response and (stop_on_error or _stops_batch(payload)):
+            aborted = True
+            failed_id = response.get("id")
+    # A batch of notifications gets no reply at all, not an empty array.
+    return responses or None
+
+
+def _stops_batch(payload: Any) -> bool:
+    params = payload.get("params") if isinstance(payload, dict) else None
+    return isinstance(params, dict) and bool(params.get("stop_on_error"))
+
+
+def handle_cancel_request(params: Any) -> None:
+    if isinstance(params, dict) and "id" in params:
+        REQUESTS.cancel(params["id"], connection=current_connection())
+
+
+def _request_deadline(params: Dict[str, Any]) -> Optional[float]:
+    deadline_epoch_ms = params.get("deadline_epoch_ms")
+    if deadline_epoch_ms is None:
+        return None
+    if isinstance(deadline_epoch_ms, bool) or not isinstance(deadline_epoch_ms, (int, float)):
+        raise JsonRpcError(ERROR_INVALID_PARAMS, "deadline_epoch_ms must be a number")
+    return deadline_from_epoch_ms(deadline_epoch_ms)
+
+
+def _progress_notifier(params: Dict[str, Any]) -> Optional[Notifier]:
+    if not params.get("progress"):
+        return None
+    notifier = current_notifier()
+    if notifier is None:
+        return None
+
+    def notify(progress: Dict[str, Any]) -> None:
+        notifier({"jsonrpc": JSONRPC_VERSION, "method": PROGRESS_METHOD, "params": progress})
+
+    return notify
+
+
+def _progress_interval_ms(params: Dict[str, Any]) -> int:
+    interval_ms = params.get("progress_interval_ms", DEFAULT_PROGRESS_INTERVAL_MS)
+    if isinstance(interval_ms, bool) or not isinstance(interval_ms, int) or interval_ms < 0:
+        raise JsonRpcError(ERROR_INVALID_PARAMS, "progress_interval_ms must be a non-negative integer")
+    return interval_ms
+
+
+def handle_single_request(payload: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(payload, dict) and payload.get("method") == CANCEL_METHOD:
+        handle_cancel_request(payload.get("params"))
+        return None
+
+    start = time.perf_counter()
+    response = _execute_request(payload)
+    error_code = response["error"]["code"] if "error" in response else None
+    METRICS.record_request(_metrics_method(payload), time.perf_counter() - start, error_code)
+    return response
+
+
+def _metrics_method(payload: Any) -> str:
+    method = payload.get("method") if isinstance(payload, dict) else None
+    if isinstance(method, str) and method in HANDLERS:
+        return method
+    return "<invalid>"
+
+
+def _compressed_attempts(attempts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    match_attempts, truncated = compress_attempts(attempts)
+    payload: Dict[str, Any] = {"match_attempts": match_attempts}
+    if truncated is not None:
+        payload["match_attempts_truncated"] = truncated
+    return payload
+
+
+def _execute_request(payload: Any) -> Dict[str, Any]:
     request_id = None
     try:
         data = validate_request(payload)
@@ -204,55 +439,105 @@ def handle_request(payload: Any) -> Optional[Dict[str, Any]]:
         if not isinstance(params, dict):
             raise JsonRpcError(ERROR_INVALID_PARAMS, "params must be an object")
 
-        handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
-            "system.ping": handle_ping,
-            "system.getCapabilities": handle_capabilities,
-            "run.begin": handle_run_begin,
-            "run.end": handle_run_end,
-            "window.focus": handle_window_focus,
-            "target.resolve": handle_target_resolve,
-            "action.click": handle_action_click,
-            "action.pasteText": handle_action_paste,
-            "action.setValue": handle_action_set_value,
-            "assert.check": handle_assert_check,
-            "extract.getValue": handle_extract_value,
-            "artifact.screenshot": handle_artifact_screenshot,
-        }
-
-        handler = handlers.get(method)
+        handler = HANDLERS.get(method)
         if handler is None:
             raise JsonRpcError(ERROR_METHOD_NOT_FOUND, "Method not found")
 
-        result = handler(params)
+        context = REQUESTS.begin(
+            request_id,
+            _request_deadline(params),
+            progress=_progress_notifier(params),
+            progress_interval_ms=_progress_interval_ms(params),
+            run_id=params.get("run_id") if isinstance(params.get("run_id"), str) else None,
+            connection=current_connection(),
+        )
+        try:
+            with use_context(context), PROFILER.profile_request():
+                context.check()
+                result = handler(params)
+        finally:
+            REQUESTS.end(context)
         return make_result_response(request_id, result)
     except DesktopRunnerError as exc:
-        return make_error_response(request_id, JsonRpcError(exc.code, exc.message, exc.data))
+        ADAPTERS.report_failure(exc)
+        data = exc.data
+        if data and "match_attempts" in data:
+            data = {**data, **_compressed_attempts(data["match_attempts"])}
+        return make_error_response(request_id, JsonRpcError(exc.code, exc.message, data))
     except JsonRpcError as exc:
         return make_error_response(request_id, exc)
     except Exception as exc:  # pragma: no cover - last resort
+        ADAPTERS.report_failure(exc)
         return make_error_response(request_id, JsonRpcError(ERROR_INTERNAL, str(exc)))
 
 
-def serve() -> None:
-    for line in sys.stdin:
-        message = line.strip()
-        if not message:
-            continue
-        try:
-            payload = json.loads(message)
-        except json.JSONDecodeError:
-            response = make_error_response(None, JsonRpcError(ERROR_PARSE, "Parse error"))
-            write_response(response)
-            continue
-
-        response = handle_request(payload)
-        if response is not None:
-            write_response(response)
+def serve(
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    batch_stop_on_error: bool = False,
+    transport: Optional[Transport] = None,
+) -> None:
+    global _TRANSPORT
+    _TRANSPORT = transport or Transport()
+    dispatcher = RequestDispatcher(
+        functools.partial(handle_request, stop_on_error=batch_stop_on_error),
+        functools.partial(write_response, transport=_TRANSPORT),
+        max_workers=max_workers,
+    )
+    try:
+        for frame in _TRANSPORT.read_frames(sys.stdin.buffer):
+            try:
+                payload = _TRANSPORT.decode(frame)
+            except TransportError:
+                dispatcher.write(make_error_response(None, JsonRpcError(ERROR_PARSE, "Parse error")))
+                continue
+
+            dispatcher.submit(payload)
+    finally:
+        dispatcher.shutdown(wait=True)
+
+
+def serve_socket(
+    listen: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    batch_stop_on_error: bool = False,
+    transport: Optional[Transport] = None,
+    max_pending: Optional[int] = None,
+) -> None:
+    listener = create_listener(listen, max_workers, batch_stop_on_error, transport, max_pending)
+    try:
+        listener.serve_forever()
+    finally:
+        listener.shutdown()
+        listener.dispatcher.shutdown(wait=True)
+
+
+def create_listener(
+    listen: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    batch_stop_on_error: bool = False,
+    transport: Optional[Transport] = None,
+    max_pending: Optional[int] = None,
+) -> Any:
+    from desktop_runner.listener import DEFAULT_MAX_PENDING, RequestListener
+
+    global _TRANSPORT
+    _TRANSPORT = transport or Transport()
+    dispatcher = RequestDispatcher(
+        functools.partial(handle_request, stop_on_error=batch_stop_on_error),
+        write_response,
+        max_workers=max_workers,
+    )
+    return RequestListener(
+        listen,
+        dispatcher,
+        _TRANSPORT,
+        max_pending=max_pending or DEFAULT_MAX_PENDING,
+        on_parse_error=lambda: make_error_response(None, JsonRpcError(ERROR_PARSE, "Parse error")),
+    )
 
 
-def write_response(payload: Dict[str, Any]) -> None:
-    sys.stdout.write(json.dumps(payload) + "\n")
-    sys.stdout.flush()
+def write_response(payload: Any, transport: Optional[Transport] = None) -> None:
+    (transport or _TRANSPORT).write_message(sys.stdout.buffer, payload)
 
 
 def focus_window(scope: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -337,5 +622,70 @@ def focus_window(scope: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return window
 
 
+def configure_synthetic_backend(
+    tree_path: Optional[str] = None,
+    nodes: int = 1000,
+    latency_us: float = 0.0,
+) -> None:
+    global ADAPTERS
+    from desktop_runner.uia.synthetic import SyntheticDesktop
+
+    latency = {"*": latency_us / 1_000_000} if latency_us else None
+    if tree_path:
+        desktop = SyntheticDesktop.from_file(tree_path, latency=latency)
+    else:
+        desktop = SyntheticDesktop.generate(nodes=nodes, latency=latency)
+    ADAPTERS = AdapterManager(factory=lambda: desktop)
+    ADAPTERS.get()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="desktop_runner.server")
+    parser.add_argument("--framing", choices=[FRAMING_JSONL, FRAMING_LENGTH_PREFIXED], default=FRAMING_JSONL)
+    parser.add_argument("--codec", choices=["auto", "json", "orjson", "msgpack"], default="json")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--batch-stop-on-error", action="store_true")
+    parser.add_argument("--listen", help="serve clients on unix:<path> or tcp:<host>:<port> instead of stdio")
+    parser.add_argument("--max-pending", type=int, default=None, help="in-flight requests allowed per connection")
+    parser.add_argument(
+        "--max-match-attempts",
+        type=int,
+        default=None,
+        help="entries kept per trace after run-length compression (0 disables the cap)",
+    )
+    parser.add_argument("--backend", choices=["uia", "synthetic"], default="uia")
+    parser.add_argument("--synthetic-tree", help="JSON tree dump for the synthetic backend")
+    parser.add_argument("--synthetic-nodes", type=int, default=1000, help="generated tree size when no dump is given")
+    parser.add_argument("--synthetic-latency-us", type=float, default=0.0, help="injected cost per property read")
+    args = parser.parse_args(argv)
+
+    use_multithreaded_com()
+    if args.max_match_attempts is not None:
+        set_max_match_attempts(args.max_match_attempts)
+    if args.backend == "synthetic":
+        configure_synthetic_backend(args.synthetic_tree, args.synthetic_nodes, args.synthetic_latency_us)
+
+    try:
+        transport = make_transport(args.framing, args.codec)
+    except TransportError as exc:
+        parser.error(str(exc))
+    if args.listen:
+        from desktop_runner.listener import parse_listen_address
+
+        try:
+            parse_listen_address(args.listen)
+        except ValueError as exc:
+            parser.error(str(exc))
+        serve_socket(
+            args.listen,
+            max_workers=args.workers,
+            batch_stop_on_error=args.batch_stop_on_error,
+            transport=transport,
+            max_pending=args.max_pending,
+        )
+        return
+    serve(max_workers=args.workers, batch_stop_on_error=args.batch_stop_on_error, transport=transport)
+
+
 if __name__ == "__main__":
-    serve()
+    main()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import functools
+import importlib.util
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+FRAMING_JSONL = "jsonl"
+FRAMING_LENGTH_PREFIXED = "length-prefixed"
+
+_LENGTH_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class TransportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    module: str
+    binary: bool
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+def _json_encode(payload: Any) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_decode(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def _orjson_encode(payload: Any) -> bytes:
+    import orjson
+
+    return orjson.dumps(payload)
+
+
+def _orjson_decode(data: bytes) -> Any:
+    import orjson
+
+    return orjson.loads(data)
+
+
+def _msgpack_encode(payload: Any) -> bytes:
+    import msgpack
+
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _msgpack_decode(data: bytes) -> Any:
+    import msgpack
+
+    return msgpack.unpackb(data, raw=False)
+
+
+CODECS: Dict[str, Codec] = {
+    "json": Codec("json", "json", False, _json_encode, _json_decode),
+    "orjson": Codec("orjson", "orjson", False, _orjson_encode, _orjson_decode),
+    "msgpack": Codec("msgpack", "msgpack", True, _msgpack_encode, _msgpack_decode),
+}
+
+_CODEC_PREFERENCE = ("msgpack", "orjson", "json")
+
+
+@functools.lru_cache(maxsize=None)
+def _installed_codecs() -> Tuple[str, ...]:
+    return tuple(name for name, codec in CODECS.items() if importlib.util.find_spec(codec.module) is not None)
+
+
+def available_codecs() -> List[str]:
+    return list(_installed_codecs())
+
+
+def get_codec(name: str, framing: str = FRAMING_JSONL) -> Codec:
+    available = available_codecs()
+    if name == "auto":
+        for candidate in _CODEC_PREFERENCE:
+            if candidate in available and not (framing == FRAMING_JSONL and CODECS[candidate].binary):
+                return CODECS[candidate]
+        return CODECS["json"]
+    codec = CODECS.get(name)
+    if codec is None:
+        raise TransportError(f"Unknown codec: {name}")
+    if name not in available:
+        raise TransportError(f"Codec is not installed: {name}")
+    if framing == FRAMING_JSONL and codec.binary:
+        raise TransportError(f"Codec {name} requires {FRAMING_LENGTH_PREFIXED} framing")
+    return codec
+
+
+@dataclass(frozen=True)
+class Transport:
+    framing: str = FRAMING_JSONL
+    codec: Codec = CODECS["json"]
+
+    def read_frames(self, stream: BinaryIO) -> Iterator[bytes]:
+        if self.framing == FRAMING_LENGTH_PREFIXED:
+            return _read_length_prefixed(stream)
+        return _read_lines(stream)
+
+    def encode_frame(self, payload: Any) -> bytes:
+        data = self.codec.encode(payload)
+        if self.framing == FRAMING_LENGTH_PREFIXED:
+            return _LENGTH_HEADER.pack(len(data)) + data
+        return data + b"\n"
+
+    def decode(self, frame: bytes) -> Any:
+        try:
+            return self.codec.decode(frame)
+        except Exception as exc:
+            raise TransportError("Parse error") from exc
+
+    def write_message(self, stream: BinaryIO, payload: Any) -> None:
+        stream.write(self.encode_frame(payload))
+        stream.flush()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "framing": self.framing,
+            "codec": self.codec.name,
+            "framings": [FRAMING_JSONL, FRAMING_LENGTH_PREFIXED],
+            "codecs": available_codecs(),
+        }
+
+
+def make_transport(framing: str = FRAMING_JSONL, codec: str = "json") -> Transport:
+    if framing not in (FRAMING_JSONL, FRAMING_LENGTH_PREFIXED):
+        raise TransportError(f"Unknown framing: {framing}")
+    return Transport(framing=framing, codec=get_codec(codec, framing))
+
+
+def _read_lines(stream: BinaryIO) -> Iterator[bytes]:
+    for line in stream:
+        message = line.strip()
+        if message:
+            yield message
+
+
+def _read_length_prefixed(stream: BinaryIO) -> Iterator[bytes]:
+    while True:
+        header = _read_exact(stream, _LENGTH_HEADER.size)
+        if header is None:
+            return
+        (length,) = _LENGTH_HEADER.unpack(header)
+        if length > MAX_FRAME_BYTES:
+            raise TransportError(f"Frame too large: {length} bytes")
+        data = _read_exact(stream, length)
+        if data is None:
+            raise TransportError("Truncated frame")
+        yield data
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    chunks: List[bytes] = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise TransportError("Truncated frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
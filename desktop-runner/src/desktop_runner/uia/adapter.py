@@ -2,10 +2,40 @@ from __future__ import annotations
 
 import ctypes
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Any, Iterable, List, Optional
 
 from desktop_runner.errors import ScopeNotFound
+from desktop_runner.runtime.metrics import METRICS
+from desktop_runner.uia.events import ChangeNotifier, UIAEventSource
+from desktop_runner.uia.prefetch import (
+    CachedElement,
+    fetch_subtree,
+    is_prefetched,
+    prefetch_elements,
+    read_property,
+)
+from desktop_runner.uia.scope_cache import DEFAULT_SCOPE_CACHE_TTL_S, ScopeRootCache
+from desktop_runner.uia.search import (
+    LEAF_FIRST,
+    find_all,
+    follow_ancestry,
+    follow_path,
+    has_search_options,
+    hop_selector,
+    make_pruner,
+    make_skip,
+    walk,
+)
+from desktop_runner.uia.snapshot import TreeSnapshot, build_snapshot
+from desktop_runner.uia.spatial import GridIndex, near_box
+from desktop_runner.windows import get_input_desktop_name
+
+DEFAULT_DPI = 96
+MAX_HIT_TEST_CLIMB = 3
+MAX_SCOPED_EVENT_SOURCES = 8
 
 
 @dataclass
@@ -17,17 +47,99 @@ class BoundingRect:
 
 
 class UIAAdapter:
-    def __init__(self) -> None:
+    def __init__(self, scope_cache_ttl_s: float = DEFAULT_SCOPE_CACHE_TTL_S) -> None:
         if os.name != "nt":
             raise RuntimeError("UIA adapter is only available on Windows")
         from pywinauto import Desktop
+        from pywinauto.uia_defines import IUIA
 
+        self._uia: Any = IUIA()
         self._desktop = Desktop(backend="uia")
+        self._desktop_name = get_input_desktop_name()
+        self._scope_cache = ScopeRootCache(ttl_s=scope_cache_ttl_s)
+        self._events: Optional[UIAEventSource] = None
+        self._events_failed = False
+        self._scoped_events: "OrderedDict[Any, UIAEventSource]" = OrderedDict()
+        self._events_lock = threading.Lock()
+
+    def is_healthy(self) -> bool:
+        if get_input_desktop_name() != self._desktop_name:
+            return False
+        root = self._uia.iuia.GetRootElement()
+        return root is not None and root.CurrentProcessId is not None
+
+    def close(self) -> None:
+        with self._events_lock:
+            sources = list(self._scoped_events.values())
+            self._scoped_events.clear()
+            events, self._events = self._events, None
+        if events is not None:
+            sources.append(events)
+        for source in sources:
+            try:
+                source.stop()
+            except Exception:
+                pass
+        uia, self._uia = self._uia, None
+        if uia is not None:
+            _forget_uia(uia)
+
+    def change_notifier(self, scope: Optional[dict] = None) -> Optional[ChangeNotifier]:
+        # Unscoped waits keep polling: subtree events from every application on the
+        # desktop would wake them far more often than the poll interval.
+        if scope is None:
+            return None
+        with self._events_lock:
+            desktop = self._desktop_events()
+        if desktop is None:
+            return None
+        try:
+            window = self.get_scope_root(scope)
+        except ScopeNotFound:
+            return desktop.notifier
+        info = getattr(window, "element_info", None)
+        element = getattr(info, "element", None)
+        key = getattr(info, "handle", None) or getattr(info, "runtime_id", None)
+        if element is None or key is None:
+            return desktop.notifier
+        with self._events_lock:
+            source = self._scoped_events.get(key)
+            if source is not None:
+                self._scoped_events.move_to_end(key)
+                return source.notifier
+            source = UIAEventSource(ChangeNotifier(parent=desktop.notifier), window=element)
+            try:
+                source.start()
+            except Exception:
+                return desktop.notifier
+            self._scoped_events[key] = source
+            evicted = []
+            while len(self._scoped_events) > MAX_SCOPED_EVENT_SOURCES:
+                evicted.append(self._scoped_events.popitem(last=False)[1])
+        for old in evicted:
+            old.stop()
+        return source.notifier
+
+    def _desktop_events(self) -> Optional[UIAEventSource]:
+        if self._events is not None or self._events_failed:
+            return self._events
+        events = UIAEventSource()
+        try:
+            events.start()
+        except Exception:
+            self._events_failed = True
+            return None
+        self._events = events
+        return events
 
     def get_scope_root(self, scope: Optional[dict]) -> object:
         if scope is None:
             return self._desktop
 
+        cached = self._scope_cache.get(scope)
+        if cached is not None:
+            return cached
+
         title_contains = scope.get("window_title_contains")
         class_name = scope.get("window_class")
         process_name = scope.get("process_name")
@@ -48,31 +160,126 @@ class UIAAdapter:
 
         if not matches:
             raise ScopeNotFound()
-        return matches[0]
+        window = matches[0]
+        info = window.element_info
+        self._scope_cache.put(scope, window, getattr(info, "handle", None), getattr(info, "process_id", None))
+        return window
+
+    def invalidate_scope_cache(self, scope: Optional[dict] = None) -> None:
+        self._scope_cache.invalidate(scope)
+
+    def scope_cache_stats(self) -> dict:
+        return self._scope_cache.stats()
+
+    def snapshot(self, root: object) -> TreeSnapshot:
+        if isinstance(root, TreeSnapshot):
+            return root
+        cached = self._fetch_subtree(root)
+        elements = cached if cached is not None else walk(root)
+        return build_snapshot(root, elements, rect_reader=self._rect_from_element)
+
+    def prefetch(self, root: object) -> List[CachedElement]:
+        cached = self._fetch_subtree(root)
+        if cached is None:
+            cached = prefetch_elements(list(walk(root)), self._rect_from_element)
+        return cached
+
+    def _fetch_subtree(self, root: object) -> Optional[List[CachedElement]]:
+        return fetch_subtree(root)
+
+    def find_uia(self, root: object, selector: dict, limit: Optional[int] = None) -> List[object]:
+        if isinstance(root, TreeSnapshot):
+            return [record.element for record in root.query(selector, limit=limit)]
 
-    def find_uia(self, root: object, selector: dict) -> List[object]:
         control_type = selector.get("controlType")
         automation_id = selector.get("automationId")
         name = selector.get("name")
         class_name = selector.get("className")
 
-        if hasattr(root, "descendants"):
-            candidates = root.descendants(control_type=control_type) if control_type else root.descendants()
+        if has_search_options(selector):
+            candidates: Iterable[object] = walk(
+                root,
+                max_depth=selector.get("maxDepth"),
+                skip=make_skip(selector),
+                prune=make_pruner(selector),
+            )
         else:
-            candidates = root.windows(control_type=control_type) if control_type else root.windows()
+            candidates = find_all(root, control_type)
 
         matches = []
         for element in candidates:
-            info = element.element_info
-            if automation_id and automation_id != info.automation_id:
+            if control_type and control_type != read_property(element, "control_type"):
+                continue
+            if automation_id and automation_id != read_property(element, "automation_id"):
                 continue
-            if name and name != info.name:
+            if name and name != read_property(element, "name"):
                 continue
-            if class_name and class_name != info.class_name:
+            if class_name and class_name != read_property(element, "class_name"):
                 continue
             matches.append(element)
+            if limit is not None and len(matches) >= limit:
+                break
         return matches
 
+    def find_uia_path(self, root: object, selector: dict, limit: Optional[int] = None) -> List[object]:
+        path = selector.get("path") or []
+        if selector.get("order") != LEAF_FIRST:
+            return follow_path(root, path, limit=limit)
+        if not path:
+            return []
+        scope_root = root.root if isinstance(root, TreeSnapshot) else root
+        targets = self.find_uia(root, hop_selector(path[0]))
+        return follow_ancestry(targets, path[1:], scope_root, limit=limit)
+
+    def find_by_point(self, root: object, selector: dict) -> List[object]:
+        x = selector.get("x")
+        y = selector.get("y")
+        if not isinstance(x, int) or not isinstance(y, int):
+            return []
+        origin = self._rect_from_element(root)
+        scale = self.dpi_for(root) / (selector.get("dpi") or DEFAULT_DPI)
+        point_x = round(x * scale) + (origin.x if origin else 0)
+        point_y = round(y * scale) + (origin.y if origin else 0)
+        if origin is not None and not (
+            origin.x <= point_x < origin.x + origin.w and origin.y <= point_y < origin.y + origin.h
+        ):
+            return []
+
+        element = self.element_from_point(point_x, point_y)
+        if element is None or not self._is_within(element, root):
+            return []
+        expected = selector.get("controlType")
+        for _ in range(MAX_HIT_TEST_CLIMB + 1):
+            if element is None:
+                return []
+            if not expected or read_property(element, "control_type") == expected:
+                return [element]
+            if element == root:
+                return []
+            element = element.parent()
+        return []
+
+    def _is_within(self, element: object, root: object) -> bool:
+        # The hit test returns whatever is topmost on screen; a window overlapping the
+        # scope window must not hand its controls to a rung scoped elsewhere.
+        if root is self._desktop:
+            return True
+        while element is not None:
+            if element == root:
+                return True
+            element = element.parent()
+        return False
+
+    def element_from_point(self, x: int, y: int) -> Optional[object]:
+        return self._desktop.from_point(x, y)
+
+    def dpi_for(self, root: object) -> int:
+        handle = getattr(getattr(root, "element_info", None), "handle", None)
+        get_dpi = getattr(ctypes.windll.user32, "GetDpiForWindow", None) if handle else None
+        if get_dpi is None:
+            return DEFAULT_DPI
+        return get_dpi(handle) or DEFAULT_DPI
+
     def find_uia_near_label(self, root: object, selector: dict) -> List[object]:
         label_text = selector.get("label")
         control_type = selector.get("controlType")
@@ -82,31 +289,66 @@ class UIAAdapter:
         if not label_text:
             return []
 
+        if isinstance(root, TreeSnapshot):
+            return self._find_near_label_in_snapshot(root, label_text, control_type, max_distance, direction)
+
         labels = self.find_uia(root, {"name": label_text, "controlType": "Text"})
         if not labels:
             return []
 
         targets = self.find_uia(root, {"controlType": control_type} if control_type else {})
+        index: GridIndex[object] = GridIndex()
+        for element in targets:
+            rect = self._rect_from_element(element)
+            if rect is not None:
+                index.insert(element, rect)
+        label_rects = [self._rect_from_element(label) for label in labels]
+        return self._near_labels(index, label_rects, max_distance, direction)
+
+    def _find_near_label_in_snapshot(
+        self,
+        snapshot: TreeSnapshot,
+        label_text: str,
+        control_type: Optional[str],
+        max_distance: int,
+        direction: Optional[str],
+    ) -> List[object]:
+        labels = snapshot.query({"name": label_text, "controlType": "Text"})
+        if not labels:
+            return []
+
+        targets = snapshot.query({"controlType": control_type} if control_type else {})
+        index: GridIndex[object] = GridIndex()
+        for record in targets:
+            rect = snapshot.rect(record)
+            if rect is not None:
+                index.insert(record.element, rect)
+        label_rects = [snapshot.rect(label) for label in labels]
+        return self._near_labels(index, label_rects, max_distance, direction)
+
+    def _near_labels(
+        self,
+        index: GridIndex[object],
+        label_rects: List[Optional[BoundingRect]],
+        max_distance: int,
+        direction: Optional[str],
+    ) -> List[object]:
         matches = []
-        for label in labels:
-            label_rect = self._rect_from_element(label)
-            for element in targets:
-                rect = self._rect_from_element(element)
-                if rect is None or label_rect is None:
-                    continue
-                if not self._is_near(label_rect, rect, max_distance, direction):
-                    continue
-                matches.append(element)
+        for label_rect in label_rects:
+            if label_rect is None:
+                continue
+            for element, rect in index.query(near_box(label_rect, max_distance, direction)):
+                if self._is_near(label_rect, rect, max_distance, direction):
+                    matches.append(element)
         return matches
 
     def describe(self, element: object) -> dict:
-        info = element.element_info
         rect = self._rect_from_element(element)
         return {
-            "automationId": info.automation_id,
-            "name": info.name,
-            "controlType": info.control_type,
-            "className": info.class_name,
+            "automationId": read_property(element, "automation_id"),
+            "name": read_property(element, "name"),
+            "controlType": read_property(element, "control_type"),
+            "className": read_property(element, "class_name"),
             "boundingRect": rect.__dict__ if rect else None,
         }
 
@@ -134,18 +376,20 @@ class UIAAdapter:
 
     def is_visible(self, element: object) -> bool:
         if hasattr(element, "is_visible"):
+            if not is_prefetched(element):
+                METRICS.record_property_reads()
             return bool(element.is_visible())
         return True
 
     def get_focused_control_type(self) -> Optional[str]:
-        from pywinauto.uia_defines import IUIA
-
-        focused = IUIA().get_focused_element()
+        focused = self._uia.get_focused_element()
         if focused is None:
             return None
         return focused.current_control_type
 
     def _rect_from_element(self, element: object) -> Optional[BoundingRect]:
+        if not is_prefetched(element):
+            METRICS.record_property_reads()
         try:
             rect = element.rectangle()
         except Exception:
@@ -186,3 +430,12 @@ class UIAAdapter:
         GetModuleBaseName(process_handle, None, name_buffer, 260)
         CloseHandle(process_handle)
         return name_buffer.value
+
+
+def _forget_uia(uia: Any) -> None:
+    # pywinauto hands out one IUIA per process; drop it only while it is still the
+    # instance this adapter was built on, so the next adapter binds a fresh
+    # IUIAutomation to the current input desktop.
+    instances = getattr(type(uia), "_instances", None)
+    if isinstance(instances, dict) and instances.get(type(uia)) is uia:
+        del instances[type(uia)]
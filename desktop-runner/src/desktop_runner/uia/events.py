@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+CHANGE_KINDS = ("structure", "property", "focus", "window")
+EVENT_POLL_FALLBACK_S = 1.0
+MIN_REEVALUATE_INTERVAL_S = 0.05
+
+
+class ChangeNotifier:
+    def __init__(self, parent: Optional[ChangeNotifier] = None) -> None:
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._counts: Dict[str, int] = {kind: 0 for kind in CHANGE_KINDS}
+        self._subscribers: Set[threading.Event] = set()
+        self._children: Set[ChangeNotifier] = set()
+        self._parent = parent
+        if parent is not None:
+            parent._link(self)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def notify(self, kind: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+            subscribers = list(self._subscribers)
+            children = list(self._children)
+        for event in subscribers:
+            event.set()
+        for child in children:
+            child.notify(kind)
+
+    def detach(self) -> None:
+        if self._parent is not None:
+            self._parent._unlink(self)
+            self._parent = None
+
+    def _link(self, child: ChangeNotifier) -> None:
+        with self._lock:
+            self._children.add(child)
+
+    def _unlink(self, child: ChangeNotifier) -> None:
+        with self._lock:
+            self._children.discard(child)
+
+    def subscribe(self, event: threading.Event) -> None:
+        with self._lock:
+            self._subscribers.add(event)
+
+    def unsubscribe(self, event: threading.Event) -> None:
+        with self._lock:
+            self._subscribers.discard(event)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"generation": self._generation, "events": dict(self._counts)}
+
+
+class FakeEventSource:
+    def __init__(self, notifier: Optional[ChangeNotifier] = None) -> None:
+        self.notifier = notifier or ChangeNotifier()
+        self.started = False
+
+    def start(self) -> ChangeNotifier:
+        self.started = True
+        return self.notifier
+
+    def stop(self) -> None:
+        self.started = False
+
+    def emit(self, kind: str = "structure") -> None:
+        self.notifier.notify(kind)
+
+
+class UIAEventSource:
+    """UIA event handlers feeding one ``ChangeNotifier``.
+
+    Without a window, only desktop-wide focus-changed and window-opened handlers
+    are registered; both are rare. With a window element, structure-changed and
+    property-changed handlers are registered on that window's subtree only, so
+    clocks and progress bars in other applications never wake its waiters.
+    """
+
+    def __init__(self, notifier: Optional[ChangeNotifier] = None, window: Optional[Any] = None) -> None:
+        self.notifier = notifier or ChangeNotifier()
+        self._window = window
+        self._removers: List[Callable[[], None]] = []
+
+    def start(self) -> ChangeNotifier:
+        if os.name != "nt":
+            raise RuntimeError("UIA events are only available on Windows")
+        from pywinauto.uia_defines import IUIA
+
+        uia = IUIA()
+        try:
+            if self._window is None:
+                self._register_desktop(uia.UIA_dll, uia.iuia)
+            else:
+                self._register_window(uia.UIA_dll, uia.iuia, self._window)
+        except Exception:
+            self.stop()
+            raise
+        return self.notifier
+
+    def stop(self) -> None:
+        removers, self._removers = self._removers, []
+        for remove in reversed(removers):
+            try:
+                remove()
+            except Exception:
+                pass
+        self.notifier.detach()
+
+    def _register_desktop(self, client: Any, iuia: Any) -> None:
+        handler = _make_handler(client, self.notifier)
+        root = iuia.GetRootElement()
+        opened = client.UIA_Window_WindowOpenedEventId
+        iuia.AddFocusChangedEventHandler(None, handler)
+        self._removers.append(lambda: iuia.RemoveFocusChangedEventHandler(handler))
+        iuia.AddAutomationEventHandler(opened, root, client.TreeScope_Subtree, None, handler)
+        self._removers.append(lambda: iuia.RemoveAutomationEventHandler(opened, root, handler))
+
+    def _register_window(self, client: Any, iuia: Any, window: Any) -> None:
+        import ctypes
+
+        handler = _make_handler(client, self.notifier)
+        scope = client.TreeScope_Subtree
+        iuia.AddStructureChangedEventHandler(window, scope, None, handler)
+        self._removers.append(lambda: iuia.RemoveStructureChangedEventHandler(window, handler))
+        properties = [
+            client.UIA_NamePropertyId,
+            client.UIA_ValueValuePropertyId,
+            client.UIA_IsEnabledPropertyId,
+            client.UIA_IsOffscreenPropertyId,
+        ]
+        array = (ctypes.c_int * len(properties))(*properties)
+        iuia.AddPropertyChangedEventHandlerNativeArray(window, scope, None, handler, array, len(properties))
+        self._removers.append(lambda: iuia.RemovePropertyChangedEventHandler(window, handler))
+
+
+def _make_handler(client: Any, notifier: ChangeNotifier) -> Any:
+    from comtypes import COMObject
+
+    class _ChangeHandler(COMObject):
+        _com_interfaces_ = [
+            client.IUIAutomationStructureChangedEventHandler,
+            client.IUIAutomationFocusChangedEventHandler,
+            client.IUIAutomationEventHandler,
+            client.IUIAutomationPropertyChangedEventHandler,
+        ]
+
+        def HandleStructureChangedEvent(self, sender: Any, change_type: Any, runtime_id: Any) -> int:
+            notifier.notify("structure")
+            return 0
+
+        def HandleFocusChangedEvent(self, sender: Any) -> int:
+            notifier.notify("focus")
+            return 0
+
+        def HandleAutomationEvent(self, sender: Any, event_id: Any) -> int:
+            notifier.notify("window")
+            return 0
+
+        def HandlePropertyChangedEvent(self, sender: Any, property_id: Any, new_value: Any) -> int:
+            notifier.notify("property")
+            return 0
+
+    return _ChangeHandler()
+
+
+def change_notifier(adapter: Any, scope: Optional[Dict[str, Any]] = None) -> Optional[ChangeNotifier]:
+    get_notifier = getattr(adapter, "change_notifier", None)
+    if get_notifier is None:
+        return None
+    try:
+        return get_notifier(scope)
+    except Exception:
+        return None
+
+
+def poll_interval_s(notifier: Optional[ChangeNotifier], default_s: float) -> float:
+    return max(default_s, EVENT_POLL_FALLBACK_S) if notifier is not None else default_s
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from desktop_runner.uia.protocol import DesktopAdapter
+
+DEFAULT_HEALTH_CHECK_INTERVAL_S = 0.5
+
+
+class AdapterManager:
+    def __init__(
+        self,
+        factory: Optional[Callable[[], DesktopAdapter]] = None,
+        health_check_interval_s: float = DEFAULT_HEALTH_CHECK_INTERVAL_S,
+    ) -> None:
+        self._factory = factory
+        self._health_check_interval_s = health_check_interval_s
+        self._adapter: Optional[DesktopAdapter] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+        self._invalidated = 0
+        self._health_checks = 0
+
+    def get(self) -> DesktopAdapter:
+        with self._lock:
+            adapter = self._adapter
+            if adapter is not None and not self._check_health(adapter):
+                self._discard()
+                adapter = None
+            if adapter is None:
+                adapter = self._create()
+                self._adapter = adapter
+                self._checked_at = time.monotonic()
+                self._created += 1
+            else:
+                self._reused += 1
+            return adapter
+
+    def peek(self) -> Optional[DesktopAdapter]:
+        return self._adapter
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._adapter is not None:
+                self._discard()
+
+    def report_failure(self, exc: BaseException) -> None:
+        if is_com_error(exc):
+            self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._adapter is not None,
+            "created": self._created,
+            "reused": self._reused,
+            "invalidated": self._invalidated,
+            "health_checks": self._health_checks,
+        }
+
+    def _create(self) -> DesktopAdapter:
+        if self._factory is not None:
+            return self._factory()
+        from desktop_runner.uia.adapter import UIAAdapter
+
+        return UIAAdapter()
+
+    def _check_health(self, adapter: DesktopAdapter) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self._health_check_interval_s:
+            return True
+        self._checked_at = now
+        self._health_checks += 1
+        is_healthy = getattr(adapter, "is_healthy", None)
+        if is_healthy is None:
+            return True
+        try:
+            return bool(is_healthy())
+        except Exception:
+            return False
+
+    def _discard(self) -> None:
+        adapter, self._adapter = self._adapter, None
+        self._invalidated += 1
+        close = getattr(adapter, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception:
+            return
+
+
+def is_com_error(exc: Optional[BaseException]) -> bool:
+    while exc is not None:
+        if type(exc).__name__ == "COMError":
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from desktop_runner.runtime.metrics import METRICS
+
+PREFETCH_PROPERTIES = ("name", "automation_id", "control_type", "class_name", "visible", "rect")
+
+
+class CachedRect:
+    def __init__(self, left: int, top: int, right: int, bottom: int) -> None:
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+
+
+class CachedElement:
+    prefetched = True
+
+    def __init__(self, live: Any, properties: Dict[str, Any]) -> None:
+        self._live = live
+        self._rect: Optional[CachedRect] = properties.get("rect")
+        self.element_info = SimpleNamespace(
+            name=properties.get("name"),
+            automation_id=properties.get("automation_id"),
+            control_type=properties.get("control_type"),
+            class_name=properties.get("class_name"),
+            visible=properties.get("visible", True),
+        )
+
+    @property
+    def live(self) -> Any:
+        if callable(self._live):
+            self._live = self._live()
+        return self._live
+
+    def rectangle(self) -> CachedRect:
+        if self._rect is None:
+            raise ValueError("Bounding rectangle was not prefetched")
+        return self._rect
+
+    def is_visible(self) -> bool:
+        return bool(self.element_info.visible)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.live, name)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CachedElement):
+            other = other.live
+        return self.live == other
+
+    def __hash__(self) -> int:
+        return hash(self.live)
+
+
+def is_prefetched(element: Any) -> bool:
+    return getattr(element, "prefetched", False) is True
+
+
+def read_property(element: Any, name: str) -> Any:
+    if not is_prefetched(element):
+        METRICS.record_property_reads()
+    return getattr(element.element_info, name)
+
+
+def fetch_subtree(root: Any) -> Optional[List[CachedElement]]:
+    if os.name != "nt":
+        return None
+    com_root = getattr(getattr(root, "element_info", None), "element", None)
+    if com_root is None:
+        return None
+    from pywinauto.controls.uiawrapper import UIAWrapper
+    from pywinauto.uia_defines import IUIA
+    from pywinauto.uia_element_info import UIAElementInfo
+
+    uia = IUIA()
+    client = uia.UIA_dll
+    request = uia.iuia.CreateCacheRequest()
+    for property_id in (
+        client.UIA_NamePropertyId,
+        client.UIA_AutomationIdPropertyId,
+        client.UIA_ControlTypePropertyId,
+        client.UIA_ClassNamePropertyId,
+        client.UIA_IsOffscreenPropertyId,
+        client.UIA_BoundingRectanglePropertyId,
+    ):
+        request.AddProperty(property_id)
+    found = com_root.FindAllBuildCache(client.TreeScope_Descendants, uia.true_condition, request)
+    METRICS.record_property_reads()
+
+    elements: List[CachedElement] = []
+    for index in range(found.Length):
+        com_element = found.GetElement(index)
+        rect = com_element.CachedBoundingRectangle
+        properties = {
+            "name": com_element.CachedName,
+            "automation_id": com_element.CachedAutomationId,
+            "control_type": uia.known_control_type_ids.get(com_element.CachedControlType),
+            "class_name": com_element.CachedClassName,
+            "visible": not com_element.CachedIsOffscreen,
+            "rect": CachedRect(rect.left, rect.top, rect.right, rect.bottom),
+        }
+        elements.append(
+            CachedElement(lambda com_element=com_element: UIAWrapper(UIAElementInfo(com_element)), properties)
+        )
+    METRICS.record_prefetch(len(elements))
+    return elements
+
+
+def prefetch_elements(elements: List[Any], rect_reader: Any) -> List[CachedElement]:
+    cached = []
+    for element in elements:
+        if is_prefetched(element):
+            cached.append(element)
+            continue
+        properties: Dict[str, Any] = {
+            name: read_property(element, name)
+            for name in ("name", "automation_id", "control_type", "class_name")
+        }
+        properties["visible"] = getattr(element.element_info, "visible", True)
+        rect = rect_reader(element)
+        if rect is not None:
+            properties["rect"] = CachedRect(rect.x, rect.y, rect.x + rect.w, rect.y + rect.h)
+        cached.append(CachedElement(element, properties))
+    METRICS.record_prefetch(len(cached))
+    return cached
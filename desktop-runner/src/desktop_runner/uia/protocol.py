@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class DesktopAdapter(Protocol):
+    def get_scope_root(self, scope: Optional[dict]) -> Any: ...
+
+    def snapshot(self, root: Any) -> Any: ...
+
+    def find_uia(self, root: Any, selector: dict, limit: Optional[int] = None) -> List[Any]: ...
+
+    def find_uia_path(self, root: Any, selector: dict, limit: Optional[int] = None) -> List[Any]: ...
+
+    def find_uia_near_label(self, root: Any, selector: dict) -> List[Any]: ...
+
+    def find_by_point(self, root: Any, selector: dict) -> List[Any]: ...
+
+    def describe(self, element: Any) -> dict: ...
+
+    def click(self, element: Any, button: str, clicks: int) -> None: ...
+
+    def paste_text(self, element: Any, text: str) -> None: ...
+
+    def set_value(self, element: Any, value: str) -> None: ...
+
+    def get_value(self, element: Any) -> str: ...
+
+    def is_visible(self, element: Any) -> bool: ...
+
+    def get_focused_control_type(self) -> Optional[str]: ...
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from desktop_runner.windows import describe_window
+
+DEFAULT_SCOPE_CACHE_TTL_S = 5.0
+
+ScopeKey = Tuple[str, str, str]
+
+
+@dataclass
+class _Entry:
+    window: Any
+    hwnd: int
+    process_id: Optional[int]
+    expires_at: float
+
+
+def scope_cache_key(scope: Dict[str, Any]) -> ScopeKey:
+    return (
+        (scope.get("window_title_contains") or "").lower(),
+        (scope.get("window_class") or "").lower(),
+        (scope.get("process_name") or "").lower(),
+    )
+
+
+class ScopeRootCache:
+    def __init__(
+        self,
+        ttl_s: float = DEFAULT_SCOPE_CACHE_TTL_S,
+        describe: Callable[..., Optional[Dict[str, Any]]] = describe_window,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self._describe = describe
+        self._clock = clock
+        self._entries: Dict[ScopeKey, _Entry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, scope: Dict[str, Any]) -> Optional[Any]:
+        key = scope_cache_key(scope)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self._clock() >= entry.expires_at or not self._still_matches(entry, key):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            self.stale += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.window
+
+    def put(self, scope: Dict[str, Any], window: Any, hwnd: Optional[int], process_id: Optional[int]) -> None:
+        if not hwnd or self.ttl_s <= 0:
+            return
+        entry = _Entry(window=window, hwnd=int(hwnd), process_id=process_id, expires_at=self._clock() + self.ttl_s)
+        with self._lock:
+            self._entries[scope_cache_key(scope)] = entry
+
+    def invalidate(self, scope: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            if scope is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(scope_cache_key(scope), None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "stale": self.stale}
+
+    def _still_matches(self, entry: _Entry, key: ScopeKey) -> bool:
+        descriptor = self._describe(entry.hwnd, include_process_name=False)
+        if descriptor is None:
+            return False
+        if entry.process_id is not None and descriptor.get("process_id") != entry.process_id:
+            return False
+        title_contains, class_name, _ = key
+        if title_contains and title_contains not in (descriptor.get("title") or "").lower():
+            return False
+        if class_name and class_name != (descriptor.get("class") or "").lower():
+            return False
+        return True
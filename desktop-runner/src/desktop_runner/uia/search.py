@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from desktop_runner.uia.prefetch import read_property
+
+SEARCH_OPTIONS = ("maxDepth", "skipOffscreen", "skipCollapsed", "pruneControlTypes")
+MATCH_LIMIT = 2
+LEAF_FIRST = "leaf_first"
+HOP_FIELDS = ("controlType", "automationId", "name")
+
+Pruner = Callable[[Any], bool]
+
+
+def has_search_options(selector: Dict[str, Any]) -> bool:
+    return any(selector.get(option) for option in SEARCH_OPTIONS)
+
+
+def make_skip(selector: Dict[str, Any]) -> Optional[Pruner]:
+    if selector.get("skipOffscreen"):
+        return _is_offscreen
+    return None
+
+
+def make_pruner(selector: Dict[str, Any]) -> Optional[Pruner]:
+    checks: List[Pruner] = []
+    pruned_types = {control_type for control_type in selector.get("pruneControlTypes") or [] if control_type}
+    if pruned_types:
+        checks.append(lambda element: read_property(element, "control_type") in pruned_types)
+    if selector.get("skipCollapsed"):
+        checks.append(_is_collapsed)
+    if not checks:
+        return None
+    return lambda element: any(check(element) for check in checks)
+
+
+def find_all(root: Any, control_type: Optional[str] = None) -> List[Any]:
+    """Every element under ``root`` in one provider-side query (a single FindAll on UIA)."""
+    criteria = {"control_type": control_type} if control_type else {}
+    if hasattr(root, "descendants"):
+        return root.descendants(**criteria)
+    return root.windows(**criteria)
+
+
+def walk(
+    root: Any,
+    max_depth: Optional[int] = None,
+    skip: Optional[Pruner] = None,
+    prune: Optional[Pruner] = None,
+) -> Iterator[Any]:
+    # Walking child by child costs one cross-process call per node, so it is only
+    # worth it when depth limits or pruning can skip whole subtrees.
+    if (max_depth is None and skip is None and prune is None) or not hasattr(root, "children"):
+        yield from find_all(root)
+        return
+
+    stack: List[Tuple[Any, int]] = [(child, 1) for child in reversed(root.children())]
+    while stack:
+        element, depth = stack.pop()
+        if skip is not None and skip(element):
+            continue
+        yield element
+        if max_depth is not None and depth >= max_depth:
+            continue
+        if prune is not None and prune(element):
+            continue
+        stack.extend((child, depth + 1) for child in reversed(element.children()))
+
+
+def follow_path(root: Any, path: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Any]:
+    if not path:
+        return []
+    if _matches_hop(root, path[0]) and not any(_matches_hop(child, path[0]) for child in _children(root)):
+        path = path[1:]
+        if not path:
+            return [root]
+
+    matches: List[Any] = []
+    stack: List[Tuple[Any, int]] = [(root, 0)]
+    while stack:
+        element, depth = stack.pop()
+        hop = path[depth]
+        candidates = [child for child in _children(element) if _matches_hop(child, hop)]
+        index = hop.get("index")
+        if index is not None:
+            candidates = candidates[index : index + 1]
+        if depth == len(path) - 1:
+            for candidate in candidates:
+                matches.append(candidate)
+                if limit is not None and len(matches) >= limit:
+                    return matches
+            continue
+        stack.extend((candidate, depth + 1) for candidate in reversed(candidates))
+    return matches
+
+
+def hop_selector(hop: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: hop[field] for field in HOP_FIELDS if hop.get(field)}
+
+
+def follow_ancestry(
+    candidates: Iterable[Any],
+    ancestors: List[Dict[str, Any]],
+    root: Any,
+    limit: Optional[int] = None,
+) -> List[Any]:
+    """Keep the candidates whose parents match ``ancestors``, nearest parent first.
+
+    Recorded ancestry is partial, so climbing stops successfully once it reaches
+    the scope root; hops left over describe elements above the scope.
+    """
+    matches: List[Any] = []
+    for candidate in candidates:
+        if _has_ancestry(candidate, ancestors, root):
+            matches.append(candidate)
+            if limit is not None and len(matches) >= limit:
+                break
+    return matches
+
+
+def _has_ancestry(element: Any, ancestors: List[Dict[str, Any]], root: Any) -> bool:
+    for hop in ancestors:
+        if element == root:
+            return True
+        element = element.parent()
+        if element is None or not _matches_hop(element, hop):
+            return False
+    return True
+
+
+def _children(element: Any) -> List[Any]:
+    if hasattr(element, "children"):
+        return element.children()
+    if hasattr(element, "windows"):
+        return element.windows()
+    return []
+
+
+def _matches_hop(element: Any, hop: Dict[str, Any]) -> bool:
+    if getattr(element, "element_info", None) is None:
+        return False
+    if hop.get("controlType") and hop["controlType"] != read_property(element, "control_type"):
+        return False
+    if hop.get("automationId") and hop["automationId"] != read_property(element, "automation_id"):
+        return False
+    if hop.get("name") and hop["name"] != read_property(element, "name"):
+        return False
+    return True
+
+
+def _is_offscreen(element: Any) -> bool:
+    visible = getattr(element.element_info, "visible", None)
+    return visible is False
+
+
+def _is_collapsed(element: Any) -> bool:
+    is_collapsed = getattr(element, "is_collapsed", None)
+    if is_collapsed is None:
+        return False
+    try:
+        return bool(is_collapsed())
+    except Exception:
+        return False
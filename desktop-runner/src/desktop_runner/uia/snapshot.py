@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from desktop_runner.uia.prefetch import read_property
+
+SELECTOR_FIELDS = ("automationId", "name", "controlType", "className")
+
+_UNSET = object()
+
+
+@dataclass
+class ElementRecord:
+    element: Any
+    automation_id: Optional[str]
+    name: Optional[str]
+    control_type: Optional[str]
+    class_name: Optional[str]
+    order: int
+    rect: Any = _UNSET
+
+    def field(self, selector_field: str) -> Optional[str]:
+        if selector_field == "automationId":
+            return self.automation_id
+        if selector_field == "name":
+            return self.name
+        if selector_field == "controlType":
+            return self.control_type
+        return self.class_name
+
+    def matches(self, required: Sequence[Tuple[str, Any]]) -> bool:
+        return all(self.field(field) == value for field, value in required)
+
+
+class TreeSnapshot:
+    def __init__(
+        self,
+        root: Any,
+        records: Iterable[ElementRecord],
+        rect_reader: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        self.root = root
+        self._records: List[ElementRecord] = []
+        self._pending: Optional[Iterator[ElementRecord]] = iter(records)
+        self._rect_reader = rect_reader
+        self._indexes: Dict[str, Dict[Optional[str], List[ElementRecord]]] = {
+            selector_field: {} for selector_field in SELECTOR_FIELDS
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def records(self) -> List[ElementRecord]:
+        self._fill()
+        return self._records
+
+    @property
+    def complete(self) -> bool:
+        return self._pending is None
+
+    @property
+    def loaded(self) -> int:
+        return len(self._records)
+
+    def candidates(self, selector_field: str, value: Optional[str]) -> List[ElementRecord]:
+        self._fill()
+        return self._indexes[selector_field].get(value, [])
+
+    def query(self, selector: Dict[str, Any], limit: Optional[int] = None) -> List[ElementRecord]:
+        if limit is None:
+            self._fill()
+        required = [(field, selector.get(field)) for field in SELECTOR_FIELDS if selector.get(field)]
+        required.sort(key=lambda predicate: len(self._indexes[predicate[0]].get(predicate[1], [])))
+        return self.match(required, limit=limit)
+
+    def match(self, predicates: Sequence[Tuple[str, Any]], limit: Optional[int] = None) -> List[ElementRecord]:
+        if limit is None:
+            self._fill()
+        if predicates:
+            field, value = predicates[0]
+            records: Iterable[ElementRecord] = self._indexes[field].get(value, [])
+            filters = predicates[1:]
+        else:
+            records = self._records
+            filters = ()
+
+        matches: List[ElementRecord] = []
+        for record in records:
+            if not record.matches(filters):
+                continue
+            matches.append(record)
+            if limit is not None and len(matches) >= limit:
+                return matches
+
+        while self._pending is not None and (limit is None or len(matches) < limit):
+            record = self._next()
+            if record is not None and record.matches(predicates):
+                matches.append(record)
+        return matches
+
+    def rect(self, record: ElementRecord) -> Any:
+        if record.rect is _UNSET:
+            record.rect = self._rect_reader(record.element) if self._rect_reader else None
+        return record.rect
+
+    def _fill(self) -> None:
+        while self._pending is not None:
+            self._next()
+
+    def _next(self) -> Optional[ElementRecord]:
+        if self._pending is None:
+            return None
+        record = next(self._pending, None)
+        if record is None:
+            self._pending = None
+            return None
+        self._records.append(record)
+        for selector_field, index in self._indexes.items():
+            index.setdefault(record.field(selector_field), []).append(record)
+        return record
+
+
+def build_snapshot(
+    root: Any,
+    elements: Iterable[Any],
+    rect_reader: Optional[Callable[[Any], Any]] = None,
+) -> TreeSnapshot:
+    return TreeSnapshot(root, _iter_records(elements), rect_reader=rect_reader)
+
+
+def _iter_records(elements: Iterable[Any]) -> Iterator[ElementRecord]:
+    for order, element in enumerate(elements):
+        yield ElementRecord(
+            element=element,
+            automation_id=read_property(element, "automation_id"),
+            name=read_property(element, "name"),
+            control_type=read_property(element, "control_type"),
+            class_name=read_property(element, "class_name"),
+            order=order,
+        )
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
+
+DEFAULT_CELL_SIZE_PX = 64
+MAX_CELLS_PER_ITEM = 256
+
+T = TypeVar("T")
+
+Box = Tuple[float, float, float, float]
+
+
+class GridIndex(Generic[T]):
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE_PX) -> None:
+        self._cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._oversized: List[int] = []
+        self._items: List[Tuple[T, Any]] = []
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def insert(self, item: T, rect: Any) -> None:
+        position = len(self._items)
+        self._items.append((item, rect))
+        col0, row0, col1, row1 = self._cell_range((rect.x, rect.y, rect.x + rect.w, rect.y + rect.h))
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > MAX_CELLS_PER_ITEM:
+            self._oversized.append(position)
+            return
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                self._cells.setdefault((col, row), []).append(position)
+        if self._bounds is None:
+            self._bounds = (col0, row0, col1, row1)
+        else:
+            min_col, min_row, max_col, max_row = self._bounds
+            self._bounds = (min(min_col, col0), min(min_row, row0), max(max_col, col1), max(max_row, row1))
+
+    def query(self, box: Box) -> List[Tuple[T, Any]]:
+        positions = set(self._oversized)
+        if self._bounds is not None:
+            col0, row0, col1, row1 = self._cell_range(box)
+            min_col, min_row, max_col, max_row = self._bounds
+            col0, row0 = max(col0, min_col), max(row0, min_row)
+            col1, row1 = min(col1, max_col), min(row1, max_row)
+            if col0 <= col1 and row0 <= row1:
+                if (col1 - col0 + 1) * (row1 - row0 + 1) > len(self._cells):
+                    for (col, row), bucket in self._cells.items():
+                        if col0 <= col <= col1 and row0 <= row <= row1:
+                            positions.update(bucket)
+                else:
+                    for col in range(col0, col1 + 1):
+                        for row in range(row0, row1 + 1):
+                            positions.update(self._cells.get((col, row), ()))
+        return [self._items[position] for position in sorted(positions)]
+
+    def _cell_range(self, box: Box) -> Tuple[int, int, int, int]:
+        left, top, right, bottom = box
+        return (
+            _cell(left, self._cell_size),
+            _cell(top, self._cell_size),
+            _cell(right, self._cell_size),
+            _cell(bottom, self._cell_size),
+        )
+
+
+def _cell(value: float, cell_size: int) -> int:
+    if math.isinf(value):
+        return -(2**62) if value < 0 else 2**62
+    return int(value // cell_size)
+
+
+def near_box(label: Any, max_distance: float, direction: Optional[str]) -> Box:
+    right = label.x + label.w
+    bottom = label.y + label.h
+    if direction == "right_of":
+        return (right, -math.inf, right + max_distance, math.inf)
+    if direction == "left_of":
+        return (label.x - max_distance, -math.inf, label.x, math.inf)
+    if direction == "above":
+        return (-math.inf, label.y - max_distance, math.inf, label.y)
+    if direction == "below":
+        return (-math.inf, bottom, math.inf, bottom + max_distance)
+    center_x = label.x + label.w / 2
+    center_y = label.y + label.h / 2
+    return (center_x - max_distance, center_y - max_distance, center_x + max_distance, center_y + max_distance)
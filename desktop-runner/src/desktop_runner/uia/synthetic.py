@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from desktop_runner.errors import ScopeNotFound
+from desktop_runner.runtime.metrics import METRICS
+from desktop_runner.uia.adapter import DEFAULT_DPI, UIAAdapter
+from desktop_runner.uia.events import ChangeNotifier, FakeEventSource
+from desktop_runner.uia.prefetch import CachedElement, CachedRect
+from desktop_runner.uia.scope_cache import DEFAULT_SCOPE_CACHE_TTL_S, ScopeRootCache
+
+SPIN_LATENCY_LIMIT_S = 0.001
+GENERATED_COLUMNS = 8
+GENERATED_COLUMN_WIDTH = 240
+GENERATED_ROW_HEIGHT = 24
+
+Latency = Dict[str, float]
+
+
+class SyntheticElementInfo:
+    def __init__(self, element: SyntheticElement, fields: Dict[str, Any]) -> None:
+        self._element = element
+        self._fields = fields
+
+    def _read(self, name: str) -> Any:
+        self._element.desktop.charge(name)
+        return self._fields.get(name)
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._read("name")
+
+    @property
+    def automation_id(self) -> Optional[str]:
+        return self._read("automation_id")
+
+    @property
+    def control_type(self) -> Optional[str]:
+        return self._read("control_type")
+
+    @property
+    def class_name(self) -> Optional[str]:
+        return self._read("class_name")
+
+    @property
+    def visible(self) -> bool:
+        return self._read("visible") is not False
+
+    @property
+    def handle(self) -> Optional[int]:
+        return self._read("handle")
+
+    @property
+    def process_id(self) -> Optional[int]:
+        return self._read("process_id")
+
+
+class SyntheticElement:
+    def __init__(self, desktop: SyntheticDesktop, fields: Dict[str, Any], parent: Optional[SyntheticElement]) -> None:
+        self.desktop = desktop
+        self.fields = fields
+        self._parent = parent
+        self._children: List[SyntheticElement] = []
+        self.element_info = SyntheticElementInfo(self, fields)
+
+    def __repr__(self) -> str:
+        return f"SyntheticElement({self.fields.get('control_type')!r}, {self.fields.get('name')!r})"
+
+    def parent(self) -> Optional[SyntheticElement]:
+        return self._parent
+
+    def children(self) -> List[SyntheticElement]:
+        self.desktop.charge("children")
+        return list(self._children)
+
+    def descendants(self, control_type: Optional[str] = None) -> List[SyntheticElement]:
+        self.desktop.charge("descendants")
+        return [
+            element
+            for element in self.iter_subtree()
+            if control_type is None or element.fields.get("control_type") == control_type
+        ]
+
+    def iter_subtree(self) -> Iterator[SyntheticElement]:
+        stack = list(reversed(self._children))
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element._children))
+
+    def rectangle(self) -> CachedRect:
+        self.desktop.charge("rect")
+        left, top, right, bottom = self.fields.get("rect") or (0, 0, 0, 0)
+        return CachedRect(left, top, right, bottom)
+
+    def window_text(self) -> str:
+        return self.element_info.name or ""
+
+    def is_visible(self) -> bool:
+        return self.element_info.visible
+
+    def is_collapsed(self) -> bool:
+        self.desktop.charge("collapsed")
+        return bool(self.fields.get("collapsed"))
+
+    def get_value(self) -> str:
+        self.desktop.charge("value")
+        return self.fields.get("value") or ""
+
+    def set_value(self, value: str) -> None:
+        self.fields["value"] = value
+        self.desktop.changed("property")
+
+    def set_focus(self) -> None:
+        self.desktop.focus(self)
+
+    def click_input(self, button: str = "left", double: bool = False) -> None:
+        self.desktop.clicks.append((self, button, double))
+        self.desktop.focus(self)
+
+
+class SyntheticDesktop(UIAAdapter):
+    def __init__(
+        self,
+        dump: Optional[Dict[str, Any]] = None,
+        latency: Optional[Latency] = None,
+        scope_cache_ttl_s: float = DEFAULT_SCOPE_CACHE_TTL_S,
+    ) -> None:
+        dump = dump or {"windows": []}
+        self.latency: Latency = dict(latency or {})
+        self.reads: Counter = Counter()
+        self.clicks: List[Any] = []
+        self.dpi = int(dump.get("dpi") or DEFAULT_DPI)
+        self._lock = threading.Lock()
+        self._next_handle = 0x10000
+        self._windows: List[SyntheticElement] = []
+        self._by_handle: Dict[int, SyntheticElement] = {}
+        self._focused: Optional[SyntheticElement] = None
+        self._desktop = self
+        self._scope_cache = ScopeRootCache(ttl_s=scope_cache_ttl_s, describe=self.describe_window)
+        self._event_source = FakeEventSource()
+        for window in dump.get("windows") or []:
+            self.add_window(window)
+        if self._windows:
+            self._focused = self._windows[0]
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], latency: Optional[Latency] = None) -> SyntheticDesktop:
+        with open(path, encoding="utf-8") as handle:
+            return cls(json.load(handle), latency=latency)
+
+    @classmethod
+    def generate(
+        cls,
+        nodes: int = 1000,
+        fanout: int = 8,
+        windows: int = 1,
+        seed: int = 0,
+        latency: Optional[Latency] = None,
+    ) -> SyntheticDesktop:
+        return cls(generate_dump(nodes=nodes, fanout=fanout, windows=windows, seed=seed), latency=latency)
+
+    def charge(self, name: str) -> None:
+        self.reads[name] += 1
+        delay = self.latency.get(name, self.latency.get("*", 0.0))
+        if delay <= 0:
+            return
+        if delay >= SPIN_LATENCY_LIMIT_S:
+            time.sleep(delay)
+            return
+        end = time.perf_counter() + delay
+        while time.perf_counter() < end:
+            pass
+
+    def changed(self, kind: str) -> None:
+        self._event_source.emit(kind)
+
+    def add_window(self, node: Dict[str, Any]) -> SyntheticElement:
+        with self._lock:
+            handle = node.get("handle") or self._next_handle
+            self._next_handle = max(self._next_handle, int(handle)) + 1
+        fields = _fields(node, control_type="Window")
+        fields["handle"] = int(handle)
+        fields["process_id"] = node.get("process_id") or 1000 + len(self._windows)
+        fields["process_name"] = node.get("process_name")
+        window = SyntheticElement(self, fields, None)
+        _attach_children(self, window, node.get("children") or [], fields["process_id"])
+        self._windows.append(window)
+        self._by_handle[fields["handle"]] = window
+        self.changed("window")
+        return window
+
+    def close_window(self, window: SyntheticElement) -> None:
+        self._windows.remove(window)
+        self._by_handle.pop(window.fields["handle"], None)
+        if self._focused is not None and (self._focused is window or _window_of(self._focused) is window):
+            self._focused = self._windows[0] if self._windows else None
+        self.changed("structure")
+
+    def add_child(self, parent: SyntheticElement, node: Dict[str, Any]) -> SyntheticElement:
+        child = _attach_children(self, parent, [node], parent.fields.get("process_id"))[0]
+        self.changed("structure")
+        return child
+
+    def remove(self, element: SyntheticElement) -> None:
+        parent = element.parent()
+        if parent is None:
+            self.close_window(element)
+            return
+        parent._children.remove(element)
+        self.changed("structure")
+
+    def focus(self, element: SyntheticElement) -> None:
+        self._focused = element
+        window = _window_of(element)
+        if window in self._windows:
+            self._windows.remove(window)
+            self._windows.insert(0, window)
+        self.changed("focus")
+
+    def windows(self, control_type: Optional[str] = None) -> List[SyntheticElement]:
+        self.charge("windows")
+        return [
+            window
+            for window in self._windows
+            if control_type is None or window.fields.get("control_type") == control_type
+        ]
+
+    def is_healthy(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._event_source.stop()
+
+    def change_notifier(self, scope: Optional[Dict[str, Any]] = None) -> Optional[ChangeNotifier]:
+        return self._event_source.start()
+
+    def describe_window(self, hwnd: int, include_process_name: bool = True) -> Optional[Dict[str, Any]]:
+        window = self._by_handle.get(hwnd)
+        if window is None:
+            return None
+        fields = window.fields
+        descriptor = {
+            "hwnd": hwnd,
+            "title": fields.get("name") or "",
+            "class": fields.get("class_name") or "",
+            "process_id": fields.get("process_id"),
+        }
+        if include_process_name:
+            descriptor["process_name"] = fields.get("process_name")
+        return descriptor
+
+    def get_active_window_descriptor(self) -> Optional[Dict[str, Any]]:
+        if not self._windows:
+            return None
+        return self.describe_window(self._windows[0].fields["handle"])
+
+    def focus_window(self, scope: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            window = self.get_scope_root(scope)
+        except ScopeNotFound:
+            return None
+        self.focus(window)
+        return self.describe_window(window.fields["handle"])
+
+    def get_focused_control_type(self) -> Optional[str]:
+        return self._focused.fields.get("control_type") if self._focused is not None else None
+
+    def paste_text(self, element: object, text: str) -> None:
+        element.set_focus()
+        element.set_value((element.get_value() or "") + text)
+
+    def element_from_point(self, x: int, y: int) -> Optional[object]:
+        self.charge("element_from_point")
+        for window in self._windows:
+            if not _contains(window.fields, x, y):
+                continue
+            hit = window
+            for element in window.iter_subtree():
+                if element.fields.get("visible") is not False and _contains(element.fields, x, y):
+                    hit = element
+            return hit
+        return None
+
+    def dpi_for(self, root: object) -> int:
+        return self.dpi
+
+    def _fetch_subtree(self, root: object) -> Optional[List[CachedElement]]:
+        if not isinstance(root, SyntheticElement):
+            return None
+        self.charge("prefetch")
+        METRICS.record_property_reads()
+        cached = []
+        for element in root.iter_subtree():
+            fields = element.fields
+            left, top, right, bottom = fields.get("rect") or (0, 0, 0, 0)
+            properties = {
+                "name": fields.get("name"),
+                "automation_id": fields.get("automation_id"),
+                "control_type": fields.get("control_type"),
+                "class_name": fields.get("class_name"),
+                "visible": fields.get("visible") is not False,
+                "rect": CachedRect(left, top, right, bottom),
+            }
+            cached.append(CachedElement(element, properties))
+        METRICS.record_prefetch(len(cached))
+        return cached
+
+    def _get_process_name(self, pid: int) -> Optional[str]:
+        for window in self._windows:
+            if window.fields.get("process_id") == pid:
+                return window.fields.get("process_name")
+        return None
+
+    def dump(self) -> Dict[str, Any]:
+        return {"dpi": self.dpi, "windows": [_dump_node(window) for window in self._windows]}
+
+
+def _fields(node: Dict[str, Any], control_type: Optional[str] = None) -> Dict[str, Any]:
+    rect = node.get("rect")
+    return {
+        "name": node.get("name") or "",
+        "automation_id": node.get("automation_id") or node.get("automationId") or "",
+        "control_type": node.get("control_type") or node.get("controlType") or control_type,
+        "class_name": node.get("class_name") or node.get("className") or "",
+        "rect": tuple(rect) if rect else None,
+        "value": node.get("value"),
+        "visible": node.get("visible", True),
+        "collapsed": node.get("collapsed", False),
+    }
+
+
+def _attach_children(
+    desktop: SyntheticDesktop,
+    parent: SyntheticElement,
+    nodes: List[Dict[str, Any]],
+    process_id: Optional[int],
+) -> List[SyntheticElement]:
+    attached = []
+    stack = [(parent, node) for node in reversed(nodes)]
+    while stack:
+        owner, node = stack.pop()
+        fields = _fields(node)
+        fields["process_id"] = process_id
+        element = SyntheticElement(desktop, fields, owner)
+        owner._children.append(element)
+        if owner is parent:
+            attached.append(element)
+        stack.extend((element, child) for child in reversed(node.get("children") or []))
+    return attached
+
+
+def _window_of(element: SyntheticElement) -> SyntheticElement:
+    while element.parent() is not None:
+        element = element.parent()
+    return element
+
+
+def _contains(fields: Dict[str, Any], x: int, y: int) -> bool:
+    rect = fields.get("rect")
+    if not rect:
+        return False
+    left, top, right, bottom = rect
+    return left <= x < right and top <= y < bottom
+
+
+def _dump_node(element: SyntheticElement) -> Dict[str, Any]:
+    fields = element.fields
+    # visible/collapsed are written below only when they differ from the default;
+    # filter booleans by type so numeric values such as 0 and 1 survive.
+    node: Dict[str, Any] = {
+        key: value
+        for key, value in fields.items()
+        if value is not None and value != "" and not isinstance(value, bool) and key != "process_id"
+    }
+    if element.parent() is None:
+        node["process_id"] = fields.get("process_id")
+    if fields.get("visible") is False:
+        node["visible"] = False
+    if fields.get("collapsed"):
+        node["collapsed"] = True
+    if "rect" in node:
+        node["rect"] = list(node["rect"])
+    if element._children:
+        node["children"] = [_dump_node(child) for child in element._children]
+    return node
+
+
+def generate_dump(nodes: int = 1000, fanout: int = 8, windows: int = 1, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    dump_windows = []
+    for window_index in range(windows):
+        root: Dict[str, Any] = {
+            "name": f"Synthetic Window {window_index}",
+            "class_name": "SyntheticWindow",
+            "process_name": "synthetic.exe",
+            "process_id": 4000 + window_index,
+            "rect": [0, 0, GENERATED_COLUMNS * GENERATED_COLUMN_WIDTH, (nodes // GENERATED_COLUMNS + 2) * GENERATED_ROW_HEIGHT],
+            "children": [],
+        }
+        created: List[Dict[str, Any]] = [root]
+        for number in range(1, nodes + 1):
+            parent = created[(number - 1) // fanout]
+            column = number % GENERATED_COLUMNS
+            row = number // GENERATED_COLUMNS
+            left = column * GENERATED_COLUMN_WIDTH
+            top = row * GENERATED_ROW_HEIGHT
+            node: Dict[str, Any] = {"rect": [left, top, left + GENERATED_COLUMN_WIDTH - 10, top + GENERATED_ROW_HEIGHT - 4]}
+            if number * fanout + 1 <= nodes:
+                node.update(control_type="Pane", automation_id=f"pane{number}", children=[])
+            elif column % 2 == 0:
+                node.update(control_type="Text", name=f"Label {number}")
+            else:
+                node.update(control_type="Edit", automation_id=f"edit{number}", value=f"value {rng.randint(0, 9999)}")
+            parent.setdefault("children", []).append(node)
+            created.append(node)
+        dump_windows.append(root)
+    return {"dpi": DEFAULT_DPI, "windows": dump_windows}
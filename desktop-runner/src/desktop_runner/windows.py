@@ -9,11 +9,22 @@ def get_active_window_descriptor() -> Optional[Dict[str, Any]]:
     if os.name != "nt":
         return None
 
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    hwnd = user32.GetForegroundWindow()
+    if not hwnd:
+        return None
+    return describe_window(hwnd)
+
+
+def describe_window(hwnd: int, include_process_name: bool = True) -> Optional[Dict[str, Any]]:
+    if os.name != "nt":
+        return None
+
     user32 = ctypes.WinDLL("user32", use_last_error=True)
     psapi = ctypes.WinDLL("psapi", use_last_error=True)
     kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
 
-    GetForegroundWindow = user32.GetForegroundWindow
+    IsWindow = user32.IsWindow
     GetWindowTextLength = user32.GetWindowTextLengthW
     GetWindowText = user32.GetWindowTextW
     GetClassName = user32.GetClassNameW
@@ -25,8 +36,7 @@ def get_active_window_descriptor() -> Optional[Dict[str, Any]]:
 
     PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
 
-    hwnd = GetForegroundWindow()
-    if not hwnd:
+    if not hwnd or not IsWindow(hwnd):
         return None
 
     length = GetWindowTextLength(hwnd)
@@ -40,12 +50,13 @@ def get_active_window_descriptor() -> Optional[Dict[str, Any]]:
     GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
 
     process_name = None
-    process_handle = OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
-    if process_handle:
-        name_buffer = ctypes.create_unicode_buffer(260)
-        GetModuleBaseName(process_handle, None, name_buffer, 260)
-        process_name = name_buffer.value
-        CloseHandle(process_handle)
+    if include_process_name:
+        process_handle = OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+        if process_handle:
+            name_buffer = ctypes.create_unicode_buffer(260)
+            GetModuleBaseName(process_handle, None, name_buffer, 260)
+            process_name = name_buffer.value
+            CloseHandle(process_handle)
 
     return {
         "hwnd": int(hwnd),
@@ -54,3 +65,28 @@ def get_active_window_descriptor() -> Optional[Dict[str, Any]]:
         "process_id": int(pid.value),
         "process_name": process_name,
     }
+
+
+def get_input_desktop_name() -> Optional[str]:
+    if os.name != "nt":
+        return None
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    OpenInputDesktop = user32.OpenInputDesktop
+    CloseDesktop = user32.CloseDesktop
+    GetUserObjectInformation = user32.GetUserObjectInformationW
+
+    DESKTOP_READOBJECTS = 0x0001
+    UOI_NAME = 2
+
+    desktop = OpenInputDesktop(0, False, DESKTOP_READOBJECTS)
+    if not desktop:
+        return None
+    try:
+        name_buffer = ctypes.create_unicode_buffer(256)
+        needed = ctypes.c_ulong()
+        if not GetUserObjectInformation(desktop, UOI_NAME, name_buffer, ctypes.sizeof(name_buffer), ctypes.byref(needed)):
+            return None
+        return name_buffer.value
+    finally:
+        CloseDesktop(desktop)
@@ -1,7 +1,11 @@
+import time
+
 import pytest
 
 from desktop_runner.assertions.check import check_assertions
 from desktop_runner.errors import AssertionFailed
+from desktop_runner.runtime.attempts import attempt_totals
+from desktop_runner.uia.synthetic import SyntheticDesktop
 
 
 class FakeAdapter:
@@ -72,3 +76,164 @@ def test_assert_check_fails_for_visibility(monkeypatch):
     trace = exc.value.data["trace"]
     assert trace["error_code"] == 1004
     assert trace["failed"][0]["kind"] == "desktop_element_visible"
+
+
+def test_assert_check_shares_one_scope_root_and_snapshot_per_round(monkeypatch):
+    desktop = SyntheticDesktop.generate(nodes=200)
+    calls = {"get_scope_root": 0, "snapshot": 0}
+    for name in calls:
+        original = getattr(desktop, name)
+
+        def counted(*args, _name=name, _original=original):
+            calls[_name] += 1
+            return _original(*args)
+
+        monkeypatch.setattr(desktop, name, counted)
+    scope = {"window_title_contains": "Synthetic Window 0"}
+    field = {"scope": scope, "ladder": [{"kind": "uia", "selector": {"automationId": "edit97"}}]}
+    label = {"scope": scope, "ladder": [{"kind": "uia", "selector": {"name": "Label 96"}}]}
+
+    result = check_assertions(
+        {
+            "run_id": "run_1",
+            "step_id": "step_1",
+            "assertions": [
+                {"kind": "desktop_element_exists", "target": field},
+                {"kind": "desktop_element_visible", "target": label},
+                {"kind": "desktop_value_contains", "target": field, "value": "value"},
+                {"kind": "not", "assert": {"kind": "desktop_value_equals", "target": field, "value": "other"}},
+            ],
+        },
+        adapter=desktop,
+    )
+
+    assert result["ok"] is True
+    assert attempt_totals(result["match_attempts"])["attempts"] == 4
+    assert calls == {"get_scope_root": 1, "snapshot": 1}
+
+
+def _synthetic_target(automation_id):
+    return {
+        "scope": {"window_title_contains": "Synthetic Window 0"},
+        "ladder": [{"kind": "uia", "selector": {"automationId": automation_id}}],
+    }
+
+
+def test_assert_check_waits_under_one_shared_deadline():
+    desktop = SyntheticDesktop.generate(nodes=50)
+    started = time.monotonic()
+
+    with pytest.raises(AssertionFailed) as exc:
+        check_assertions(
+            {
+                "run_id": "run_1",
+                "step_id": "step_1",
+                "assertions": [
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-1"), "timeout_ms": 300},
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("edit49")},
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-2"), "timeout_ms": 300},
+                ],
+            },
+            adapter=desktop,
+        )
+
+    assert time.monotonic() - started < 0.55
+    failed = exc.value.data["failed"]
+    assert [entry["index"] for entry in failed] == [0, 2]
+    assert all(entry["message"] for entry in failed)
+    attempts = exc.value.data["trace"]["match_attempts"]
+    assert attempt_totals(attempts)["attempts"] > 3
+    assert any(attempt["ok"] for attempt in attempts)
+
+
+def test_assert_check_reports_unexpired_waits_as_not_evaluated():
+    desktop = SyntheticDesktop.generate(nodes=50)
+    started = time.monotonic()
+
+    with pytest.raises(AssertionFailed) as exc:
+        check_assertions(
+            {
+                "run_id": "run_1",
+                "step_id": "step_1",
+                "assertions": [
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-1"), "timeout_ms": 5000},
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-2"), "timeout_ms": 100},
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("edit49"), "timeout_ms": 5000},
+                ],
+            },
+            adapter=desktop,
+        )
+
+    assert time.monotonic() - started < 1
+    assert [entry["index"] for entry in exc.value.data["failed"]] == [1]
+    assert [entry["index"] for entry in exc.value.data["not_evaluated"]] == [0]
+    assert exc.value.data["trace"]["not_evaluated"] == exc.value.data["not_evaluated"]
+
+
+def test_not_evaluated_assertions_keep_their_last_message_and_attempts():
+    desktop = SyntheticDesktop.generate(nodes=50)
+
+    with pytest.raises(AssertionFailed) as exc:
+        check_assertions(
+            {
+                "run_id": "run_1",
+                "step_id": "step_1",
+                "assertions": [
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-1"), "timeout_ms": 5000},
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-2"), "timeout_ms": 100},
+                ],
+            },
+            adapter=desktop,
+        )
+
+    failed = exc.value.data["failed"]
+    (pending,) = exc.value.data["not_evaluated"]
+    assert [entry["index"] for entry in failed] == [1]
+    assert pending["index"] == 0
+    assert pending["kind"] == "desktop_element_exists"
+    assert pending["message"] == failed[0]["message"] != "Assertion did not pass"
+    assert pending["attempts"] >= 1
+
+
+def test_assert_check_any_mode_passes_on_first_satisfied_assertion():
+    desktop = SyntheticDesktop.generate(nodes=50)
+    started = time.monotonic()
+
+    result = check_assertions(
+        {
+            "run_id": "run_1",
+            "step_id": "step_1",
+            "mode": "any",
+            "timeout_ms": 5000,
+            "assertions": [
+                {"kind": "desktop_element_exists", "target": _synthetic_target("missing")},
+                {"kind": "desktop_element_exists", "target": _synthetic_target("edit49")},
+            ],
+        },
+        adapter=desktop,
+    )
+
+    assert result["ok"] is True
+    assert time.monotonic() - started < 1
+
+
+def test_assert_check_any_mode_fails_when_every_assertion_times_out():
+    desktop = SyntheticDesktop.generate(nodes=50)
+
+    with pytest.raises(AssertionFailed) as exc:
+        check_assertions(
+            {
+                "run_id": "run_1",
+                "step_id": "step_1",
+                "mode": "any",
+                "timeout_ms": 100,
+                "assertions": [
+                    {"kind": "desktop_element_exists", "target": _synthetic_target("missing-1")},
+                    {"kind": "desktop_value_equals", "target": _synthetic_target("edit49"), "value": "never"},
+                ],
+            },
+            adapter=desktop,
+        )
+
+    assert [entry["index"] for entry in exc.value.data["failed"]] == [0, 1]
+    assert exc.value.data["failed"][1]["message"].startswith("Value mismatch")
@@ -0,0 +1,81 @@
+from desktop_runner import server
+from desktop_runner.actions.step_trace import StepTraceBuilder
+from desktop_runner.runtime import attempts as attempts_module
+from desktop_runner.runtime.attempts import attempt_totals, compress_attempts
+
+
+def _attempt(rung_index=0, matched_count=0, duration_ms=5, **extra):
+    attempt = {
+        "rung_index": rung_index,
+        "kind": "uia",
+        "matched_count": matched_count,
+        "duration_ms": duration_ms,
+        "ok": matched_count == 1,
+    }
+    attempt.update(extra)
+    return attempt
+
+
+def test_consecutive_identical_attempts_collapse_into_counted_entries():
+    attempts = [_attempt(duration_ms=3), _attempt(duration_ms=9), _attempt(duration_ms=6), _attempt(rung_index=1)]
+    attempts += [_attempt(duration_ms=2), _attempt(rung_index=0, matched_count=1)]
+
+    entries, truncated = compress_attempts(attempts, limit=0)
+
+    assert truncated is None
+    assert entries == [
+        _attempt(duration_ms=18, count=3, min_duration_ms=3, max_duration_ms=9),
+        _attempt(rung_index=1),
+        _attempt(duration_ms=2),
+        _attempt(matched_count=1),
+    ]
+    assert attempt_totals(entries) == {"attempts": 6, "duration_ms": 30}
+    assert compress_attempts(entries, limit=0)[0] == entries
+    assert attempts[0] == _attempt(duration_ms=3)
+
+
+def test_cap_keeps_head_and_tail_with_a_truncation_marker():
+    attempts = [_attempt(rung_index=index % 2, duration_ms=index) for index in range(100)]
+
+    entries, truncated = compress_attempts(attempts, limit=10)
+
+    assert len(entries) == 10
+    assert [entry["duration_ms"] for entry in entries] == [0, 1, 2, 3, 4, 95, 96, 97, 98, 99]
+    assert truncated == {"after_index": 5, "entries": 90, "attempts": 90, "duration_ms": sum(range(5, 95))}
+    assert attempt_totals(entries, truncated) == {"attempts": 100, "duration_ms": sum(range(100))}
+
+
+def test_step_trace_emits_compressed_attempts(monkeypatch):
+    monkeypatch.setattr(attempts_module, "_max_match_attempts", 2)
+    trace = StepTraceBuilder(run_id="run", step_id="step")
+    trace.match_attempts = [_attempt()] * 150 + [_attempt(rung_index=1), _attempt(rung_index=2, matched_count=1)]
+
+    payload = trace.finish()
+
+    assert payload["match_attempts"] == [
+        _attempt(duration_ms=750, count=150, min_duration_ms=5, max_duration_ms=5),
+        _attempt(rung_index=2, matched_count=1),
+    ]
+    assert payload["match_attempts_truncated"] == {"after_index": 1, "entries": 1, "attempts": 1, "duration_ms": 5}
+
+
+def test_error_responses_carry_compressed_attempts(monkeypatch):
+    monkeypatch.setattr(server, "ADAPTERS", server.ADAPTERS)
+    server.configure_synthetic_backend(nodes=20)
+    target = {
+        "scope": {"window_title_contains": "Synthetic Window 0"},
+        "ladder": [{"kind": "uia", "selector": {"automationId": "missing"}}],
+    }
+
+    response = server.handle_request(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "target.resolve",
+            "params": {"target": target, "retry": {"attempts": 20, "wait_ms": 1}},
+        }
+    )
+
+    entries = response["error"]["data"]["match_attempts"]
+    assert len(entries) == 1
+    assert entries[0]["count"] == 21
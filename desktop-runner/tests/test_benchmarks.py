@@ -0,0 +1,51 @@
+import json
+
+from desktop_runner import benchmarks
+
+
+def _results(**medians):
+    return {"results": {name: {"median_ms": value} for name, value in medians.items()}}
+
+
+def test_quick_run_covers_every_hot_path():
+    results = benchmarks.run_benchmarks(sizes=(60,), densities=((4, 2),), repeat=1)
+
+    names = list(results["results"])
+    for prefix in (
+        "resolve_ladder.first_rung",
+        "resolve_ladder.deep_fallback",
+        "resolve_ladder.ambiguous",
+        "find_uia.automation_id",
+        "find_uia_near_label",
+        "check_assertions.timeout_100ms",
+        "handle_request.target_resolve",
+    ):
+        assert any(name.startswith(prefix) for name in names), prefix
+    assert results["results"]["find_uia.automation_id[60]"]["property_reads"] > 60
+    assert results["results"]["resolve_ladder.first_rung[60]"]["runs"] == 1
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = _results(fast=1.0, steady=2.0, gone=1.0)
+    current = _results(fast=1.5, steady=2.2, added=3.0)
+
+    comparison = benchmarks.compare_results(baseline, current, threshold=0.2)
+
+    assert comparison["regressions"] == ["fast"]
+    assert comparison["missing"] == ["gone"]
+    assert {row["name"]: row["status"] for row in comparison["rows"]} == {
+        "fast": "regression",
+        "steady": "ok",
+        "added": "new",
+    }
+
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    current = tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(resolve=1.0)), encoding="utf-8")
+    current.write_text(json.dumps(_results(resolve=1.1)), encoding="utf-8")
+
+    assert benchmarks.main(["compare", str(baseline), str(current)]) == 0
+    assert benchmarks.main(["compare", str(baseline), str(current), "--threshold", "0.05"]) == 1
+    assert "regression" in capsys.readouterr().out
@@ -0,0 +1,191 @@
+import threading
+import time
+
+import pytest
+
+from desktop_runner import server
+from desktop_runner.assertions.check import check_assertions
+from desktop_runner.errors import DeadlineExceeded, RequestCancelled
+from desktop_runner.runtime.dispatcher import RequestDispatcher
+from desktop_runner.runtime.request_context import ClientConnection, RequestContext
+from desktop_runner.selector.resolve import resolve_ladder
+
+
+class CancellingAdapter:
+    def __init__(self, context):
+        self.context = context
+        self.calls = 0
+
+    def get_scope_root(self, scope):
+        return "root"
+
+    def find_uia(self, root, selector, limit=None):
+        self.calls += 1
+        self.context.cancel()
+        return []
+
+    def find_uia_near_label(self, root, selector):
+        return []
+
+
+def test_context_sleep_wakes_on_cancel():
+    context = RequestContext()
+    threading.Timer(0.05, context.cancel).start()
+    start = time.monotonic()
+
+    with pytest.raises(RequestCancelled):
+        context.sleep(5)
+
+    assert time.monotonic() - start < 1
+
+
+def test_resolve_ladder_stops_between_rungs_when_cancelled():
+    context = RequestContext()
+    adapter = CancellingAdapter(context)
+    target = {
+        "ladder": [
+            {"kind": "uia", "selector": {"id": "a"}, "confidence": 0.9},
+            {"kind": "uia", "selector": {"id": "b"}, "confidence": 0.5},
+        ]
+    }
+
+    with pytest.raises(RequestCancelled) as exc:
+        resolve_ladder(target, adapter=adapter, retry={"attempts": 10, "wait_ms": 1000}, context=context)
+
+    assert adapter.calls == 1
+    assert len(exc.value.data["match_attempts"]) == 1
+
+
+def test_assertion_wait_stops_at_request_deadline(monkeypatch):
+    def missing(target, **_):
+        from desktop_runner.errors import ElementNotFound
+
+        raise ElementNotFound(data={"match_attempts": [{"rung_index": 0}]})
+
+    monkeypatch.setattr("desktop_runner.assertions.check.resolve_ladder", missing)
+    context = RequestContext(deadline=time.monotonic() + 0.1)
+    start = time.monotonic()
+
+    with pytest.raises(DeadlineExceeded) as exc:
+        check_assertions(
+            {
+                "run_id": "run",
+                "step_id": "step",
+                "assertions": [{"kind": "desktop_element_exists", "target": {"ladder": []}, "timeout_ms": 30000}],
+            },
+            adapter=object(),
+            context=context,
+        )
+
+    assert time.monotonic() - start < 2
+    assert exc.value.data["trace"]["error_code"] == 1005
+    assert exc.value.data["match_attempts"]
+
+
+def test_cancel_request_notification_stops_running_request(monkeypatch):
+    started = threading.Event()
+
+    def slow_check(params):
+        started.set()
+        from desktop_runner.runtime.request_context import current_context
+
+        current_context().sleep(10)
+        return {"ok": True}
+
+    monkeypatch.setitem(server.HANDLERS, "assert.check", slow_check)
+    responses = []
+    dispatcher = RequestDispatcher(server.handle_request, responses.append, max_workers=2)
+
+    dispatcher.submit({"jsonrpc": "2.0", "id": 5, "method": "assert.check", "params": {}})
+    assert started.wait(timeout=5)
+    dispatcher.submit({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 5}})
+    dispatcher.shutdown(wait=True)
+
+    assert len(responses) == 1
+    assert responses[0]["id"] == 5
+    assert responses[0]["error"]["code"] == RequestCancelled().code
+
+
+def test_expired_deadline_fails_before_handler_runs(monkeypatch):
+    calls = []
+    monkeypatch.setitem(server.HANDLERS, "assert.check", lambda params: calls.append(params) or {})
+
+    response = server.handle_request(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "assert.check",
+            "params": {"deadline_epoch_ms": (time.time() - 1) * 1000},
+        }
+    )
+
+    assert response["error"]["code"] == 1005
+    assert response["error"]["message"] == "Request deadline exceeded"
+    assert calls == []
+
+
+def test_cancel_is_scoped_to_the_sending_connection(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_check(params):
+        started.set()
+        from desktop_runner.runtime.request_context import current_context
+
+        context = current_context()
+        while not release.is_set():
+            context.sleep(0.01)
+        return {"ok": True}
+
+    monkeypatch.setitem(server.HANDLERS, "assert.check", slow_check)
+    responses = []
+    dispatcher = RequestDispatcher(server.handle_request, responses.append, max_workers=2)
+    first, second = ClientConnection(), ClientConnection()
+
+    dispatcher.submit({"jsonrpc": "2.0", "id": 1, "method": "assert.check", "params": {}}, connection=first)
+    assert started.wait(timeout=5)
+    dispatcher.submit({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 1}}, connection=second)
+    release.set()
+    dispatcher.shutdown(wait=True)
+
+    assert responses == [{"jsonrpc": "2.0", "id": 1, "result": {"ok": True}}]
+
+
+def test_cancel_for_a_finished_request_does_not_leak_onto_a_reused_id(monkeypatch):
+    monkeypatch.setitem(server.HANDLERS, "assert.check", lambda params: {"ok": True})
+    responses = []
+    dispatcher = RequestDispatcher(server.handle_request, responses.append, max_workers=1)
+    request = {"jsonrpc": "2.0", "id": 7, "method": "assert.check", "params": {}}
+
+    dispatcher.submit(request)
+    dispatcher.shutdown(wait=True)
+    dispatcher = RequestDispatcher(server.handle_request, responses.append, max_workers=1)
+    dispatcher.submit({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 7}})
+    dispatcher.submit(request)
+    dispatcher.shutdown(wait=True)
+
+    assert [response.get("result") for response in responses] == [{"ok": True}, {"ok": True}]
+
+
+def test_cancel_reaches_a_request_still_queued_behind_its_scope(monkeypatch):
+    release = threading.Event()
+
+    def check(params):
+        if params.get("block"):
+            release.wait(timeout=5)
+        return {"ok": True}
+
+    monkeypatch.setitem(server.HANDLERS, "action.click", check)
+    responses = []
+    dispatcher = RequestDispatcher(server.handle_request, responses.append, max_workers=2)
+    target = {"scope": {"window_title_contains": "Notepad"}, "ladder": []}
+
+    dispatcher.submit({"jsonrpc": "2.0", "id": 1, "method": "action.click", "params": {"target": target, "block": True}})
+    dispatcher.submit({"jsonrpc": "2.0", "id": 2, "method": "action.click", "params": {"target": target}})
+    dispatcher.submit({"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 2}})
+    release.set()
+    dispatcher.shutdown(wait=True)
+
+    by_id = {response["id"]: response for response in responses}
+    assert by_id[1]["result"] == {"ok": True}
+    assert by_id[2]["error"]["code"] == RequestCancelled().code
@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+from desktop_runner import server
+from desktop_runner.selector import compile as compile_module
+from desktop_runner.selector.compile import CompileCache, compile_target, target_key
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.snapshot import TreeSnapshot, build_snapshot
+
+
+class FakeAdapter:
+    def __init__(self):
+        self.scopes = []
+
+    def get_scope_root(self, scope):
+        self.scopes.append(scope)
+        return "root"
+
+    def find_uia(self, root, selector, limit=None):
+        return ["element"] if selector.get("automationId") == "ok" else []
+
+    def find_uia_near_label(self, root, selector):
+        return []
+
+    def describe(self, element):
+        return {"name": element}
+
+
+def _target(automation_id="ok", title="Notepad"):
+    return {
+        "scope": {"window_title_contains": title},
+        "ladder": [
+            {"kind": "uia", "selector": {"controlType": "Button", "name": "OK", "automationId": automation_id}},
+            {"kind": "web_css", "selector": {"css": "#save"}},
+        ],
+    }
+
+
+def test_target_key_ignores_key_order():
+    reordered = {"ladder": _target()["ladder"], "scope": {"window_title_contains": "Notepad"}}
+
+    assert target_key(_target()) == target_key(reordered)
+    assert target_key(_target()) != target_key(_target(automation_id="other"))
+
+
+def test_compiled_rungs_order_predicates_and_normalize_scope():
+    compiled = compile_target(_target(title="NotePad"))
+
+    assert compiled.scope == {"window_title_contains": "notepad"}
+    assert compiled.rungs[0].predicates == (("automationId", "ok"), ("name", "OK"), ("controlType", "Button"))
+    assert compiled.rungs[0].index_field == "automationId"
+    assert compiled.rungs[1].error == "Unsupported rung kind: web_css"
+
+
+def test_compile_cache_hits_and_evicts_least_recent():
+    cache = CompileCache(max_entries=2)
+    first = cache.get(_target("a"))
+    cache.get(_target("b"))
+    assert cache.get(_target("a")) is first
+    cache.get(_target("c"))
+
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 1, "misses": 3, "evictions": 1}
+    assert cache.get(_target("a")) is first
+    assert cache.stats()["hits"] == 2
+
+
+def test_resolve_reuses_compiled_target(monkeypatch):
+    cache = CompileCache()
+    monkeypatch.setattr(compile_module, "COMPILE_CACHE", cache)
+    adapter = FakeAdapter()
+
+    for _ in range(3):
+        resolved, _, _ = resolve_ladder(_target(), adapter=adapter)
+        assert resolved["rung_index"] == 0
+
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 2
+    assert adapter.scopes == [{"window_title_contains": "notepad"}] * 3
+
+    metrics = server.handle_metrics({})
+    assert metrics["compile_cache"]["hits"] == 2
+
+
+def test_indexed_rung_queries_snapshot_by_first_predicate(monkeypatch):
+    calls = []
+    original_match = TreeSnapshot.match
+
+    def match(self, predicates, limit=None):
+        calls.append((tuple(predicates), limit))
+        return original_match(self, predicates, limit=limit)
+
+    monkeypatch.setattr(TreeSnapshot, "match", match)
+    element = SimpleNamespace(
+        element_info=SimpleNamespace(automation_id="ok", name="OK", control_type="Button", class_name="")
+    )
+
+    class SnapshotAdapter(FakeAdapter):
+        def snapshot(self, root):
+            return build_snapshot(root, [element])
+
+    _, _, handle = resolve_ladder(_target(), adapter=SnapshotAdapter(), return_element=True)
+
+    assert handle is element
+    assert calls == [((("automationId", "ok"), ("name", "OK"), ("controlType", "Button")), 2)]
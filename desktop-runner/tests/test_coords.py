@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import pytest
+
+from desktop_runner.errors import ElementNotFound
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.synthetic import SyntheticDesktop
+
+
+class Node:
+    def __init__(self, control_type, name="", rect=(0, 0, 10, 10), parent=None):
+        self.element_info = SimpleNamespace(control_type=control_type, name=name, automation_id="", class_name="")
+        self._rect = rect
+        self._parent = parent
+
+    def parent(self):
+        return self._parent
+
+    def rectangle(self):
+        left, top, right, bottom = self._rect
+        return SimpleNamespace(left=left, top=top, right=right, bottom=bottom)
+
+
+class HitTestAdapter(UIAAdapter):
+    def __init__(self, window, hits, dpi=96):
+        self._desktop = None
+        self.window = window
+        self.hits = hits
+        self.dpi = dpi
+        self.points = []
+
+    def get_scope_root(self, scope):
+        return self.window
+
+    def element_from_point(self, x, y):
+        self.points.append((x, y))
+        return self.hits.get((x, y))
+
+    def dpi_for(self, root):
+        return self.dpi
+
+
+def _coords(**selector):
+    return {"ladder": [{"kind": "uia", "selector": {"automationId": "gone"}}, {"kind": "coords", "selector": selector}]}
+
+
+class EmptyWindow(Node):
+    def descendants(self):
+        return []
+
+
+def test_coords_rung_hit_tests_window_relative_point_scaled_for_dpi():
+    window = EmptyWindow("Window", rect=(100, 200, 900, 800))
+    button = Node("Button", name="Save", rect=(110, 220, 170, 244), parent=window)
+    label = Node("Text", name="Save", rect=(115, 225, 160, 240), parent=button)
+    adapter = HitTestAdapter(window, {(115, 230): label}, dpi=144)
+
+    resolved, attempts, element = resolve_ladder(
+        _coords(x=10, y=20, dpi=96, controlType="Button"), adapter=adapter, return_element=True
+    )
+
+    assert adapter.points == [(115, 230)]
+    assert element is button
+    assert resolved["kind"] == "coords"
+    assert [attempt["ok"] for attempt in attempts] == [False, True]
+
+
+def test_coords_rung_rejects_wrong_control_type_and_points_outside_window():
+    window = EmptyWindow("Window", rect=(100, 200, 900, 800))
+    pane = Node("Pane", rect=(100, 200, 900, 800), parent=window)
+    adapter = HitTestAdapter(window, {(110, 220): pane, (1000, 220): pane})
+
+    with pytest.raises(ElementNotFound):
+        resolve_ladder(_coords(x=10, y=20, controlType="Button"), adapter=adapter)
+    with pytest.raises(ElementNotFound):
+        resolve_ladder(_coords(x=900, y=20), adapter=adapter)
+
+    assert adapter.points == [(110, 220)]
+
+
+def test_coords_rung_ignores_hits_on_a_window_overlapping_the_scope():
+    desktop = SyntheticDesktop(
+        {
+            "windows": [
+                {
+                    "name": "Front",
+                    "rect": [0, 0, 400, 300],
+                    "children": [{"control_type": "Button", "name": "Delete", "rect": [10, 10, 110, 40]}],
+                },
+                {
+                    "name": "Back",
+                    "rect": [0, 0, 400, 300],
+                    "children": [{"control_type": "Button", "name": "Save", "rect": [10, 10, 110, 40]}],
+                },
+            ]
+        }
+    )
+    target = {
+        "scope": {"window_title_contains": "Back"},
+        "ladder": [{"kind": "coords", "selector": {"x": 20, "y": 20, "controlType": "Button"}}],
+    }
+
+    with pytest.raises(ElementNotFound):
+        resolve_ladder(target, adapter=desktop)
+
+    desktop.focus(desktop.get_scope_root({"window_title_contains": "Back"}))
+    resolved, _, _ = resolve_ladder(target, adapter=desktop)
+    assert resolved["element"]["name"] == "Save"
@@ -0,0 +1,171 @@
+import io
+import json
+import logging
+import sys
+import threading
+from types import SimpleNamespace
+
+from desktop_runner import server
+from desktop_runner.runtime import dispatcher as dispatcher_module
+from desktop_runner.runtime.dispatcher import DESKTOP_KEY, RequestDispatcher, request_scope_keys
+
+
+def _request(request_id, method, params=None):
+    return {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+
+
+def test_scope_keys_group_requests_by_window_scope():
+    notepad = {"window_title_contains": "Notepad"}
+    click = _request(1, "action.click", {"target": {"scope": notepad, "ladder": []}})
+    assertion = _request(
+        2,
+        "assert.check",
+        {"assertions": [{"kind": "desktop_element_exists", "target": {"scope": {"window_title_contains": "NOTEPAD"}}}]},
+    )
+
+    assert request_scope_keys(click) == (DESKTOP_KEY, *request_scope_keys(assertion))
+    assert request_scope_keys(_request(3, "action.click", {"target": {"ladder": []}})) == (DESKTOP_KEY,)
+    assert request_scope_keys(_request(4, "system.ping")) == ()
+    assert request_scope_keys("not a request") == ()
+    assert request_scope_keys([click, _request(5, "system.ping"), _request(6, "action.click", {})]) == (
+        DESKTOP_KEY,
+        request_scope_keys(assertion)[0],
+    )
+
+
+def test_slow_request_does_not_block_ping():
+    release = threading.Event()
+    responses = []
+
+    def handle(payload):
+        if payload["method"] == "assert.check":
+            release.wait(timeout=5)
+        return {"id": payload["id"]}
+
+    def write(response):
+        responses.append(response["id"])
+        if response["id"] == 2:
+            release.set()
+
+    dispatcher = RequestDispatcher(handle, write, max_workers=4)
+    dispatcher.submit(_request(1, "assert.check", {"assertions": []}))
+    dispatcher.submit(_request(2, "system.ping"))
+    dispatcher.shutdown(wait=True)
+
+    assert responses == [2, 1]
+
+
+def test_same_scope_requests_run_in_order():
+    scope = {"window_title_contains": "Notepad"}
+    running = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def handle(payload):
+        with lock:
+            if running:
+                overlaps.append(payload["id"])
+            running.append(payload["id"])
+        threading.Event().wait(0.01)
+        with lock:
+            running.remove(payload["id"])
+        return {"id": payload["id"]}
+
+    responses = []
+    dispatcher = RequestDispatcher(handle, lambda response: responses.append(response["id"]), max_workers=4)
+    for request_id in range(5):
+        dispatcher.submit(_request(request_id, "action.click", {"target": {"scope": scope, "ladder": []}}))
+    dispatcher.shutdown(wait=True)
+
+    assert overlaps == []
+    assert responses == [0, 1, 2, 3, 4]
+
+
+def test_input_requests_on_different_scopes_run_one_after_the_other():
+    running = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def handle(payload):
+        with lock:
+            if running:
+                overlaps.append(payload["id"])
+            running.append(payload["id"])
+        threading.Event().wait(0.02)
+        with lock:
+            running.remove(payload["id"])
+        return {"id": payload["id"]}
+
+    responses = []
+    dispatcher = RequestDispatcher(handle, lambda response: responses.append(response["id"]), max_workers=4)
+    dispatcher.submit(_request(1, "action.click", {"target": {"scope": {"window_title_contains": "Notepad"}}}))
+    dispatcher.submit(_request(2, "action.click", {"target": {"scope": {"window_title_contains": "Calculator"}}}))
+    dispatcher.shutdown(wait=True)
+
+    assert overlaps == []
+    assert responses == [1, 2]
+
+
+def test_serve_writes_all_responses(monkeypatch):
+    lines = [
+        json.dumps(_request(1, "system.ping")),
+        "not json",
+        json.dumps(_request(2, "nope.method")),
+    ]
+    stdout = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr(server.sys, "stdin", io.TextIOWrapper(io.BytesIO(("\n".join(lines) + "\n").encode())))
+    monkeypatch.setattr(server.sys, "stdout", stdout)
+
+    server.serve(max_workers=2)
+
+    responses = [json.loads(line) for line in stdout.buffer.getvalue().splitlines()]
+    by_id = {response["id"]: response for response in responses}
+    assert by_id[1]["result"]["ok"] is True
+    assert by_id[None]["error"]["code"] == -32700
+    assert by_id[2]["error"]["code"] == -32601
+
+
+class FakeComtypes:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def CoInitializeEx(self, flags):
+        self.calls.append(("init", flags, threading.get_ident()))
+        if self.fail:
+            raise OSError("RPC_E_CHANGED_MODE")
+
+    def CoUninitialize(self):
+        self.calls.append(("uninit", None, threading.get_ident()))
+
+
+def _run_worker_init(name):
+    worker = threading.Thread(target=dispatcher_module._init_worker_thread, name=name)
+    worker.start()
+    worker.join()
+    return worker.ident
+
+
+def test_workers_join_the_mta_and_uninitialize_on_exit(monkeypatch):
+    comtypes = FakeComtypes()
+    monkeypatch.setattr(dispatcher_module, "os", SimpleNamespace(name="nt"))
+    monkeypatch.setattr(sys, "coinit_flags", 2, raising=False)
+    monkeypatch.setitem(sys.modules, "comtypes", comtypes)
+
+    dispatcher_module.use_multithreaded_com()
+    ident = _run_worker_init("worker-1")
+
+    assert sys.coinit_flags == 0
+    assert comtypes.calls == [("init", 0, ident), ("uninit", None, ident)]
+
+
+def test_worker_com_init_failure_is_logged(monkeypatch, caplog):
+    comtypes = FakeComtypes(fail=True)
+    monkeypatch.setattr(dispatcher_module, "os", SimpleNamespace(name="nt"))
+    monkeypatch.setitem(sys.modules, "comtypes", comtypes)
+
+    with caplog.at_level(logging.ERROR, logger=dispatcher_module.__name__):
+        ident = _run_worker_init("worker-2")
+
+    assert comtypes.calls == [("init", 0, ident)]
+    assert "worker-2" in caplog.text
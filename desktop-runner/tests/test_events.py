@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from desktop_runner.assertions.check import check_assertions
+from desktop_runner.errors import RequestCancelled, ScopeNotFound
+from desktop_runner.runtime.request_context import RequestContext
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia import adapter as adapter_module
+from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.events import ChangeNotifier, FakeEventSource
+
+
+class AppearingAdapter:
+    def __init__(self):
+        self.events = FakeEventSource()
+        self.present = False
+        self.finds = 0
+
+    def change_notifier(self, scope=None):
+        return self.events.start()
+
+    def get_scope_root(self, scope):
+        return "root"
+
+    def find_uia(self, root, selector, limit=None):
+        self.finds += 1
+        return ["dialog"] if self.present else []
+
+    def find_uia_near_label(self, root, selector):
+        return []
+
+    def describe(self, element):
+        return {"name": element}
+
+    def is_visible(self, element):
+        return True
+
+    def appear_after(self, seconds):
+        def appear():
+            self.present = True
+            self.events.emit("window")
+
+        threading.Timer(seconds, appear).start()
+
+
+TARGET = {"ladder": [{"kind": "uia", "selector": {"name": "Save As"}}]}
+
+
+def test_wait_for_change_wakes_on_event_and_times_out_quietly():
+    notifier = ChangeNotifier()
+    context = RequestContext()
+    generation = notifier.generation
+    threading.Timer(0.05, notifier.notify, args=("structure",)).start()
+    start = time.monotonic()
+
+    assert context.wait_for_change(notifier, generation, 5) is True
+    assert time.monotonic() - start < 1
+    assert context.wait_for_change(notifier, notifier.generation, 0.01) is False
+    assert notifier.stats()["events"]["structure"] == 1
+
+
+def test_wait_for_change_wakes_on_cancel():
+    notifier = ChangeNotifier()
+    context = RequestContext()
+    threading.Timer(0.05, context.cancel).start()
+
+    with pytest.raises(RequestCancelled):
+        context.wait_for_change(notifier, notifier.generation, 5)
+
+
+def test_resolve_retry_wakes_when_tree_changes():
+    adapter = AppearingAdapter()
+    adapter.appear_after(0.1)
+    start = time.monotonic()
+
+    resolved, attempts, _ = resolve_ladder(TARGET, adapter=adapter, retry={"attempts": 1, "wait_ms": 5000})
+
+    assert time.monotonic() - start < 2
+    assert resolved["element"] == {"name": "dialog"}
+    assert attempts[-1]["ok"] is True
+
+
+def test_assertion_wait_wakes_when_tree_changes():
+    adapter = AppearingAdapter()
+    adapter.appear_after(0.1)
+    start = time.monotonic()
+
+    result = check_assertions(
+        {
+            "run_id": "run",
+            "step_id": "step",
+            "assertions": [{"kind": "desktop_element_exists", "target": TARGET, "timeout_ms": 5000}],
+        },
+        adapter=adapter,
+    )
+
+    assert result["ok"] is True
+    assert time.monotonic() - start < 0.8
+    assert adapter.finds <= 3
+
+
+class RecordingEventSource:
+    def __init__(self, notifier=None, window=None):
+        self.notifier = notifier or ChangeNotifier()
+        self.window = window
+        self.stopped = False
+
+    def start(self):
+        return self.notifier
+
+    def stop(self):
+        self.stopped = True
+        self.notifier.detach()
+
+
+class _Singleton(type):
+    _instances = {}
+
+    def __call__(cls):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__call__()
+        return cls._instances[cls]
+
+
+class FakeUIA(metaclass=_Singleton):
+    def get_focused_element(self):
+        return SimpleNamespace(current_control_type="Edit")
+
+
+class ScopedEventsAdapter(UIAAdapter):
+    def __init__(self, windows):
+        self.windows = windows
+        self._uia = FakeUIA()
+        self._events = None
+        self._events_failed = False
+        self._scoped_events = OrderedDict()
+        self._events_lock = threading.Lock()
+
+    def get_scope_root(self, scope):
+        window = self.windows.get(scope["window_title_contains"])
+        if window is None:
+            raise ScopeNotFound()
+        return window
+
+
+def _window(handle):
+    return SimpleNamespace(element_info=SimpleNamespace(handle=handle, element=f"element-{handle}"))
+
+
+def test_scoped_notifier_only_wakes_for_its_window_and_desktop_events(monkeypatch):
+    monkeypatch.setattr(adapter_module, "UIAEventSource", RecordingEventSource)
+    adapter = ScopedEventsAdapter({"Orders": _window(1), "Clock": _window(2)})
+
+    orders = adapter.change_notifier({"window_title_contains": "Orders"})
+    clock = adapter.change_notifier({"window_title_contains": "Clock"})
+    missing = adapter.change_notifier({"window_title_contains": "Save As"})
+    generation = orders.generation
+
+    assert adapter.change_notifier(None) is None
+    assert adapter.change_notifier({"window_title_contains": "Orders"}) is orders
+    assert sorted(source.window for source in adapter._scoped_events.values()) == ["element-1", "element-2"]
+    assert missing is adapter._events.notifier
+
+    clock.notify("property")
+    assert orders.generation == generation
+    missing.notify("window")
+    assert orders.generation == generation + 1
+
+
+def test_close_stops_event_sources_and_releases_its_own_uia(monkeypatch):
+    monkeypatch.setattr(adapter_module, "UIAEventSource", RecordingEventSource)
+    adapter = ScopedEventsAdapter({"Orders": _window(1)})
+    adapter.change_notifier({"window_title_contains": "Orders"})
+    sources = [adapter._events, *adapter._scoped_events.values()]
+    uia = adapter._uia
+
+    adapter.close()
+
+    assert all(source.stopped for source in sources)
+    assert adapter._scoped_events == {} and adapter._events is None
+    assert FakeUIA() is not uia
+
+    stale = ScopedEventsAdapter({})
+    stale._uia = uia
+    current = FakeUIA()
+    stale.close()
+    assert FakeUIA() is current
+
+
+def test_focused_control_type_reads_through_the_adapter_uia():
+    adapter = ScopedEventsAdapter({})
+
+    assert adapter.get_focused_control_type() == "Edit"
+
+    adapter._uia = SimpleNamespace(get_focused_element=lambda: None)
+    assert adapter.get_focused_control_type() is None
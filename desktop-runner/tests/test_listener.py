@@ -0,0 +1,86 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from desktop_runner import server
+from desktop_runner.listener import parse_listen_address
+
+
+def _start(listen, monkeypatch):
+    monkeypatch.setattr(server, "_TRANSPORT", server._TRANSPORT)
+    listener = server.create_listener(listen, max_workers=4)
+    thread = threading.Thread(target=listener.serve_forever, daemon=True)
+    thread.start()
+    return listener
+
+
+def _stop(listener):
+    listener.shutdown()
+    listener.dispatcher.shutdown(wait=True)
+
+
+def _call(sock_file, request):
+    sock_file.write((json.dumps(request) + "\n").encode())
+    sock_file.flush()
+    return json.loads(sock_file.readline())
+
+
+def test_parse_listen_address():
+    assert parse_listen_address("tcp:127.0.0.1:7010") == ("tcp", ("127.0.0.1", 7010))
+    assert parse_listen_address("unix:/tmp/runner.sock") == ("unix", "/tmp/runner.sock")
+    with pytest.raises(ValueError):
+        parse_listen_address("tcp:7010")
+    with pytest.raises(ValueError):
+        parse_listen_address("pipe:runner")
+
+
+def test_tcp_listener_serves_concurrent_clients(monkeypatch):
+    release = threading.Event()
+
+    def slow_check(params):
+        release.wait(timeout=5)
+        return {"ok": True}
+
+    monkeypatch.setitem(server.HANDLERS, "assert.check", slow_check)
+    listener = _start("tcp:127.0.0.1:0", monkeypatch)
+    try:
+        host, port = listener.address
+        slow = socket.create_connection((host, port))
+        fast = socket.create_connection((host, port))
+        slow_file = slow.makefile("rwb")
+        fast_file = fast.makefile("rwb")
+
+        slow_file.write(b'{"jsonrpc": "2.0", "id": "slow", "method": "assert.check", "params": {}}\n')
+        slow_file.flush()
+        ping = _call(fast_file, {"jsonrpc": "2.0", "id": "fast", "method": "system.ping", "params": {}})
+        assert ping["id"] == "fast"
+        assert listener.active_connections == 2
+
+        release.set()
+        assert json.loads(slow_file.readline())["id"] == "slow"
+        for sock in (slow_file, fast_file, slow, fast):
+            sock.close()
+    finally:
+        release.set()
+        _stop(listener)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix-domain sockets unavailable")
+def test_unix_listener_round_trip(tmp_path, monkeypatch):
+    path = str(tmp_path / "runner.sock")
+    listener = _start(f"unix:{path}", monkeypatch)
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        client_file = client.makefile("rwb")
+        response = _call(client_file, {"jsonrpc": "2.0", "id": 1, "method": "system.ping", "params": {}})
+        assert response["result"]["ok"] is True
+        client_file.write(b"not json\n")
+        client_file.flush()
+        assert json.loads(client_file.readline())["error"]["code"] == -32700
+        client_file.close()
+        client.close()
+    finally:
+        _stop(listener)
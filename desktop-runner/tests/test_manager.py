@@ -0,0 +1,85 @@
+from desktop_runner import server
+from desktop_runner.uia.manager import AdapterManager, is_com_error
+
+
+class COMError(Exception):
+    pass
+
+
+class FakeAdapter:
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+    def is_healthy(self):
+        return self.healthy
+
+    def close(self):
+        self.closed = True
+
+
+def test_manager_reuses_adapter_across_requests():
+    manager = AdapterManager(factory=FakeAdapter, health_check_interval_s=0)
+
+    first = manager.get()
+    second = manager.get()
+
+    assert first is second
+    assert manager.stats()["created"] == 1
+    assert manager.stats()["reused"] == 1
+
+
+def test_manager_rebuilds_unhealthy_adapter():
+    manager = AdapterManager(factory=FakeAdapter, health_check_interval_s=0)
+
+    first = manager.get()
+    first.healthy = False
+    second = manager.get()
+
+    assert second is not first
+    assert first.closed is True
+    stats = manager.stats()
+    assert stats["created"] == 2
+    assert stats["invalidated"] == 1
+
+
+def test_manager_invalidates_on_com_failure():
+    manager = AdapterManager(factory=FakeAdapter)
+    adapter = manager.get()
+
+    manager.report_failure(ValueError("not com"))
+    assert manager.peek() is adapter
+
+    try:
+        try:
+            raise COMError("RPC server unavailable")
+        except COMError as exc:
+            raise RuntimeError("click failed") from exc
+    except RuntimeError as exc:
+        assert is_com_error(exc)
+        manager.report_failure(exc)
+
+    assert manager.peek() is None
+    assert manager.get() is not adapter
+
+
+def test_server_handlers_share_one_adapter(monkeypatch):
+    manager = AdapterManager(factory=FakeAdapter)
+    seen = []
+
+    def fake_resolve(target, adapter=None, **_):
+        seen.append(adapter)
+        return {"rung_index": 0, "kind": "uia", "element": {}}, [], None
+
+    monkeypatch.setattr(server, "ADAPTERS", manager)
+    monkeypatch.setattr(server, "resolve_ladder", fake_resolve)
+
+    for request_id in range(3):
+        server.handle_request(
+            {"jsonrpc": "2.0", "id": request_id, "method": "target.resolve", "params": {"target": {"ladder": []}}}
+        )
+    stats = server.handle_request({"jsonrpc": "2.0", "id": 9, "method": "system.getAdapterStats", "params": {}})
+
+    assert len({id(adapter) for adapter in seen}) == 1
+    assert stats["result"]["created"] == 1
+    assert stats["result"]["reused"] == 2
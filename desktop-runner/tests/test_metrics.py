@@ -0,0 +1,62 @@
+from desktop_runner import server
+from desktop_runner.runtime.metrics import METRICS, LatencyHistogram
+from desktop_runner.selector.resolve import resolve_ladder
+
+
+class FakeAdapter:
+    def get_scope_root(self, scope):
+        return "root"
+
+    def find_uia(self, root, selector, limit=None):
+        return ["element"] if selector.get("id") == "hit" else []
+
+    def find_uia_near_label(self, root, selector):
+        return []
+
+    def describe(self, element):
+        return {"name": element}
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    histogram = LatencyHistogram()
+    for value_ms in range(1, 1001):
+        histogram.record(value_ms / 1000)
+
+    summary = histogram.summary()
+
+    assert summary["count"] == 1000
+    assert summary["max_ms"] == 1000.0
+    assert abs(summary["p50_ms"] - 500) / 500 < 0.04
+    assert abs(summary["p90_ms"] - 900) / 900 < 0.04
+    assert abs(summary["p99_ms"] - 990) / 990 < 0.04
+
+
+def test_get_metrics_reports_methods_errors_and_rungs():
+    METRICS.reset()
+    for request_id in range(3):
+        server.handle_request({"jsonrpc": "2.0", "id": request_id, "method": "system.ping", "params": {}})
+    server.handle_request({"jsonrpc": "2.0", "id": 9, "method": "nope.method", "params": {}})
+    ladder = [
+        {"kind": "uia", "selector": {"id": "miss"}},
+        {"kind": "uia_near_label", "selector": {}},
+        {"kind": "uia", "selector": {"id": "hit"}},
+    ]
+    resolve_ladder({"ladder": ladder}, adapter=FakeAdapter())
+
+    response = server.handle_request(
+        {"jsonrpc": "2.0", "id": 10, "method": "system.getMetrics", "params": {"reset": True}}
+    )
+
+    metrics = response["result"]
+    assert metrics["methods"]["system.ping"]["count"] == 3
+    assert metrics["methods"]["system.ping"]["error_count"] == 0
+    assert metrics["methods"]["<invalid>"]["errors"] == {"-32601": 1}
+    assert metrics["rungs"]["uia"]["count"] == 2
+    assert metrics["rungs"]["uia"]["matched"] == 1
+    assert metrics["rungs"]["uia_near_label"]["missed"] == 1
+    assert {"p50_ms", "p90_ms", "p99_ms", "max_ms"} <= set(metrics["methods"]["system.ping"])
+    assert "created" in metrics["adapter"]
+
+    after_reset = server.handle_request({"jsonrpc": "2.0", "id": 11, "method": "system.getMetrics", "params": {}})
+    assert set(after_reset["result"]["methods"]) == {"system.getMetrics"}
+    assert after_reset["result"]["rungs"] == {}
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+from desktop_runner.runtime.metrics import METRICS
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.prefetch import CachedElement, CachedRect
+
+
+class FakeElement:
+    def __init__(self, control_type, name="", automation_id="", rect=(0, 0, 10, 10)):
+        self.element_info = SimpleNamespace(
+            control_type=control_type, name=name, automation_id=automation_id, class_name=""
+        )
+        self._rect = rect
+        self.clicks = 0
+
+    def rectangle(self):
+        left, top, right, bottom = self._rect
+        return SimpleNamespace(left=left, top=top, right=right, bottom=bottom)
+
+    def click_input(self, button="left", double=False):
+        self.clicks += 1
+
+
+class FakeWindow:
+    def __init__(self, elements):
+        self.elements = elements
+
+    def descendants(self):
+        return self.elements
+
+
+def _form(rows=50):
+    elements = []
+    for row in range(rows):
+        top = row * 30
+        elements.append(FakeElement("Text", name=f"Field {row}", rect=(0, top, 80, top + 20)))
+        elements.append(FakeElement("Edit", automation_id=f"edit{row}", rect=(90, top, 300, top + 20)))
+    return elements
+
+
+class FormAdapter(UIAAdapter):
+    def __init__(self, window, bulk):
+        self.window = window
+        self.bulk = bulk
+
+    def get_scope_root(self, scope):
+        return self.window
+
+    def _fetch_subtree(self, root):
+        if not self.bulk:
+            return None
+        METRICS.record_property_reads()
+        cached = []
+        for element in root.elements:
+            info = element.element_info
+            left, top, right, bottom = element._rect
+            properties = {
+                "name": info.name,
+                "automation_id": info.automation_id,
+                "control_type": info.control_type,
+                "class_name": info.class_name,
+                "rect": CachedRect(left, top, right, bottom),
+            }
+            cached.append(CachedElement(element, properties))
+        METRICS.record_prefetch(len(cached))
+        return cached
+
+
+TARGET = {
+    "ladder": [
+        {"kind": "uia", "selector": {"automationId": "missing"}},
+        {"kind": "uia_near_label", "selector": {"label": "Field 40", "controlType": "Edit", "maxDistancePx": 156}},
+    ]
+}
+
+
+def _remote_reads(adapter):
+    before = METRICS.property_reads()
+    resolved, _, element = resolve_ladder(TARGET, adapter=adapter, return_element=True)
+    after = METRICS.property_reads()
+    return resolved, element, after["remote"] - before["remote"], after["prefetch_calls"] - before["prefetch_calls"]
+
+
+def test_prefetched_snapshot_avoids_per_property_reads():
+    window = FakeWindow(_form())
+    live_resolved, live_element, live_reads, _ = _remote_reads(FormAdapter(window, bulk=False))
+    cached_resolved, cached_element, cached_reads, prefetches = _remote_reads(FormAdapter(window, bulk=True))
+
+    assert cached_resolved == live_resolved
+    assert cached_resolved["element"]["automationId"] == "edit40"
+    assert prefetches == 1
+    assert cached_reads == 1
+    assert live_reads > 400
+
+    cached_element.click_input()
+    assert cached_element == live_element
+    assert live_element.clicks == 1
+
+
+def test_prefetch_falls_back_to_reading_each_property_once():
+    window = FakeWindow(_form(rows=3))
+    adapter = FormAdapter(window, bulk=False)
+    before = METRICS.property_reads()["remote"]
+
+    cached = adapter.prefetch(window)
+    after_prefetch = METRICS.property_reads()["remote"]
+    descriptions = [adapter.describe(element) for element in cached]
+
+    assert after_prefetch - before == 6 * 5
+    assert METRICS.property_reads()["remote"] == after_prefetch
+    assert descriptions[1]["automationId"] == "edit0"
+    assert descriptions[1]["boundingRect"] == {"x": 90, "y": 0, "w": 210, "h": 20}
@@ -0,0 +1,76 @@
+import pstats
+import time
+
+from desktop_runner import server
+from desktop_runner.runtime.run_state import clear_run_state, set_run_state
+
+
+def _call(method, params=None, request_id=1):
+    return server.handle_request({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+
+
+def test_profile_start_stop_writes_pstats_and_collapsed_stacks(tmp_path, monkeypatch):
+    def busy_handler(params):
+        deadline = time.monotonic() + 0.05
+        while time.monotonic() < deadline:
+            sum(range(100))
+        return {"ok": True}
+
+    monkeypatch.setitem(server.HANDLERS, "system.busy", busy_handler)
+    set_run_state("run-prof", str(tmp_path))
+    try:
+        started = _call("profile.start", {"run_id": "run-prof", "interval_ms": 1})
+        assert started["result"]["ok"] is True
+        assert _call("profile.start", {"run_id": "run-prof"})["error"]["code"] == -32602
+
+        for request_id in range(3):
+            _call("system.busy", request_id=request_id)
+        result = _call("profile.stop")["result"]
+    finally:
+        clear_run_state("run-prof")
+
+    assert result["profiled_requests"] >= 3
+    assert result["samples"] > 0
+    assert result["pstats_path"].startswith(str(tmp_path / "profiles"))
+    stats = pstats.Stats(result["pstats_path"])
+    assert any(name == "busy_handler" for _, _, name in stats.stats)
+    with open(result["collapsed_path"], encoding="utf-8") as handle:
+        lines = handle.read().splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_profile_duration_stops_automatically(tmp_path):
+    set_run_state("run-auto", str(tmp_path))
+    try:
+        _call("profile.start", {"run_id": "run-auto", "mode": "sampling", "duration_ms": 20})
+        time.sleep(0.2)
+        result = _call("profile.stop")["result"]
+    finally:
+        clear_run_state("run-auto")
+
+    assert result["mode"] == "sampling"
+    assert "pstats_path" not in result
+    assert (tmp_path / "profiles").exists()
+
+
+def test_profile_rejects_bad_requests(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    set_run_state("run-bad", str(tmp_path / "run"))
+    try:
+        for params in (
+            {"mode": "perf"},
+            {"duration_ms": -5},
+            {"duration_ms": 1.5},
+            {"duration_ms": True},
+            {"interval_ms": "5"},
+        ):
+            assert _call("profile.start", {"run_id": "run-bad", **params})["error"]["code"] == -32602
+    finally:
+        clear_run_state("run-bad")
+
+    unknown = _call("profile.start", {"run_id": "never-begun"})
+    assert unknown["error"]["code"] == -32602
+    assert "never-begun" in unknown["error"]["message"]
+    assert _call("profile.stop")["error"]["code"] == -32602
+    assert list(tmp_path.iterdir()) == []
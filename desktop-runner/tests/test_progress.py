@@ -0,0 +1,71 @@
+from desktop_runner import server
+from desktop_runner.runtime.dispatcher import RequestDispatcher
+from desktop_runner.runtime.request_context import RequestContext
+from desktop_runner.uia.manager import AdapterManager
+
+
+class MissingAdapter:
+    def get_scope_root(self, scope):
+        return "root"
+
+    def find_uia(self, root, selector, limit=None):
+        return []
+
+    def find_uia_near_label(self, root, selector):
+        return []
+
+
+def _resolve_request(params):
+    return {"jsonrpc": "2.0", "id": "r1", "method": "target.resolve", "params": params}
+
+
+def test_report_progress_is_throttled_and_keeps_attempts():
+    sent = []
+    context = RequestContext(request_id=7, progress=sent.append, progress_interval_s=3600)
+
+    context.report_progress([{"rung_index": 0}])
+    context.report_progress([{"rung_index": 1}])
+    assert sent == []
+
+    context.progress_interval_s = 0
+    context.report_progress([{"rung_index": 2}], message="waiting")
+
+    assert len(sent) == 1
+    assert sent[0]["id"] == 7
+    assert [attempt["rung_index"] for attempt in sent[0]["match_attempts"]] == [0, 1, 2]
+    assert sent[0]["message"] == "waiting"
+
+
+def test_resolve_emits_progress_notifications_when_requested(monkeypatch):
+    monkeypatch.setattr(server, "ADAPTERS", AdapterManager(factory=MissingAdapter))
+    messages = []
+    dispatcher = RequestDispatcher(server.handle_request, messages.append, max_workers=1)
+    target = {"ladder": [{"kind": "uia", "selector": {"id": "a"}, "confidence": 1}]}
+
+    dispatcher.submit(
+        _resolve_request(
+            {"target": target, "retry": {"attempts": 2, "wait_ms": 1}, "progress": True, "progress_interval_ms": 0}
+        )
+    )
+    dispatcher.shutdown(wait=True)
+
+    notifications = [message for message in messages if message.get("method") == "$/progress"]
+    response = messages[-1]
+    assert response["id"] == "r1"
+    assert response["error"]["code"] == 1001
+    assert len(notifications) == 3
+    assert all("id" not in notification for notification in notifications)
+    assert all(notification["params"]["id"] == "r1" for notification in notifications)
+    assert sum(len(n["params"]["match_attempts"]) for n in notifications) == 3
+
+
+def test_progress_is_opt_in(monkeypatch):
+    monkeypatch.setattr(server, "ADAPTERS", AdapterManager(factory=MissingAdapter))
+    messages = []
+    dispatcher = RequestDispatcher(server.handle_request, messages.append, max_workers=1)
+    target = {"ladder": [{"kind": "uia", "selector": {"id": "a"}, "confidence": 1}]}
+
+    dispatcher.submit(_resolve_request({"target": target, "retry": {"attempts": 2, "wait_ms": 1}}))
+    dispatcher.shutdown(wait=True)
+
+    assert len(messages) == 1
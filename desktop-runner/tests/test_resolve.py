@@ -9,7 +9,7 @@ class FakeAdapter:
     def get_scope_root(self, scope):
         return "root"
 
-    def find_uia(self, root, selector):
+    def find_uia(self, root, selector, limit=None):
         return self.matches.get(selector.get("id"), [])
 
     def find_uia_near_label(self, root, selector):
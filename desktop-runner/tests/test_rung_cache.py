@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from desktop_runner import server
+from desktop_runner.errors import AmbiguousMatch
+from desktop_runner.selector.compile import target_key
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.selector.rung_cache import RungCache
+from desktop_runner.uia.manager import AdapterManager
+
+
+class FakeAdapter:
+    def __init__(self, matches):
+        self.matches = matches
+        self.queries = []
+
+    def get_scope_root(self, scope):
+        return "root"
+
+    def find_uia(self, root, selector, limit=None):
+        self.queries.append(selector["automationId"])
+        return self.matches.get(selector["automationId"], [])
+
+    def find_uia_near_label(self, root, selector):
+        return []
+
+    def describe(self, element):
+        return {"name": element}
+
+
+TARGET = {
+    "scope": {"window_title_contains": "Orders"},
+    "ladder": [
+        {"kind": "uia", "selector": {"automationId": "old"}},
+        {"kind": "uia", "selector": {"automationId": "new"}},
+        {"kind": "uia", "selector": {"automationId": "fallback"}},
+    ],
+}
+
+
+def _indexes(attempts):
+    return [(attempt["rung_index"], attempt.get("cached", False)) for attempt in attempts]
+
+
+def test_last_good_rung_is_tried_first():
+    cache = RungCache()
+    adapter = FakeAdapter({"new": ["save"], "fallback": ["save"]})
+
+    _, first, _ = resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+    resolved, second, _ = resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+
+    assert _indexes(first) == [(0, False), (1, False)]
+    assert _indexes(second) == [(1, True)]
+    assert resolved["rung_index"] == 1
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 0}
+
+
+def test_cached_rung_miss_falls_back_to_ladder_order():
+    cache = RungCache()
+    adapter = FakeAdapter({"new": ["save"], "fallback": ["save"]})
+    resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+    adapter.matches = {"fallback": ["save"]}
+
+    resolved, attempts, _ = resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+
+    assert _indexes(attempts) == [(1, True), (0, False), (2, False)]
+    assert resolved["rung_index"] == 2
+    assert cache.get(target_key(TARGET))["rung_index"] == 2
+
+
+def test_ambiguous_cached_rung_keeps_ladder_semantics():
+    cache = RungCache()
+    adapter = FakeAdapter({"new": ["save"]})
+    resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+    adapter.matches = {"new": ["save", "save copy"], "fallback": ["save"]}
+
+    with pytest.raises(AmbiguousMatch) as exc:
+        resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+
+    assert _indexes(exc.value.data["match_attempts"]) == [(1, True), (0, False)]
+    assert cache.stats()["entries"] == 0
+
+
+def test_rung_cache_persists_per_workflow(tmp_path, monkeypatch):
+    adapter = FakeAdapter({"new": ["save"]})
+    monkeypatch.setattr(server, "ADAPTERS", AdapterManager(factory=lambda: adapter))
+
+    def call(method, **params):
+        return server.handle_request({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+
+    begin = {"run_id": "run-1", "artifact_dir": str(tmp_path / "artifacts")}
+    call("run.begin", workflow_id="orders/export", rung_cache_dir=str(tmp_path / "cache"), **begin)
+    call("target.resolve", run_id="run-1", step_id="s1", target=TARGET)
+    call("run.end", run_id="run-1")
+
+    path = tmp_path / "cache" / "orders_export.json"
+    entries = json.loads(path.read_text())["entries"]
+    assert [entry["rung_index"] for entry in entries.values()] == [1]
+
+    reloaded = RungCache(path)
+    adapter.queries.clear()
+    resolved, _, _ = resolve_ladder(TARGET, adapter=adapter, rung_cache=reloaded)
+    assert resolved["rung_index"] == 1
+    assert adapter.queries == ["new"]
+
+
+def test_invalid_cached_rung_indexes_are_ignored(tmp_path):
+    key = target_key(TARGET)
+    path = tmp_path / "orders.json"
+    entries = {
+        "negative": {"rung_index": -1, "kind": "uia"},
+        "flag": {"rung_index": True, "kind": "uia"},
+        "text": {"rung_index": "1", "kind": "uia"},
+        key: {"rung_index": 1, "kind": "uia"},
+    }
+    path.write_text(json.dumps({"version": 1, "entries": entries}))
+
+    reloaded = RungCache(path)
+
+    assert [name for name in entries if reloaded.get(name) is not None] == [key]
+
+    cache = RungCache()
+    cache.record(key, -1, "uia", preferred=False)
+    adapter = FakeAdapter({"fallback": ["save"]})
+    _, attempts, _ = resolve_ladder(TARGET, adapter=adapter, rung_cache=cache)
+    assert _indexes(attempts) == [(0, False), (1, False), (2, False)]
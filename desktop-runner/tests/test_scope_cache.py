@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+from desktop_runner import server
+from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.manager import AdapterManager
+from desktop_runner.uia.scope_cache import ScopeRootCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeWindows:
+    def __init__(self):
+        self.alive = {10: {"title": "Untitled - Notepad", "class": "Notepad", "process_id": 42}}
+
+    def describe(self, hwnd, include_process_name=True):
+        return self.alive.get(hwnd)
+
+
+class FakeWindow:
+    def __init__(self, hwnd, title, class_name, process_id):
+        self.element_info = SimpleNamespace(name=title, class_name=class_name, handle=hwnd, process_id=process_id)
+
+    def window_text(self):
+        return self.element_info.name
+
+
+class FakeDesktop:
+    def __init__(self, windows):
+        self._windows = windows
+        self.enumerations = 0
+
+    def windows(self):
+        self.enumerations += 1
+        return self._windows
+
+
+class CachingAdapter(UIAAdapter):
+    def __init__(self, desktop, cache):
+        self._desktop = desktop
+        self._scope_cache = cache
+
+    def _get_process_name(self, pid):
+        return "notepad.exe"
+
+
+def test_cache_hit_validates_hwnd_and_title():
+    windows = FakeWindows()
+    clock = FakeClock()
+    cache = ScopeRootCache(ttl_s=5, describe=windows.describe, clock=clock)
+    scope = {"window_title_contains": "Notepad"}
+
+    cache.put(scope, "window", 10, 42)
+    assert cache.get({"window_title_contains": "notepad"}) == "window"
+
+    windows.alive[10]["title"] = "Calculator"
+    assert cache.get(scope) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_cache_entry_expires_and_rejects_reused_hwnd():
+    windows = FakeWindows()
+    clock = FakeClock()
+    cache = ScopeRootCache(ttl_s=5, describe=windows.describe, clock=clock)
+    scope = {"window_title_contains": "Notepad"}
+
+    cache.put(scope, "window", 10, 42)
+    clock.now += 6
+    assert cache.get(scope) is None
+
+    cache.put(scope, "window", 10, 42)
+    windows.alive[10]["process_id"] = 7
+    assert cache.get(scope) is None
+
+    cache.put(scope, "window", 10, 42)
+    del windows.alive[10]
+    assert cache.get(scope) is None
+
+
+def test_get_scope_root_skips_enumeration_on_cache_hit():
+    windows = FakeWindows()
+    desktop = FakeDesktop([FakeWindow(10, "Untitled - Notepad", "Notepad", 42)])
+    adapter = CachingAdapter(desktop, ScopeRootCache(describe=windows.describe))
+    scope = {"window_title_contains": "Notepad", "process_name": "notepad"}
+
+    first = adapter.get_scope_root(scope)
+    second = adapter.get_scope_root(scope)
+
+    assert first is second
+    assert desktop.enumerations == 1
+
+    adapter.invalidate_scope_cache()
+    adapter.get_scope_root(scope)
+    assert desktop.enumerations == 2
+
+
+def test_run_end_invalidates_scope_cache(monkeypatch):
+    windows = FakeWindows()
+    desktop = FakeDesktop([FakeWindow(10, "Untitled - Notepad", "Notepad", 42)])
+    adapter = CachingAdapter(desktop, ScopeRootCache(describe=windows.describe))
+    monkeypatch.setattr(server, "ADAPTERS", AdapterManager(factory=lambda: adapter))
+    server.ADAPTERS.get()
+    adapter.get_scope_root({"window_title_contains": "Notepad"})
+
+    server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "run.end", "params": {"run_id": "run"}})
+
+    assert adapter.scope_cache_stats()["entries"] == 0
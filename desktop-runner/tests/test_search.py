@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+from desktop_runner.errors import AmbiguousMatch
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.adapter import UIAAdapter
+
+import pytest
+
+
+class Visits:
+    def __init__(self):
+        self.count = 0
+        self.queries = []
+
+
+class FakeNode:
+    def __init__(self, visits, control_type, name="", children=(), visible=True, collapsed=False):
+        self.visits = visits
+        self.element_info = SimpleNamespace(
+            control_type=control_type, name=name, automation_id="", class_name="", visible=visible
+        )
+        self._children = list(children)
+        self._collapsed = collapsed
+
+    def children(self):
+        self.visits.count += 1
+        return self._children
+
+    def descendants(self, control_type=None):
+        self.visits.queries.append(control_type)
+        found = []
+        stack = list(reversed(self._children))
+        while stack:
+            element = stack.pop()
+            if control_type is None or element.element_info.control_type == control_type:
+                found.append(element)
+            stack.extend(reversed(element._children))
+        return found
+
+    def is_collapsed(self):
+        return self._collapsed
+
+
+class SearchAdapter(UIAAdapter):
+    def __init__(self, root):
+        self.root = root
+
+    def get_scope_root(self, scope):
+        return self.root
+
+
+def _wide_tree(visits, size=5000):
+    buttons = [FakeNode(visits, "Button", name=f"Button {index}") for index in range(size)]
+    return FakeNode(visits, "Window", children=[FakeNode(visits, "Pane", children=buttons)])
+
+
+def test_find_uia_without_search_options_uses_one_provider_query():
+    visits = Visits()
+    root = _wide_tree(visits)
+    adapter = SearchAdapter(root)
+
+    matches = adapter.find_uia(root, {"controlType": "Button", "name": "Button 7"})
+
+    assert [m.element_info.name for m in matches] == ["Button 7"]
+    assert visits.queries == ["Button"]
+    assert visits.count == 0
+
+
+def test_streaming_find_uia_stops_after_limit():
+    visits = Visits()
+    root = _wide_tree(visits)
+    adapter = SearchAdapter(root)
+
+    matches = adapter.find_uia(root, {"controlType": "Button", "maxDepth": 3}, limit=2)
+
+    assert [m.element_info.name for m in matches] == ["Button 0", "Button 1"]
+    assert visits.count < 10
+    assert visits.queries == []
+
+
+def test_ambiguous_match_reports_at_most_two_matches():
+    visits = Visits()
+    root = _wide_tree(visits)
+    target = {"ladder": [{"kind": "uia", "selector": {"controlType": "Button"}}]}
+
+    with pytest.raises(AmbiguousMatch) as exc:
+        resolve_ladder(target, adapter=SearchAdapter(root))
+
+    assert exc.value.data["match_attempts"][0]["matched_count"] == 2
+    assert visits.queries == [None]
+    assert visits.count == 0
+
+
+def test_search_options_limit_depth_and_prune_subtrees():
+    visits = Visits()
+    hidden = FakeNode(visits, "Edit", name="Hidden")
+    offscreen = FakeNode(visits, "Pane", visible=False, children=[FakeNode(visits, "Edit", name="Offscreen")])
+    collapsed = FakeNode(visits, "ComboBox", collapsed=True, children=[FakeNode(visits, "Edit", name="Item")])
+    grid = FakeNode(visits, "DataGrid", children=[FakeNode(visits, "Edit", name="Cell")])
+    nested = FakeNode(visits, "Pane", children=[FakeNode(visits, "Pane", children=[hidden])])
+    visible = FakeNode(visits, "Edit", name="Visible")
+    root = FakeNode(visits, "Window", children=[offscreen, collapsed, grid, nested, visible])
+    adapter = SearchAdapter(root)
+
+    def names(selector):
+        return [m.element_info.name for m in adapter.find_uia(root, dict(selector, controlType="Edit"))]
+
+    assert names({}) == ["Offscreen", "Item", "Cell", "Hidden", "Visible"]
+    assert names({"maxDepth": 2}) == ["Offscreen", "Item", "Cell", "Visible"]
+    assert names({"skipOffscreen": True}) == ["Item", "Cell", "Hidden", "Visible"]
+    assert names({"skipCollapsed": True, "pruneControlTypes": ["DataGrid"]}) == ["Offscreen", "Hidden", "Visible"]
+
+    target = {"ladder": [{"kind": "uia", "selector": {"controlType": "Edit", "skipOffscreen": True, "maxDepth": 2}}]}
+    with pytest.raises(AmbiguousMatch):
+        resolve_ladder(target, adapter=adapter)
@@ -85,3 +85,62 @@ def test_handle_window_focus_error_includes_trace(monkeypatch):
     assert trace["error_code"] == 1000
     assert trace["run_id"] == "run-2"
     assert trace["step_id"] == "step-2"
+
+
+def test_handle_batch_runs_in_order_and_returns_array():
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "system.ping", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "nope.method", "params": {}},
+        {"jsonrpc": "2.0", "id": 3, "method": "system.ping", "params": {}},
+    ]
+
+    responses = server.handle_request(batch)
+
+    assert [response["id"] for response in responses] == [1, 2, 3]
+    assert responses[1]["error"]["code"] == -32601
+    assert responses[2]["result"]["ok"] is True
+
+
+def test_handle_batch_stops_at_first_failure():
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "nope.method", "params": {"stop_on_error": True}},
+        {"jsonrpc": "2.0", "id": 2, "method": "system.ping", "params": {}},
+    ]
+
+    responses = server.handle_request(batch)
+
+    assert responses[0]["error"]["code"] == -32601
+    assert responses[1]["error"]["code"] == server.ERROR_BATCH_ABORTED
+    assert responses[1]["error"]["data"] == {"failed_id": 1}
+
+    batch[0]["params"].pop("stop_on_error")
+    responses = server.handle_request(batch, stop_on_error=True)
+    assert responses[1]["error"]["code"] == server.ERROR_BATCH_ABORTED
+
+
+def test_aborted_batch_does_not_answer_notifications():
+    batch = [
+        {"jsonrpc": "2.0", "id": 1, "method": "nope.method", "params": {"stop_on_error": True}},
+        {"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 9}},
+        {"jsonrpc": "2.0", "id": 2, "method": "system.ping", "params": {}},
+    ]
+
+    responses = server.handle_request(batch)
+
+    assert [response["id"] for response in responses] == [1, 2]
+    assert responses[1]["error"]["code"] == server.ERROR_BATCH_ABORTED
+
+
+def test_notification_only_batch_gets_no_response():
+    batch = [
+        {"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 1}},
+        {"jsonrpc": "2.0", "method": "$/cancelRequest", "params": {"id": 2}},
+    ]
+
+    assert server.handle_request(batch) is None
+
+
+def test_handle_empty_batch_is_invalid():
+    response = server.handle_request([])
+
+    assert response["error"]["code"] == -32600
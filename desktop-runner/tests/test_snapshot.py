@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.adapter import UIAAdapter
+
+
+class FakeElement:
+    def __init__(self, control_type, name="", automation_id="", class_name="", rect=(0, 0, 10, 10)):
+        self.element_info = SimpleNamespace(
+            control_type=control_type, name=name, automation_id=automation_id, class_name=class_name
+        )
+        self._rect = rect
+        self.rect_reads = 0
+
+    def rectangle(self):
+        self.rect_reads += 1
+        left, top, right, bottom = self._rect
+        return SimpleNamespace(left=left, top=top, right=right, bottom=bottom)
+
+
+class FakeWindow:
+    def __init__(self, elements):
+        self.elements = elements
+        self.walks = 0
+
+    def descendants(self, control_type=None):
+        self.walks += 1
+        return [e for e in self.elements if control_type is None or e.element_info.control_type == control_type]
+
+
+class SnapshotAdapter(UIAAdapter):
+    def __init__(self, window):
+        self.window = window
+
+    def get_scope_root(self, scope):
+        return self.window
+
+
+def _form():
+    return [
+        FakeElement("Text", name="First name", rect=(0, 0, 80, 20)),
+        FakeElement("Edit", automation_id="first", rect=(90, 0, 200, 20)),
+        FakeElement("Text", name="Last name", rect=(0, 40, 80, 60)),
+        FakeElement("Edit", automation_id="last", rect=(90, 40, 200, 60)),
+        FakeElement("Button", name="OK", class_name="Button", rect=(0, 100, 50, 120)),
+    ]
+
+
+def test_ladder_walks_scope_tree_once_per_attempt():
+    window = FakeWindow(_form())
+    adapter = SnapshotAdapter(window)
+    target = {
+        "ladder": [
+            {"kind": "uia", "selector": {"automationId": "missing"}},
+            {"kind": "uia", "selector": {"name": "Cancel", "controlType": "Button"}},
+            {"kind": "uia_near_label", "selector": {"label": "Last name", "controlType": "Edit", "maxDistancePx": 108}},
+        ]
+    }
+
+    resolved, attempts, element = resolve_ladder(target, adapter=adapter, return_element=True)
+
+    assert window.walks == 1
+    assert resolved["rung_index"] == 2
+    assert element.element_info.automation_id == "last"
+    assert [attempt["matched_count"] for attempt in attempts] == [0, 0, 1]
+
+
+def test_snapshot_query_matches_live_search():
+    elements = _form()
+    adapter = SnapshotAdapter(FakeWindow(elements))
+    snapshot = adapter.snapshot(adapter.window)
+
+    for selector in (
+        {"controlType": "Edit"},
+        {"controlType": "Button", "name": "OK", "className": "Button"},
+        {"automationId": "first", "controlType": "Edit"},
+        {"name": "OK", "className": "Other"},
+        {},
+    ):
+        assert adapter.find_uia(snapshot, selector) == adapter.find_uia(adapter.window, selector)
+
+
+def test_snapshot_reads_each_rect_once():
+    elements = _form()
+    adapter = SnapshotAdapter(FakeWindow(elements))
+    snapshot = adapter.snapshot(adapter.window)
+
+    for _ in range(3):
+        adapter.find_uia_near_label(snapshot, {"label": "First name", "controlType": "Edit", "maxDistancePx": 500})
+
+    assert all(element.rect_reads <= 1 for element in elements)
@@ -0,0 +1,75 @@
+import random
+from types import SimpleNamespace
+
+from desktop_runner.uia.adapter import BoundingRect, UIAAdapter
+from desktop_runner.uia.spatial import GridIndex, near_box
+
+
+class FakeElement:
+    def __init__(self, control_type, name="", rect=(0, 0, 10, 10)):
+        self.element_info = SimpleNamespace(control_type=control_type, name=name, automation_id="", class_name="")
+        self._rect = rect
+        self.rect_reads = 0
+
+    def rectangle(self):
+        self.rect_reads += 1
+        left, top, right, bottom = self._rect
+        return SimpleNamespace(left=left, top=top, right=right, bottom=bottom)
+
+
+class FakeWindow:
+    def __init__(self, elements):
+        self.elements = elements
+
+    def descendants(self, control_type=None):
+        return [e for e in self.elements if control_type is None or e.element_info.control_type == control_type]
+
+
+def _adapter():
+    return UIAAdapter.__new__(UIAAdapter)
+
+
+def test_grid_queries_match_brute_force():
+    rng = random.Random(7)
+    adapter = _adapter()
+    rects = [
+        BoundingRect(rng.randint(-200, 2000), rng.randint(-200, 1200), rng.randint(1, 300), rng.randint(1, 60))
+        for _ in range(400)
+    ]
+    rects.append(BoundingRect(0, 0, 4000, 3000))
+    index = GridIndex()
+    for position, rect in enumerate(rects):
+        index.insert(position, rect)
+
+    for _ in range(50):
+        label = BoundingRect(rng.randint(0, 1800), rng.randint(0, 1000), rng.randint(10, 120), 20)
+        max_distance = rng.choice([0, 30, 120, 400])
+        for direction in (None, "right_of", "left_of", "above", "below"):
+            expected = [
+                position
+                for position, rect in enumerate(rects)
+                if adapter._is_near(label, rect, max_distance, direction)
+            ]
+            found = [
+                position
+                for position, rect in index.query(near_box(label, max_distance, direction))
+                if adapter._is_near(label, rect, max_distance, direction)
+            ]
+            assert found == expected
+
+
+def test_near_label_reads_each_rect_once():
+    elements = []
+    for row in range(100):
+        top = row * 30
+        elements.append(FakeElement("Text", name="Field" if row % 10 == 0 else f"Label {row}", rect=(0, top, 80, top + 20)))
+        elements.append(FakeElement("Edit", rect=(90, top, 300, top + 20)))
+    adapter = _adapter()
+
+    matches = adapter.find_uia_near_label(
+        FakeWindow(elements), {"label": "Field", "controlType": "Edit", "maxDistancePx": 156}
+    )
+
+    assert len(matches) == 10
+    assert all(element.rect_reads == 1 for element in elements if element.element_info.control_type == "Edit")
+    assert all(element.rect_reads == 1 for element in elements if element.element_info.name == "Field")
@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from desktop_runner import server
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+HEAVY_PACKAGES = ("pywinauto", "comtypes", "PIL")
+
+LAZY_MODULES = (
+    "desktop_runner.actions.click",
+    "desktop_runner.actions.step_trace",
+    "desktop_runner.assertions.check",
+    "desktop_runner.selector.resolve",
+    "desktop_runner.uia.adapter",
+    "desktop_runner.artifacts.screenshots",
+)
+
+
+def _startup_imports():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "desktop_runner.server"],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=60,
+        check=True,
+    )
+    modules = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        modules.add(line.split("|")[2].strip())
+    return modules
+
+
+def test_server_startup_imports_no_handler_modules():
+    imported = _startup_imports()
+
+    assert "desktop_runner.runtime.dispatcher" in imported
+    for module in LAZY_MODULES:
+        assert module not in imported
+
+
+def test_server_startup_imports_no_heavy_dependencies():
+    imported = _startup_imports()
+
+    heavy = sorted(name for name in imported if name.split(".")[0] in HEAVY_PACKAGES)
+    assert heavy == []
+
+
+def test_handler_module_imported_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server.ADAPTERS, "get", lambda: "adapter")
+    monkeypatch.setattr(
+        server,
+        "check_assertions",
+        server.lazy_callable("desktop_runner.assertions.check", "check_assertions"),
+    )
+
+    def fake_check(params, adapter=None):
+        calls.append(adapter)
+        return {"ok": True}
+
+    monkeypatch.setattr("desktop_runner.assertions.check.check_assertions", fake_check)
+
+    assert not server.check_assertions.loaded
+    response = server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "assert.check", "params": {}})
+
+    assert response["result"] == {"ok": True}
+    assert server.check_assertions.loaded
+    assert calls == ["adapter"]
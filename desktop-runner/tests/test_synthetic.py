@@ -0,0 +1,154 @@
+import json
+import threading
+
+from desktop_runner import server
+from desktop_runner.actions.set_value import set_value
+from desktop_runner.assertions.check import check_assertions
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.protocol import DesktopAdapter
+from desktop_runner.uia.synthetic import SyntheticDesktop
+
+SCOPE = {"window_title_contains": "Synthetic Window 0"}
+
+
+def _target(kind, selector):
+    return {"scope": SCOPE, "ladder": [{"kind": kind, "selector": selector}]}
+
+
+def test_synthetic_desktop_implements_adapter_protocol():
+    assert isinstance(SyntheticDesktop(), DesktopAdapter)
+
+
+def test_generated_tree_resolves_every_rung_kind():
+    desktop = SyntheticDesktop.generate(nodes=200)
+
+    by_id, _, _ = resolve_ladder(_target("uia", {"automationId": "edit97"}), adapter=desktop)
+    near, _, _ = resolve_ladder(
+        _target("uia_near_label", {"label": "Label 96", "controlType": "Edit", "maxDistancePx": 240}), adapter=desktop
+    )
+    path, _, _ = resolve_ladder(
+        _target("uia_path", {"path": [{"automationId": "pane1"}, {"automationId": "pane12"}, {"automationId": "edit97"}]}),
+        adapter=desktop,
+    )
+    point, _, _ = resolve_ladder(_target("coords", {"x": 250, "y": 300, "controlType": "Edit"}), adapter=desktop)
+
+    assert by_id["element"]["automationId"] == "edit97"
+    assert near["element"]["automationId"] == "edit97"
+    assert path["element"]["automationId"] == "edit97"
+    assert point["element"]["automationId"] == "edit97"
+
+
+def test_tree_dump_round_trips_through_a_file(tmp_path):
+    dump = {
+        "dpi": 120,
+        "windows": [
+            {
+                "name": "Orders",
+                "process_name": "orders.exe",
+                "rect": [0, 0, 400, 300],
+                "children": [
+                    {"control_type": "Edit", "automation_id": "customer", "value": "ACME", "rect": [10, 10, 200, 30]},
+                    {"control_type": "Button", "name": "Hidden", "visible": False},
+                ],
+            }
+        ],
+    }
+    path = tmp_path / "tree.json"
+    path.write_text(json.dumps(dump), encoding="utf-8")
+
+    desktop = SyntheticDesktop.from_file(path)
+    window = desktop.get_scope_root({"process_name": "orders"})
+    edit, hidden = window.children()
+
+    assert desktop.get_value(edit) == "ACME"
+    assert desktop.is_visible(hidden) is False
+    assert desktop.dpi_for(window) == 120
+    assert SyntheticDesktop(desktop.dump()).dump() == desktop.dump()
+
+
+def test_tree_dump_keeps_zero_and_one_values():
+    dump = {
+        "windows": [
+            {
+                "name": "Mixer",
+                "rect": [0, 0, 400, 300],
+                "children": [
+                    {"control_type": "Slider", "automation_id": "muted", "value": 0},
+                    {"control_type": "Slider", "automation_id": "gain", "value": 1},
+                    {"control_type": "Button", "name": "Apply", "collapsed": True, "visible": False},
+                ],
+            }
+        ]
+    }
+
+    children = SyntheticDesktop(dump).dump()["windows"][0]["children"]
+
+    assert [child.get("value") for child in children] == [0, 1, None]
+    assert children[2]["collapsed"] is True and children[2]["visible"] is False
+
+
+def test_latency_is_charged_per_property_read():
+    desktop = SyntheticDesktop.generate(nodes=50, latency={"name": 0.0001})
+    window = desktop.windows()[0]
+
+    desktop.find_uia(window, {"name": "Label 40"})
+
+    assert desktop.reads["name"] >= 50
+
+
+def test_focus_drives_window_assertions_and_actions():
+    desktop = SyntheticDesktop.generate(nodes=40, windows=2)
+    other = {"window_title_contains": "Synthetic Window 1"}
+
+    assert desktop.focus_window(other)["title"] == "Synthetic Window 1"
+    result = check_assertions(
+        {
+            "run_id": "run",
+            "step_id": "step",
+            "assertions": [{"kind": "desktop_window_active", "target": {"scope": other}}],
+        },
+        adapter=desktop,
+    )
+    target = {"scope": other, "ladder": [{"kind": "uia", "selector": {"automationId": "edit33"}}]}
+    set_value({"run_id": "run", "step_id": "step", "target": target, "value": "typed"}, adapter=desktop)
+
+    assert result["ok"] is True
+    assert desktop.find_uia(desktop.windows()[0], {"automationId": "edit33"})[0].get_value() == "typed"
+
+
+def test_added_element_wakes_an_assertion_wait():
+    desktop = SyntheticDesktop.generate(nodes=20)
+    window = desktop.windows()[0]
+    threading.Timer(0.05, desktop.add_child, args=(window, {"control_type": "Window", "name": "Save As"})).start()
+
+    result = check_assertions(
+        {
+            "run_id": "run",
+            "step_id": "step",
+            "assertions": [
+                {"kind": "desktop_element_exists", "target": _target("uia", {"name": "Save As"}), "timeout_ms": 5000}
+            ],
+        },
+        adapter=desktop,
+    )
+
+    assert result["ok"] is True
+    assert desktop.change_notifier().stats()["events"]["structure"] == 1
+
+
+def test_server_runs_against_the_synthetic_backend(monkeypatch):
+    monkeypatch.setattr(server, "ADAPTERS", server.ADAPTERS)
+    server.configure_synthetic_backend(nodes=30)
+
+    focus = server.handle_window_focus({"run_id": "run", "step_id": "step", "scope": SCOPE})
+    response = server.handle_request(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "target.resolve",
+            "params": {"run_id": "run", "step_id": "step", "target": _target("uia", {"automationId": "edit29"})},
+        }
+    )
+
+    assert focus["window"]["title"] == "Synthetic Window 0"
+    assert response["result"]["resolved"]["element"]["automationId"] == "edit29"
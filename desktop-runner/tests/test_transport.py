@@ -0,0 +1,65 @@
+import io
+import struct
+
+import pytest
+
+from desktop_runner import server
+from desktop_runner.transport import (
+    FRAMING_JSONL,
+    FRAMING_LENGTH_PREFIXED,
+    TransportError,
+    available_codecs,
+    get_codec,
+    make_transport,
+)
+
+
+def _frames(transport, payloads):
+    return b"".join(transport.encode_frame(payload) for payload in payloads)
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+def test_length_prefixed_round_trip(codec):
+    transport = make_transport(FRAMING_LENGTH_PREFIXED, codec)
+    payloads = [{"id": 1, "text": "line\nbreak"}, {"id": 2, "items": list(range(5))}]
+
+    stream = io.BytesIO(_frames(transport, payloads))
+    decoded = [transport.decode(frame) for frame in transport.read_frames(stream)]
+
+    assert decoded == payloads
+
+
+def test_length_prefixed_rejects_truncated_frame():
+    transport = make_transport(FRAMING_LENGTH_PREFIXED, "json")
+    stream = io.BytesIO(struct.pack(">I", 10) + b"{}")
+
+    with pytest.raises(TransportError, match="Truncated"):
+        list(transport.read_frames(stream))
+
+
+def test_binary_codec_requires_length_prefixed_framing():
+    with pytest.raises(TransportError):
+        make_transport(FRAMING_JSONL, "msgpack")
+    assert not get_codec("auto", FRAMING_JSONL).binary
+
+
+def test_serve_length_prefixed_and_capabilities(monkeypatch):
+    transport = make_transport(FRAMING_LENGTH_PREFIXED, "json")
+    requests = [
+        {"jsonrpc": "2.0", "id": 1, "method": "system.getCapabilities", "params": {}},
+    ]
+    stdin = io.TextIOWrapper(io.BytesIO(_frames(transport, requests) + struct.pack(">I", 3) + b"{x]"))
+    stdout = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr(server.sys, "stdin", stdin)
+    monkeypatch.setattr(server.sys, "stdout", stdout)
+    monkeypatch.setattr(server, "_TRANSPORT", server._TRANSPORT)
+
+    server.serve(max_workers=1, transport=transport)
+
+    output = io.BytesIO(stdout.buffer.getvalue())
+    responses = {response["id"]: response for response in map(transport.decode, transport.read_frames(output))}
+    capabilities = responses[1]["result"]["transport"]
+    assert capabilities["framing"] == FRAMING_LENGTH_PREFIXED
+    assert capabilities["codec"] == "json"
+    assert "json" in capabilities["codecs"]
+    assert responses[None]["error"]["code"] == -32700
@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+
+import pytest
+
+from desktop_runner.errors import AmbiguousMatch
+from desktop_runner.selector.resolve import resolve_ladder
+from desktop_runner.uia.adapter import UIAAdapter
+from desktop_runner.uia.synthetic import SyntheticDesktop
+
+
+class Node:
+    def __init__(self, control_type, name="", automation_id="", children=()):
+        self.element_info = SimpleNamespace(
+            control_type=control_type, name=name, automation_id=automation_id, class_name=""
+        )
+        self._children = list(children)
+        self.expanded = 0
+
+    def children(self):
+        self.expanded += 1
+        return self._children
+
+    def descendants(self):
+        raise AssertionError("uia_path must not search all descendants")
+
+    def rectangle(self):
+        return SimpleNamespace(left=0, top=0, right=10, bottom=10)
+
+
+class PathAdapter(UIAAdapter):
+    def __init__(self, root):
+        self.root = root
+
+    def get_scope_root(self, scope):
+        return self.root
+
+
+def _window():
+    rows = [Node("DataItem", name=f"Row {index}") for index in range(500)]
+    toolbar = Node(
+        "ToolBar",
+        automation_id="mainToolbar",
+        children=[Node("Button", name="Open"), Node("Button", name="Save", automation_id="saveButton")],
+    )
+    return Node("Window", name="Orders", children=[Node("Pane", children=[toolbar]), Node("Table", children=rows)])
+
+
+def test_path_walks_children_level_by_level():
+    window = _window()
+    target = {
+        "ladder": [
+            {
+                "kind": "uia_path",
+                "selector": {
+                    "path": [
+                        {"controlType": "Pane"},
+                        {"controlType": "ToolBar", "automationId": "mainToolbar"},
+                        {"controlType": "Button", "index": 1},
+                    ]
+                },
+            }
+        ]
+    }
+
+    resolved, attempts, _ = resolve_ladder(target, adapter=PathAdapter(window))
+
+    assert resolved["kind"] == "uia_path"
+    assert resolved["element"]["automationId"] == "saveButton"
+    assert attempts[0]["matched_count"] == 1
+    table = window._children[1]
+    assert table.expanded == 0
+
+
+def test_path_may_start_with_the_scope_window():
+    window = _window()
+    adapter = PathAdapter(window)
+    path = [{"controlType": "Window", "name": "Orders"}, {"controlType": "Table"}, {"controlType": "DataItem", "index": 42}]
+
+    matches = adapter.find_uia_path(window, {"path": path})
+
+    assert [match.element_info.name for match in matches] == ["Row 42"]
+
+
+def test_unindexed_hops_branch_and_report_ambiguity():
+    window = _window()
+    target = {"ladder": [{"kind": "uia_path", "selector": {"path": [{"controlType": "Table"}, {"controlType": "DataItem"}]}}]}
+
+    with pytest.raises(AmbiguousMatch) as exc:
+        resolve_ladder(target, adapter=PathAdapter(window))
+
+    assert exc.value.data["match_attempts"][0]["matched_count"] == 2
+    assert PathAdapter(window).find_uia_path(window, {"path": [{"controlType": "Button"}]}) == []
+
+
+def _recorded_ancestry(element, max_depth=4):
+    # Mirrors recorder_desktop.uia.neighborhood.build_ancestry: target first, no index.
+    ancestry = []
+    while element is not None and len(ancestry) < max_depth:
+        info = element.element_info
+        ancestry.append(
+            {
+                "controlType": info.control_type,
+                "name": info.name,
+                "automationId": info.automation_id,
+                "className": info.class_name,
+            }
+        )
+        element = element.parent()
+    return ancestry
+
+
+def test_recorded_leaf_first_ancestry_resolves_end_to_end():
+    row = {"control_type": "Pane", "children": [{"control_type": "Button", "name": "Save", "automation_id": "save"}]}
+    desktop = SyntheticDesktop(
+        {
+            "windows": [
+                {
+                    "name": "Orders",
+                    "children": [
+                        {
+                            "control_type": "Pane",
+                            "automation_id": "shell",
+                            "children": [
+                                {"control_type": "Pane", "automation_id": "editor", "children": [row, row]},
+                                {"control_type": "Pane", "automation_id": "footer", "children": [row]},
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+    )
+    scope = {"window_title_contains": "Orders"}
+    window = desktop.get_scope_root(scope)
+    footer_save = window.children()[0].children()[1].children()[0].children()[0]
+    ancestry = _recorded_ancestry(footer_save)
+    path = [
+        {field: node[field] for field in ("controlType", "name", "automationId") if node[field]} for node in ancestry
+    ]
+
+    resolved, attempts, element = resolve_ladder(
+        {"scope": scope, "ladder": [{"kind": "uia_path", "selector": {"path": path, "order": "leaf_first"}}]},
+        adapter=desktop,
+        return_element=True,
+    )
+
+    assert len(ancestry) == 4
+    assert element == footer_save
+    assert resolved["element"]["automationId"] == "save"
+    assert attempts[0]["matched_count"] == 1
+    with pytest.raises(AmbiguousMatch):
+        resolve_ladder(
+            {"scope": scope, "ladder": [{"kind": "uia_path", "selector": {"path": path[:2], "order": "leaf_first"}}]},
+            adapter=desktop,
+        )
@@ -49,6 +49,17 @@ export interface MatchAttempt {
   duration_ms: number;
   ok: boolean;
   error?: string;
+  cached?: boolean;
+  count?: number;
+  min_duration_ms?: number;
+  max_duration_ms?: number;
+}
+
+export interface MatchAttemptsTruncated {
+  after_index: number;
+  entries: number;
+  attempts: number;
+  duration_ms: number;
 }
 
 export interface ResolvedElement {
@@ -64,6 +75,7 @@ export interface StepTrace {
   ended_at: string;
   ok: boolean;
   match_attempts: MatchAttempt[];
+  match_attempts_truncated?: MatchAttemptsTruncated;
   resolved?: ResolvedElement;
   before_screenshot_path?: string;
   after_screenshot_path?: string;
@@ -63,6 +63,20 @@ function addRung(
   ladder.push({ kind, confidence, selector, notes });
 }
 
+function pathNode(node: UiaAncestryNode): Record<string, unknown> {
+  const hop: Record<string, unknown> = { controlType: node.controlType };
+  if (node.name) {
+    hop.name = node.name;
+  }
+  if (node.automationId) {
+    hop.automationId = node.automationId;
+  }
+  if (node.index !== undefined) {
+    hop.index = node.index;
+  }
+  return hop;
+}
+
 export function buildDesktopSelectors(
   event: DesktopRecordingEvent,
   index: number,
@@ -96,14 +110,10 @@ export function buildDesktopSelectors(
       "uia_path",
       0.7,
       {
-        path: ancestry.map((node) => ({
-          controlType: node.controlType,
-          name: node.name,
-          automationId: node.automationId,
-          index: node.index,
-        })),
+        path: ancestry.map(pathNode),
+        order: "leaf_first",
       },
-      "Path derived from ancestry snapshot.",
+      "Path derived from ancestry snapshot, target first.",
     );
   }
 
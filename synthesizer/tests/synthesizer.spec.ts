@@ -20,6 +20,16 @@ describe("synthesizeRecording", () => {
     expect(selectors.steps[0].ladder.length).toBeGreaterThanOrEqual(2);
     expect(selectors.steps[0].ladder[0].kind).toBe("uia");
     expect(selectors.steps[0]).toHaveProperty("ambiguous");
+    const pathRung = selectors.steps[0].ladder.find(
+      (rung: { kind: string }) => rung.kind === "uia_path",
+    );
+    expect(pathRung.selector).toEqual({
+      path: [
+        { controlType: "Button", name: "Save", automationId: "saveButton" },
+        { controlType: "ToolBar", name: "Main", automationId: "mainToolbar" },
+      ],
+      order: "leaf_first",
+    });
 
     expect(assertions.steps).toHaveLength(2);
     expect(assertions.steps[0].pre_assert[0].kind).toBe(